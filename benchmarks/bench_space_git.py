@@ -0,0 +1,308 @@
+"""
+Reproducible performance benchmarks for `SpaceGitManager`.
+
+Every run builds real spaces and local bare remotes below a temporary
+directory and talks to them through ``file://`` URLs, so no network is
+involved. Results are written as JSON and can be compared against a stored
+baseline:
+
+.. code-block:: bash
+
+    python benchmarks/bench_space_git.py --spaces 1,10 --files 10,1000 \\
+        --output results.json
+    python benchmarks/bench_space_git.py --baseline results.json
+
+Spaces are resolved from the temporary directory instead of the
+`SpaceManager` storage root so runs never touch real spaces.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from darca_space_git.space_git import SpaceGitManager
+
+OPERATIONS = (
+    "init",
+    "clone",
+    "status",
+    "pull",
+    "checkout",
+    "commit_file",
+    "commit_all",
+    "push",
+)
+
+_IDENTITY = {
+    "GIT_AUTHOR_NAME": "bench",
+    "GIT_AUTHOR_EMAIL": "bench@example.com",
+    "GIT_COMMITTER_NAME": "bench",
+    "GIT_COMMITTER_EMAIL": "bench@example.com",
+}
+
+
+class LocalSpaces:
+    """
+    Minimal space and file backend rooted in a benchmark directory.
+
+    Provides the subset of the `SpaceManager` and `SpaceFileManager`
+    interface used by `SpaceGitManager`.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    def create_space(self, space_name: str) -> str:
+        path = self._get_space_path(space_name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def space_exists(self, space_name: str) -> bool:
+        return os.path.isdir(self._get_space_path(space_name))
+
+    def _get_space_path(self, space_name: str) -> str:
+        return os.path.join(self.root, space_name)
+
+    def file_exists(self, space_name: str, relative_path: str) -> bool:
+        return os.path.isfile(
+            os.path.join(self._get_space_path(space_name), relative_path)
+        )
+
+    def set_file(self, space_name: str, relative_path: str, content) -> None:
+        path = os.path.join(self._get_space_path(space_name), relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content if isinstance(content, str) else str(content))
+
+
+def _git(cwd: str, *args: str) -> None:
+    subprocess.run(  # nosec B603 B607
+        ["git", *args], cwd=cwd, check=True, capture_output=True
+    )
+
+
+def _write_tree(root: str, files: int) -> None:
+    for i in range(files):
+        directory = os.path.join(root, f"d{i // 100:04d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"f{i:06d}.txt"), "w") as handle:
+            handle.write(f"file {i}\n")
+
+
+def build_remote(workdir: str, files: int) -> str:
+    """
+    Create a bare remote holding one commit with ``files`` files.
+
+    Returns:
+        str: ``file://`` URL of the remote.
+    """
+    seed = os.path.join(workdir, f"seed-{files}")
+    bare = os.path.join(workdir, f"remote-{files}.git")
+    os.makedirs(seed)
+    _git(seed, "init", "-q", "-b", "main")
+    _write_tree(seed, files)
+    _git(seed, "add", "-A")
+    _git(seed, "commit", "-q", "-m", "seed")
+    _git(workdir, "clone", "-q", "--bare", seed, bare)
+    shutil.rmtree(seed)
+    return "file://" + bare
+
+
+def _timed(
+    samples: Dict[str, List[float]], operation: str, fn: Callable[[], Any]
+) -> None:
+    started = time.perf_counter()
+    fn()
+    samples[operation].append(time.perf_counter() - started)
+
+
+def run_scale(
+    workdir: str, url: str, spaces: int, files: int
+) -> Dict[str, List[float]]:
+    """
+    Time every benchmarked operation for ``spaces`` spaces cloned from the
+    remote at ``url`` holding ``files`` files.
+    """
+    root = os.path.join(workdir, f"spaces-{spaces}-{files}")
+    backend = LocalSpaces(root)
+    manager = SpaceGitManager()
+    manager.space_manager = backend
+    manager.file_manager = backend
+
+    samples: Dict[str, List[float]] = defaultdict(list)
+    for i in range(spaces):
+        name = f"space-{i:05d}"
+        backend.create_space(f"{name}-init")
+        _timed(samples, "init", lambda: manager.init_repo(f"{name}-init"))
+
+        path = backend.create_space(name)
+        _timed(samples, "clone", lambda: manager.clone_repo(name, url))
+        _git(path, "config", "push.default", "current")
+        _timed(samples, "status", lambda: manager.get_status(name))
+        _timed(samples, "pull", lambda: manager.pull_repo(name))
+        _timed(
+            samples,
+            "checkout",
+            lambda: manager.checkout_branch(name, f"bench-{i}", create=True),
+        )
+        _timed(
+            samples,
+            "commit_file",
+            lambda: manager.commit_file(
+                name, "bench/new.txt", "add file", content="new\n"
+            ),
+        )
+        with open(os.path.join(path, "bench", "new.txt"), "a") as handle:
+            handle.write("changed\n")
+        _timed(
+            samples,
+            "commit_all",
+            lambda: manager.commit_all(name, "change file"),
+        )
+        _timed(samples, "push", lambda: manager.push_repo(name))
+    manager.close()
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "runs": len(ordered),
+        "median": statistics.median(ordered),
+        "p95": p95,
+        "mean": statistics.fmean(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+        "total": sum(ordered),
+    }
+
+
+def _git_version() -> str:
+    out = subprocess.run(  # nosec B603 B607
+        ["git", "--version"], check=True, capture_output=True, text=True
+    )
+    return out.stdout.strip()
+
+
+def run(spaces: List[int], files: List[int]) -> Dict[str, Any]:
+    os.environ.update(_IDENTITY)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="darca-bench-") as workdir:
+        for file_count in files:
+            url = build_remote(workdir, file_count)
+            for space_count in spaces:
+                samples = run_scale(workdir, url, space_count, file_count)
+                for operation in OPERATIONS:
+                    results.append(
+                        {
+                            "operation": operation,
+                            "spaces": space_count,
+                            "files": file_count,
+                            **summarize(samples[operation]),
+                        }
+                    )
+                print(
+                    f"measured {space_count} space(s) x {file_count} file(s)",
+                    file=sys.stderr,
+                )
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git": _git_version(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float
+) -> List[str]:
+    """
+    Compare median timings against a baseline.
+
+    Returns:
+        List[str]: One line per result whose median regressed by more than
+                   ``max_regression`` (a fraction, e.g. ``0.2``).
+    """
+
+    def key(result: Dict[str, Any]) -> Tuple[str, int, int]:
+        return result["operation"], result["spaces"], result["files"]
+
+    reference = {key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        base = reference.get(key(result))
+        if base is None or base["median"] <= 0:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > 1 + max_regression:
+            operation, spaces, files = key(result)
+            regressions.append(
+                f"{operation} ({spaces} spaces, {files} files): median "
+                f"{result['median'] * 1000:.2f}ms vs "
+                f"{base['median'] * 1000:.2f}ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--spaces",
+        type=_int_list,
+        default=[1, 10],
+        help="comma-separated space counts, e.g. 1,10,100,1000,10000",
+    )
+    parser.add_argument(
+        "--files",
+        type=_int_list,
+        default=[10, 1000],
+        help="comma-separated files per space, e.g. 10,1000,100000",
+    )
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="allowed median slowdown as a fraction (default: 0.2)",
+    )
+    args = parser.parse_args(argv)
+
+    current = run(args.spaces, args.files)
+    rendered = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(rendered + "\n")
+    else:
+        print(rendered)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(
+                current, json.load(handle), args.max_regression
+            )
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
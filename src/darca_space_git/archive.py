@@ -0,0 +1,70 @@
+import inspect
+from typing import Any, AsyncIterable, BinaryIO, Iterable, List, Optional
+
+from .exceptions import SpaceGitException
+
+EXPORT_FORMATS = ("tar", "tar.gz", "zip")
+
+
+def archive_args(
+    ref: str,
+    format: str = "tar",
+    paths: Optional[Iterable[str]] = None,
+    prefix: Optional[str] = None,
+) -> List[str]:
+    """
+    Build ``git archive`` arguments.
+
+    Raises:
+        SpaceGitException: If ``format`` is not one of `EXPORT_FORMATS`.
+    """
+    if format not in EXPORT_FORMATS:
+        raise SpaceGitException(
+            message=(
+                f"Unsupported export format '{format}'; expected one of "
+                f"{', '.join(EXPORT_FORMATS)}."
+            ),
+            error_code="INVALID_EXPORT_OPTIONS",
+            metadata={"format": format},
+        )
+    args = ["archive", f"--format={format}"]
+    if prefix:
+        args.append(f"--prefix={prefix.rstrip('/')}/")
+    return [*args, "--end-of-options", ref, *(paths or ())]
+
+
+def write_chunks(chunks: Iterable[bytes], fileobj: BinaryIO) -> int:
+    """
+    Copy chunks into a binary file-like object.
+
+    Returns:
+        int: Bytes written.
+    """
+    written = 0
+    for chunk in chunks:
+        fileobj.write(chunk)
+        written += len(chunk)
+    return written
+
+
+async def write_chunks_async(chunks: AsyncIterable[bytes], writer: Any) -> int:
+    """
+    Copy chunks into an async writer.
+
+    Accepts writers whose ``write`` is a coroutine (e.g. aiofiles) as well
+    as `asyncio.StreamWriter`, whose buffer is drained after every chunk so
+    a slow reader applies back-pressure. Plain binary files work too.
+
+    Returns:
+        int: Bytes written.
+    """
+    drain = getattr(writer, "drain", None)
+    written = 0
+    async for chunk in chunks:
+        result = writer.write(chunk)
+        if inspect.isawaitable(result):
+            await result
+        if drain is not None:
+            await drain()
+        written += len(chunk)
+    return written
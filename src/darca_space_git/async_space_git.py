@@ -0,0 +1,1300 @@
+import asyncio
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from darca_log_facility.logger import DarcaLogger
+from darca_space_manager.space_file_manager import SpaceFileManager
+from darca_space_manager.space_manager import SpaceManager
+
+from .archive import archive_args, write_chunks_async
+from .cat_file import parse_batch_output
+from .changes import PullResult, changed_paths, remote_matches_tracking
+from .clone_profile import CloneProfile
+from .content import (
+    StreamContent,
+    content_chunks,
+    is_buffered,
+    is_managed,
+    normalize_path,
+    serialize_content,
+    write_file_chunks,
+)
+from .deadline import (
+    CANCELLED_CODE,
+    TIMEOUT_CODE,
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    validate_timeouts,
+)
+from .diff import (
+    FileDiff,
+    diff_args,
+    parse_diff_stream_async,
+    split_records_async,
+)
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+from .history import (
+    Commit,
+    TimeFilter,
+    log_args,
+    parse_log_stream_async,
+)
+from .locking import AsyncFairRWLock, SpaceLockManager
+from .path_cache import SpacePathCache
+from .plumbing import (
+    blob_id,
+    commit_contents,
+    push_commands,
+    resolve_commit,
+)
+from .status import StatusEntry, parse_porcelain_v2, status_args
+from .worktrees import remove_stale_index_lock
+
+logger = DarcaLogger(name="async_space_git").get_logger()
+
+T = TypeVar("T")
+# Marks the end of a stream driven by `AsyncSpaceGitManager._stream`.
+_DONE: Any = object()
+
+# Threads blocked on space locks, kept off the default executor.
+_lock_waits = ThreadPoolExecutor(thread_name_prefix="darca-space-lock")
+
+
+async def _next(records: AsyncIterator[T]) -> T:
+    return await anext(records, _DONE)
+
+
+async def _close(records: AsyncIterator[T]) -> None:
+    await records.aclose()
+
+
+def _file_holds(target: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(target) != len(data):
+            return False
+        with open(target, "rb") as handle:
+            return handle.read() == data
+    except OSError:
+        return False
+
+
+class AsyncSpaceGitManager:
+    """
+    Asyncio-native counterpart of `SpaceGitManager`.
+
+    Every operation has the same name, arguments and `SpaceGitException`
+    error codes as its synchronous twin, but git runs through
+    ``asyncio.create_subprocess_exec`` so the event loop is never blocked.
+    Cancelling the awaiting task kills the running git process.
+
+    Operations take the same per-space locks as `SpaceGitManager`; pass the
+    synchronous manager's `SpaceLockManager` to share them in-process.
+
+    Operations made of many plumbing commands and file writes
+    (`commit_files`, the comparisons of `pull_changes`) run in a worker
+    thread whose git processes are still killed when the task is
+    cancelled.
+
+    Features bound to the synchronous manager's caches and pools are
+    deliberately left out: ``write_file``/``mark_dirty`` (dirty tracking),
+    ``enqueue_commit``/``flush_commit_queues`` (commit queues),
+    ``dissociate_mirror`` (mirrors), ``enable_index_acceleration``,
+    ``write_commit_graph``, ``maintain``, ``history_page``,
+    ``read_files_at_ref`` (pooled ``cat-file`` processes) and the bulk
+    ``pull_many``/``push_many``/``status_many``, for which
+    ``asyncio.gather`` serves. `get_status_entries` has no status cache,
+    and reads and writes always use the space root, as there is no
+    worktree pool.
+    """
+
+    def __init__(
+        self,
+        path_cache_ttl: Optional[float] = 30.0,
+        path_cache_size: int = 1024,
+        locks: Optional[SpaceLockManager] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Args:
+            path_cache_ttl (Optional[float]): Seconds a resolved space path
+                                              is cached.
+            path_cache_size (int): Maximum number of cached space paths.
+            locks (Optional[SpaceLockManager]): Lock manager serializing
+                                                operations per space. A
+                                                default instance is created
+                                                when omitted.
+            timeouts (Optional[Dict[str, float]]): Default deadline in
+                                                   seconds per operation
+                                                   name; ``"default"``
+                                                   covers the rest.
+
+        Raises:
+            SpaceGitException: If a timeout is not positive.
+        """
+        self.git_process = GitProcess()
+        self.space_manager = SpaceManager()
+        self.file_manager = SpaceFileManager()
+        self.path_cache = SpacePathCache(
+            ttl=path_cache_ttl, maxsize=path_cache_size
+        )
+        self.locks = locks or SpaceLockManager()
+        self._gates: Dict[str, AsyncFairRWLock] = {}
+        self.timeouts = validate_timeouts(timeouts)
+
+    @asynccontextmanager
+    async def _operation(
+        self,
+        operation: str,
+        space_name: str,
+        exclusive: bool = True,
+        timeout: Optional[float] = None,
+        locked: bool = True,
+    ) -> AsyncIterator[None]:
+        """
+        Hold the space's lock for a public operation: shared for read-only
+        operations, exclusive for mutations. Streaming operations pass
+        ``locked=False`` and run through `_stream`, which locks each read
+        instead.
+
+        The operation runs under a `Deadline` when ``timeout``, a default
+        from ``timeouts`` or an enclosing `deadline_scope` applies; time
+        spent waiting for the lock counts against it. A git process the
+        deadline kills leaves no stale ``index.lock`` behind.
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(
+                operation, self.timeouts.get("default")
+            )
+        outer = current_deadline()
+        deadline = outer if timeout is None else Deadline(timeout, outer)
+        started = time.time()
+        try:
+            with deadline_scope(deadline):
+                async with AsyncExitStack() as stack:
+                    if locked:
+                        await stack.enter_async_context(
+                            self._hold(space_name, exclusive)
+                        )
+                    if deadline is not None:
+                        deadline.check()
+                    yield
+        except (SpaceGitException, OSError) as e:
+            if deadline is None or not deadline.stopped:
+                raise
+            try:
+                lock = remove_stale_index_lock(
+                    self._get_repo_path(space_name), started
+                )
+            except SpaceGitException:
+                lock = None
+            if lock is not None:
+                logger.warning(
+                    f"Removed stale '{lock}' of space '{space_name}'"
+                )
+            raise deadline.error(
+                cause=e,
+                metadata={"operation": operation, "space": space_name},
+            )
+        finally:
+            if deadline is not None and deadline is not outer:
+                deadline.close()
+
+    @asynccontextmanager
+    async def _hold(
+        self, space_name: str, exclusive: bool
+    ) -> AsyncIterator[None]:
+        """
+        Hold the space's lock without tying up the default executor.
+
+        Tasks of this manager queue for a space on an `AsyncFairRWLock`, so
+        only the task at the head waits for the `SpaceLockManager` lock
+        (held by other managers or processes), and it does so on a
+        dedicated executor: lock holders need the default one for their
+        file I/O. A task cancelled while the thread waits releases the lock
+        as soon as the thread obtains it.
+        """
+        gate = self._gates.get(space_name)
+        if gate is None:
+            gate = self._gates[space_name] = AsyncFairRWLock()
+        await gate.acquire(exclusive)
+        try:
+            hold = self.locks.hold(space_name, exclusive=exclusive)
+            acquire = asyncio.get_running_loop().run_in_executor(
+                _lock_waits, hold.__enter__
+            )
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+
+                def release(done: "asyncio.Future[None]") -> None:
+                    if not done.cancelled() and done.exception() is None:
+                        hold.__exit__(None, None, None)
+
+                acquire.add_done_callback(release)
+                raise
+            try:
+                yield
+            finally:
+                hold.__exit__(None, None, None)
+        finally:
+            gate.release(exclusive)
+
+    async def _stream(
+        self, space_name: str, records: AsyncIterator[T]
+    ) -> AsyncIterator[T]:
+        """
+        Drive a streaming operation started with ``locked=False``.
+
+        Every step of ``records`` runs as a task in a context of its own,
+        so the operation's deadline never leaks into the caller between
+        items, and holds the space's shared lock only while the next item
+        is read. Cancelling the consumer cancels the step, which stops git.
+        """
+        context = contextvars.copy_context()
+        try:
+            while True:
+                async with self._hold(space_name, exclusive=False):
+                    item = await asyncio.create_task(
+                        _next(records), context=context
+                    )
+                if item is _DONE:
+                    return
+                yield item
+        finally:
+            await asyncio.create_task(_close(records), context=context)
+
+    async def _blocking(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run blocking plumbing in a worker thread.
+
+        Its git processes run under a child of the current deadline that
+        cancelling the task cancels, so they are killed with the task;
+        the cancellation propagates once the thread has stopped.
+        """
+        deadline = Deadline(parent=current_deadline())
+        try:
+            with deadline_scope(deadline):
+                work = asyncio.ensure_future(asyncio.to_thread(func, *args))
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                deadline.cancel()
+                await asyncio.wait([work])
+                raise
+        finally:
+            deadline.close()
+
+    def _get_repo_path(self, space_name: str) -> str:
+        """
+        Resolve the absolute path of a given logical space.
+
+        Raises:
+            SpaceGitException: If the space does not exist.
+
+        Returns:
+            str: Filesystem path to the Git repository.
+        """
+        return self.path_cache.get(space_name, self._resolve_space_path)
+
+    def _resolve_space_path(self, space_name: str) -> str:
+        if not self.space_manager.space_exists(space_name):
+            raise SpaceGitException(
+                message=f"Space '{space_name}' does not exist.",
+                error_code="SPACE_NOT_FOUND",
+                metadata={"space": space_name},
+            )
+        return self.space_manager._get_space_path(space_name)
+
+    def invalidate_path_cache(self, space_name: Optional[str] = None) -> None:
+        """
+        Forget the cached path of a space, or of all spaces.
+        """
+        self.path_cache.invalidate(space_name)
+
+    async def _git(
+        self,
+        path: str,
+        args: Sequence[str],
+        message: str,
+        error_code: str,
+        metadata: dict,
+    ) -> str:
+        try:
+            out = await self.git_process.run_async(args, cwd=path)
+        except SpaceGitException as e:
+            raise self._failure(e, message, error_code, metadata)
+        return out.decode("utf-8", "replace")
+
+    @staticmethod
+    def _failure(
+        error: Exception, message: str, error_code: str, metadata: dict
+    ) -> SpaceGitException:
+        """
+        Wrap a failure in the operation's error, keeping deadline errors as
+        they are.
+        """
+        if isinstance(error, SpaceGitException) and error.error_code in (
+            TIMEOUT_CODE,
+            CANCELLED_CODE,
+        ):
+            return error
+        return SpaceGitException(
+            message=message,
+            error_code=error_code,
+            metadata=metadata,
+            cause=error,
+        )
+
+    async def init_repo(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Initialize a new Git repository in the given space.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If initialization fails.
+        """
+        async with self._operation(
+            "init_repo", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            await self._git(
+                path,
+                ["init"],
+                "Failed to initialize git repository.",
+                "INIT_FAILED",
+                {"space": space_name},
+            )
+            return True
+
+    async def clone_repo(
+        self,
+        space_name: str,
+        repo_url: str,
+        profile: Optional[CloneProfile] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Clone a Git repository into the given space.
+
+        Args:
+            repo_url (str): URL of the remote repository.
+            profile (Optional[CloneProfile]): Shallow, partial, single-branch
+                                              or sparse clone options.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If cloning fails.
+        """
+        async with self._operation(
+            "clone_repo", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            metadata = {"space": space_name, "url": repo_url}
+            if profile is None:
+                await self._git(
+                    path,
+                    ["clone", repo_url, "."],
+                    "Failed to clone repository.",
+                    "CLONE_FAILED",
+                    metadata,
+                )
+                return True
+
+            metadata["profile"] = asdict(profile)
+            await self._git(
+                path,
+                ["clone", *profile.clone_args(), repo_url, "."],
+                "Failed to clone repository.",
+                "CLONE_FAILED",
+                metadata,
+            )
+            try:
+                if profile.sparse_paths:
+                    await self.git_process.run_async(
+                        ["sparse-checkout", "set", "--cone", "--stdin"],
+                        cwd=path,
+                        input=profile.sparse_input(),
+                    )
+                profile.save(path)
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message="Failed to clone repository.",
+                    error_code="CLONE_FAILED",
+                    metadata=metadata,
+                    cause=e,
+                )
+            return True
+
+    async def get_status(
+        self,
+        space_name: str,
+        porcelain: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Retrieve the Git status of the repository.
+
+        Args:
+            porcelain (bool): Whether to return porcelain output.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            str: Output of `git status`.
+
+        Raises:
+            SpaceGitException: If status command fails.
+        """
+        async with self._operation(
+            "get_status", space_name, exclusive=False, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            args = ["status", "--porcelain"] if porcelain else ["status"]
+            return await self._git(
+                path,
+                args,
+                "Failed to get git status.",
+                "STATUS_FAILED",
+                {"space": space_name, "porcelain": porcelain},
+            )
+
+    async def get_status_entries(
+        self,
+        space_name: str,
+        untracked: bool = True,
+        timeout: Optional[float] = None,
+    ) -> List[StatusEntry]:
+        """
+        Retrieve the Git status of the repository as parsed entries.
+
+        Args:
+            untracked (bool): Whether to include untracked files.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            List[StatusEntry]: One entry per changed path.
+
+        Raises:
+            SpaceGitException: If status command fails.
+        """
+        async with self._operation(
+            "get_status_entries", space_name, exclusive=False, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            try:
+                out = await self.git_process.run_async(
+                    status_args(untracked), cwd=path
+                )
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to get git status.",
+                    "STATUS_FAILED",
+                    {"space": space_name, "porcelain": "v2"},
+                )
+            return parse_porcelain_v2(out)
+
+    async def commit_all(
+        self, space_name: str, message: str, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Stage and commit all changes in the repository.
+
+        Args:
+            message (str): Commit message.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If committing fails.
+        """
+        async with self._operation(
+            "commit_all", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            metadata = {"space": space_name, "message": message}
+            await self._git(
+                path,
+                ["add", "."],
+                "Failed to commit all changes.",
+                "COMMIT_ALL_FAILED",
+                metadata,
+            )
+            await self._git(
+                path,
+                ["commit", "-m", message],
+                "Failed to commit all changes.",
+                "COMMIT_ALL_FAILED",
+                metadata,
+            )
+            return True
+
+    async def commit_file(
+        self,
+        space_name: str,
+        relative_path: str,
+        message: str,
+        content: Optional[StreamContent] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Commit a specific file, writing ``content`` to it first when given.
+
+        Content is accepted in every form `SpaceGitManager.commit_file`
+        takes. Serializing, comparing and writing it runs in a worker
+        thread, so large or streamed content does not block the event loop.
+
+        Args:
+            relative_path (str): Path to the file relative to the space root.
+            message (str): Commit message.
+            content (Optional[StreamContent]): Content to write. Without it
+                                               the file must already exist.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Content matching both the blob at HEAD and the working tree file is
+        neither written nor committed.
+
+        Returns:
+            bool: True if a commit was made, False if the content was
+                  unchanged.
+
+        Raises:
+            SpaceGitException: If file is missing with no content, the
+            content is unsupported, or commit fails.
+        """
+        async with self._operation(
+            "commit_file", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            metadata = {"space": space_name, "file": relative_path}
+            if content is not None and await self._is_committed(
+                path, relative_path, content
+            ):
+                logger.debug(
+                    f"File '{relative_path}' in space '{space_name}' is "
+                    "unchanged; nothing to commit"
+                )
+                return False
+            if content is not None:
+                try:
+                    await asyncio.to_thread(
+                        self._set_file,
+                        space_name,
+                        path,
+                        relative_path,
+                        content,
+                    )
+                except OSError as e:
+                    raise SpaceGitException(
+                        message="Failed to commit file.",
+                        error_code="COMMIT_FILE_FAILED",
+                        metadata=metadata,
+                        cause=e,
+                    )
+                logger.debug(
+                    f"Wrote file '{relative_path}' in space '{space_name}'"
+                )
+            elif not await asyncio.to_thread(
+                self.file_manager.file_exists, space_name, relative_path
+            ):
+                raise SpaceGitException(
+                    message="File does not exist and no content provided.",
+                    error_code="FILE_MISSING",
+                    metadata=metadata,
+                )
+
+            await self._git(
+                path,
+                ["add", "--", relative_path],
+                "Failed to commit file.",
+                "COMMIT_FILE_FAILED",
+                metadata,
+            )
+            await self._git(
+                path,
+                ["commit", "-m", message],
+                "Failed to commit file.",
+                "COMMIT_FILE_FAILED",
+                metadata,
+            )
+            return True
+
+    async def commit_files(
+        self,
+        space_name: str,
+        files: Dict[str, StreamContent],
+        message: str,
+        materialize: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Commit many files at once as a single commit using git plumbing,
+        like `SpaceGitManager.commit_files`.
+
+        Args:
+            files (Dict[str, StreamContent]): Content per path relative to
+                                              the space root.
+            message (str): Commit message.
+            materialize (bool): Also write the files to the working tree and
+                                record them in the index.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            str: The new commit id.
+
+        Raises:
+            SpaceGitException: If no files are given, a path or content is
+            invalid, or the commit fails.
+        """
+        async with self._operation(
+            "commit_files", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            if not files:
+                raise SpaceGitException(
+                    message="No files to commit.",
+                    error_code="NO_FILES",
+                    metadata={"space": space_name},
+                )
+            contents = {
+                normalize_path(p): content_chunks(p, c)
+                for p, c in files.items()
+            }
+            try:
+                commit = await self._blocking(
+                    commit_contents,
+                    self.git_process,
+                    path,
+                    contents,
+                    message,
+                    materialize,
+                )
+            except (SpaceGitException, OSError) as e:
+                raise self._failure(
+                    e,
+                    "Failed to commit files.",
+                    "COMMIT_FILES_FAILED",
+                    {"space": space_name, "files": list(contents)},
+                )
+            logger.debug(
+                f"Committed {len(contents)} file(s) as {commit} "
+                f"in space '{space_name}'"
+            )
+            return commit
+
+    def _set_file(
+        self,
+        space_name: str,
+        path: str,
+        relative_path: str,
+        content: StreamContent,
+    ) -> None:
+        """
+        Write a file of a space; bytes and streamed content are copied
+        chunk by chunk.
+        Blocking, so it is run in a worker thread.
+        """
+        if is_managed(content):
+            self.file_manager.set_file(space_name, relative_path, content)
+            return
+        relative_path = normalize_path(relative_path)
+        write_file_chunks(
+            path, relative_path, content_chunks(relative_path, content)
+        )
+
+    async def _is_committed(
+        self, path: str, relative_path: str, content: StreamContent
+    ) -> bool:
+        if not is_buffered(content):
+            return False
+        try:
+            relative_path = normalize_path(relative_path)
+            data = await asyncio.to_thread(
+                serialize_content, relative_path, content
+            )
+            out = await self.git_process.run_async(
+                ["rev-parse", "--verify", "-q", f"HEAD:{relative_path}"],
+                cwd=path,
+            )
+        except SpaceGitException as e:
+            if e.error_code in (TIMEOUT_CODE, CANCELLED_CODE):
+                raise
+            return False
+        head = out.decode("ascii").strip()
+        if not head or head != blob_id(data, len(head)):
+            return False
+        target = os.path.join(path, *relative_path.split("/"))
+        return await asyncio.to_thread(_file_holds, target, data)
+
+    async def pull_repo(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> bool:
+        """
+        Pull the latest changes from the remote repository. Spaces cloned
+        with a shallow `CloneProfile` are cut back to their cloned depth.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If pull operation fails.
+        """
+        async with self._operation(
+            "pull_repo", space_name, exclusive=True, timeout=timeout
+        ):
+            await self._pull(space_name, self._get_repo_path(space_name))
+            return True
+
+    async def _pull(self, space_name: str, path: str) -> None:
+        profile = CloneProfile.load(path)
+        await self._git(
+            path,
+            ["pull"],
+            "Failed to pull repository.",
+            "PULL_FAILED",
+            {"space": space_name},
+        )
+        if profile is not None and profile.shallow:
+            await self._git(
+                path,
+                profile.trim_args(),
+                "Failed to pull repository.",
+                "PULL_FAILED",
+                {"space": space_name},
+            )
+
+    async def pull_changes(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> PullResult:
+        """
+        Pull only when the remote moved, and report what changed, like
+        `SpaceGitManager.pull_changes`.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            PullResult: Old and new HEAD with added, modified and deleted
+                        paths.
+
+        Raises:
+            SpaceGitException: If the pull or the comparison fails.
+        """
+        async with self._operation(
+            "pull_changes", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            try:
+                old_head = await self._blocking(
+                    resolve_commit, self.git_process, path, "HEAD"
+                )
+                up_to_date = await self._blocking(
+                    remote_matches_tracking, self.git_process, path
+                )
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to compare with the remote.",
+                    "PULL_FAILED",
+                    {"space": space_name},
+                )
+            if up_to_date:
+                logger.debug(f"Space '{space_name}' is up to date")
+                return PullResult(old_head, old_head, fetched=False)
+
+            await self._pull(space_name, path)
+            new_head = None
+            try:
+                new_head = await self._blocking(
+                    resolve_commit, self.git_process, path, "HEAD"
+                )
+                added, modified, deleted = await self._blocking(
+                    changed_paths, self.git_process, path, old_head, new_head
+                )
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to list changed paths.",
+                    "PULL_FAILED",
+                    {
+                        "space": space_name,
+                        "old_head": old_head,
+                        "new_head": new_head,
+                    },
+                )
+            return PullResult(old_head, new_head, added, modified, deleted)
+
+    async def export(
+        self,
+        space_name: str,
+        ref: str,
+        writer: Any,
+        format: str = "tar",
+        paths: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """
+        Stream an archive of a space at a ref into an async writer.
+
+        ``writer`` may be an `asyncio.StreamWriter` (drained after every
+        chunk), an object with a coroutine ``write`` such as an aiofiles
+        file, or a plain binary file.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            int: Bytes written.
+
+        Raises:
+            SpaceGitException: If the options are invalid
+            (``INVALID_EXPORT_OPTIONS``) or the export fails
+            (``EXPORT_FAILED``).
+        """
+        async with self._operation(
+            "export", space_name, exclusive=False, timeout=timeout
+        ):
+            args = archive_args(
+                ref, format, [normalize_path(p) for p in paths or ()], prefix
+            )
+            path = self._get_repo_path(space_name)
+            chunks = self.git_process.stream_async(args, path)
+            try:
+                return await write_chunks_async(chunks, writer)
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message="Failed to export space.",
+                    error_code="EXPORT_FAILED",
+                    metadata={"space": space_name, "ref": ref, "args": args},
+                    cause=e,
+                )
+            finally:
+                await chunks.aclose()
+
+    async def push_repo(
+        self,
+        space_name: str,
+        remote_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Push ``HEAD`` to ``origin`` and set it as upstream, first pointing
+        ``origin`` at ``remote_url`` when given, as `SpaceGitManager` does.
+
+        Args:
+            remote_url (Optional[str]): Optional remote URL to push to.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If push operation fails.
+        """
+        async with self._operation(
+            "push_repo", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            for args in push_commands(remote_url):
+                await self._git(
+                    path,
+                    args,
+                    "Failed to push repository.",
+                    "PUSH_FAILED",
+                    {"space": space_name, "remote_url": remote_url},
+                )
+            return True
+
+    async def checkout_branch(
+        self,
+        space_name: str,
+        branch: str,
+        create: bool = False,
+        dry_run: bool = False,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Checkout an existing or new branch.
+
+        Args:
+            branch (str): Branch name.
+            create (bool): Whether to create the branch.
+            dry_run (bool): If True, simulate without making changes.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful or simulated.
+
+        Raises:
+            SpaceGitException: If checkout fails.
+        """
+        async with self._operation(
+            "checkout_branch", space_name, exclusive=True, timeout=timeout
+        ):
+            path = self._get_repo_path(space_name)
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would checkout branch '{branch}' "
+                    f"(create={create}) in space '{space_name}'"
+                )
+                return True
+
+            args = (
+                ["checkout", "-b", branch] if create else ["checkout", branch]
+            )
+            await self._git(
+                path,
+                args,
+                "Failed to checkout branch.",
+                "CHECKOUT_BRANCH_FAILED",
+                {"space": space_name, "branch": branch, "create": create},
+            )
+            return True
+
+    async def checkout_path(
+        self,
+        space_name: str,
+        paths: Union[str, List[str]],
+        dry_run: bool = False,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Revert file(s) in the working directory to the last committed state.
+
+        Args:
+            paths (str | List[str]): File path(s) relative to space root.
+            dry_run (bool): If True, simulate the operation.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful or simulated.
+
+        Raises:
+            SpaceGitException: If file is missing or operation fails.
+        """
+        async with self._operation(
+            "checkout_path", space_name, exclusive=True, timeout=timeout
+        ):
+            if isinstance(paths, str):
+                paths = [paths]
+
+            missing = [
+                p
+                for p in paths
+                if not self.file_manager.file_exists(space_name, p)
+            ]
+            if missing:
+                raise SpaceGitException(
+                    message=(
+                        "Some files do not exist in the working directory."
+                    ),
+                    error_code="CHECKOUT_PATH_NOT_FOUND",
+                    metadata={"space": space_name, "missing_files": missing},
+                )
+
+            path = self._get_repo_path(space_name)
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would revert: {', '.join(paths)} "
+                    f"in space '{space_name}'"
+                )
+                return True
+
+            await self._git(
+                path,
+                ["checkout", "--", *paths],
+                "Failed to revert file(s).",
+                "CHECKOUT_FILE_FAILED",
+                {"space": space_name, "files": paths},
+            )
+            return True
+
+    async def checkout_path_from_branch(
+        self,
+        space_name: str,
+        paths: Union[str, List[str]],
+        branch: str,
+        dry_run: bool = False,
+        timeout: Optional[float] = None,
+    ) -> bool:
+        """
+        Restore file(s) from a specific branch into the working directory.
+
+        Args:
+            paths (str | List[str]): Path(s) to restore.
+            branch (str): Source branch.
+            dry_run (bool): If True, simulate the operation.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            bool: True if successful or simulated.
+
+        Raises:
+            SpaceGitException: If restore fails.
+        """
+        async with self._operation(
+            "checkout_path_from_branch",
+            space_name,
+            exclusive=True,
+            timeout=timeout,
+        ):
+            if isinstance(paths, str):
+                paths = [paths]
+
+            path = self._get_repo_path(space_name)
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would restore: {', '.join(paths)} from branch "
+                    f"'{branch}' in space '{space_name}'"
+                )
+                return True
+
+            await self._git(
+                path,
+                ["checkout", branch, "--", *paths],
+                "Failed to restore file(s) from branch.",
+                "CHECKOUT_FILE_FROM_BRANCH_FAILED",
+                {"space": space_name, "files": paths, "branch": branch},
+            )
+            return True
+
+    async def read_file_at_ref(
+        self, space_name: str, ref: str, relative_path: str
+    ) -> bytes:
+        """
+        Read a file as it exists at a ref, without touching the working tree.
+
+        Args:
+            ref (str): Branch, tag or commit to read from.
+            relative_path (str): Path relative to the space root.
+
+        Returns:
+            bytes: Raw file content.
+
+        Raises:
+            SpaceGitException: If the file does not exist at the ref, or the
+            read fails.
+        """
+        async with self._operation(
+            "read_file_at_ref", space_name, exclusive=False
+        ):
+            path = self._get_repo_path(space_name)
+            spec = f"{ref}:{relative_path.lstrip('/')}"
+            metadata = {"space": space_name, "ref": ref, "file": relative_path}
+            try:
+                if "\n" in spec:
+                    raise SpaceGitException(
+                        message="Object names may not contain newlines.",
+                        error_code="INVALID_PATH",
+                        metadata={"spec": spec},
+                    )
+                out = await self.git_process.run_async(
+                    ["cat-file", "--batch"],
+                    cwd=path,
+                    input=os.fsencode(f"{spec}\n"),
+                )
+                (content,) = parse_batch_output(out)
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to read file(s) at ref.",
+                    "READ_AT_REF_FAILED",
+                    metadata,
+                )
+            if content is None:
+                raise SpaceGitException(
+                    message=f"File does not exist at ref '{ref}'.",
+                    error_code="FILE_NOT_FOUND_AT_REF",
+                    metadata=metadata,
+                )
+            return content
+
+    def diff(
+        self,
+        space_name: str,
+        from_ref: str = "HEAD",
+        to_ref: Optional[str] = None,
+        paths: Optional[List[str]] = None,
+        mode: str = "patch",
+        cached: bool = False,
+        context: int = 3,
+    ) -> AsyncIterator[FileDiff]:
+        """
+        Stream the differences between two refs, or between a ref and the
+        working tree (or index, with ``cached``), like
+        `SpaceGitManager.diff`.
+
+        Files are parsed while git is still writing. The space's shared
+        lock is held only while the next entry is read; closing the
+        iterator early stops git.
+
+        Args:
+            from_ref (str): Ref to compare from.
+            to_ref (Optional[str]): Ref to compare to; the working tree when
+                                    omitted.
+            paths (Optional[List[str]]): Limit the diff to these paths.
+            mode (str): ``"patch"``, ``"stat"`` or ``"name-status"``.
+            cached (bool): Compare ``from_ref`` with the index instead of
+                           the working tree.
+            context (int): Context lines per hunk in patch mode.
+
+        Returns:
+            AsyncIterator[FileDiff]: One entry per changed file.
+
+        Raises:
+            SpaceGitException: If the options are invalid (immediately) or
+            the diff fails (while iterating).
+        """
+        args = diff_args(
+            from_ref,
+            to_ref,
+            [normalize_path(p) for p in paths or ()],
+            mode,
+            cached,
+            context,
+        )
+        return self._stream(
+            space_name, self._stream_diff(space_name, args, mode)
+        )
+
+    async def _stream_diff(
+        self, space_name: str, args: List[str], mode: str
+    ) -> AsyncIterator[FileDiff]:
+        async with self._operation(
+            "diff", space_name, exclusive=False, locked=False
+        ):
+            path = self._get_repo_path(space_name)
+            chunks = self.git_process.stream_async(args, path)
+            parsed = parse_diff_stream_async(chunks, mode)
+            try:
+                async for diff in parsed:
+                    yield diff
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to compute diff.",
+                    "DIFF_FAILED",
+                    {"space": space_name, "args": args},
+                )
+            finally:
+                await parsed.aclose()
+                await chunks.aclose()
+
+    def history(
+        self,
+        space_name: str,
+        ref: str = "HEAD",
+        paths: Optional[List[str]] = None,
+        author: Optional[str] = None,
+        since: Optional[TimeFilter] = None,
+        until: Optional[TimeFilter] = None,
+    ) -> AsyncIterator[Commit]:
+        """
+        Stream the commits reachable from a ref, newest first, like
+        `SpaceGitManager.history`.
+
+        The space's shared lock is held only while the next commit is
+        read.
+
+        Args:
+            ref (str): Branch, tag or commit to start from.
+            paths (Optional[List[str]]): Only commits touching these paths.
+            author (Optional[str]): Pattern matched against author name and
+                                    email.
+            since (Optional[TimeFilter]): Only commits after this time.
+            until (Optional[TimeFilter]): Only commits before this time.
+
+        Returns:
+            AsyncIterator[Commit]: Matching commits; none for an unborn
+                                   HEAD.
+
+        Raises:
+            SpaceGitException: If the ref does not exist or ``git log``
+            fails (while iterating).
+        """
+        args = log_args(
+            ref, [normalize_path(p) for p in paths or ()], author, since, until
+        )
+        return self._stream(
+            space_name, self._stream_history(space_name, ref, args)
+        )
+
+    async def _stream_history(
+        self, space_name: str, ref: str, args: List[str]
+    ) -> AsyncIterator[Commit]:
+        async with self._operation(
+            "history", space_name, exclusive=False, locked=False
+        ):
+            path = self._get_repo_path(space_name)
+            tip = await self._blocking(
+                resolve_commit, self.git_process, path, ref
+            )
+            if tip is None:
+                if ref == "HEAD":
+                    return
+                raise SpaceGitException(
+                    message=f"Unknown ref '{ref}'.",
+                    error_code="HISTORY_FAILED",
+                    metadata={"space": space_name, "ref": ref},
+                )
+            chunks = self.git_process.stream_async(args, path)
+            parsed = parse_log_stream_async(split_records_async(chunks, b"\0"))
+            try:
+                async for commit in parsed:
+                    yield commit
+            except SpaceGitException as e:
+                raise self._failure(
+                    e,
+                    "Failed to read history.",
+                    "HISTORY_FAILED",
+                    {"space": space_name, "args": args},
+                )
+            finally:
+                await parsed.aclose()
+                await chunks.aclose()
@@ -0,0 +1,315 @@
+import os
+import re
+import stat
+import threading
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .cat_file import CatFilePool
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+from .plumbing import resolve_commit
+from .status import StatusEntry, parse_porcelain_v2, status_args
+
+try:
+    from dulwich.errors import NotTreeError
+    from dulwich.object_store import tree_lookup_path
+    from dulwich.objects import Commit, Tag
+    from dulwich.repo import Repo
+except ImportError:  # pragma: no cover - optional dependency
+    Repo = None
+
+OPERATION_CLASSES = ("refs", "blobs", "status")
+
+# Ref names the in-process backend resolves itself; anything else (rev
+# expressions such as ``HEAD~1`` or ``main@{1}``) is left to git.
+_PLAIN_REF = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9._/-]*$")
+_HEX = re.compile(r"^[0-9a-f]+$")
+
+# Lookup order of git's rev-parse for a short ref name.
+_REF_PREFIXES = (
+    "{}",
+    "refs/{}",
+    "refs/tags/{}",
+    "refs/heads/{}",
+    "refs/remotes/{}",
+    "refs/remotes/{}/HEAD",
+)
+
+
+class GitBackend(ABC):
+    """
+    Read operations `SpaceGitManager` can serve without its usual git
+    subprocesses.
+
+    Operations are grouped into classes (see `OPERATION_CLASSES`) that are
+    assigned to backends independently. A backend lists the classes it can
+    be assigned to in ``operations``; its methods of the other classes
+    typically delegate to a fallback. Failures are raised as
+    `SpaceGitException`; the manager wraps them into its operation error
+    codes, so callers see the same codes whichever backend ran.
+    """
+
+    name = "abstract"
+    operations: FrozenSet[str] = frozenset()
+
+    @abstractmethod
+    def resolve_ref(self, repo_path: str, ref: str) -> Optional[str]:
+        """
+        ``refs``: Return the commit a ref points to, or None when it does
+        not resolve to a commit (including an unborn HEAD).
+        """
+
+    @abstractmethod
+    def read_blobs(
+        self, repo_path: str, ref: str, paths: Sequence[str]
+    ) -> List[Optional[bytes]]:
+        """
+        ``blobs``: Read the objects at ``<ref>:<path>``; None for each path
+        (or unknown ref) that does not exist.
+        """
+
+    @abstractmethod
+    def status(self, repo_path: str, untracked: bool) -> List[StatusEntry]:
+        """
+        ``status``: Working tree status with ``git status --porcelain=v2``
+        semantics.
+        """
+
+    def close(self) -> None:
+        """
+        Release cached resources.
+        """
+
+
+class SubprocessBackend(GitBackend):
+    """
+    Default backend running git: ``rev-parse`` for refs, the pooled
+    ``cat-file --batch`` processes for blobs and ``status --porcelain=v2``.
+    """
+
+    name = "subprocess"
+    operations = frozenset(OPERATION_CLASSES)
+
+    def __init__(
+        self,
+        git_process: Optional[GitProcess] = None,
+        cat_file_pool: Optional[CatFilePool] = None,
+    ) -> None:
+        self.git_process = git_process or GitProcess()
+        self.cat_file_pool = cat_file_pool or CatFilePool()
+
+    def resolve_ref(self, repo_path: str, ref: str) -> Optional[str]:
+        return resolve_commit(self.git_process, repo_path, ref)
+
+    def read_blobs(
+        self, repo_path: str, ref: str, paths: Sequence[str]
+    ) -> List[Optional[bytes]]:
+        specs = [f"{ref}:{p.lstrip('/')}" for p in paths]
+        return self.cat_file_pool.read_many(repo_path, specs)
+
+    def status(self, repo_path: str, untracked: bool) -> List[StatusEntry]:
+        out = self.git_process.run(status_args(untracked), repo_path)
+        return parse_porcelain_v2(out)
+
+    def close(self) -> None:
+        self.cat_file_pool.close()
+
+
+class InProcessBackend(GitBackend):
+    """
+    Backend reading refs and objects in-process through dulwich (install
+    the ``inprocess`` extra), avoiding a fork/exec per lookup.
+
+    It resolves plain ref names and full object ids following git's
+    rev-parse lookup order. Everything it cannot answer exactly like git
+    (rev expressions, abbreviated ids, trees or tags as the read ref) is
+    delegated to ``fallback``. ``status`` is not served in-process: git's
+    porcelain v2 semantics such as rename detection cannot be reproduced
+    faithfully, so status always runs on ``fallback``.
+
+    Repositories are opened once and reopened when their refs or packs
+    change on disk; access is serialized per backend.
+    """
+
+    name = "inprocess"
+    operations = frozenset({"refs", "blobs"})
+
+    def __init__(self, fallback: Optional[GitBackend] = None) -> None:
+        """
+        Args:
+            fallback (Optional[GitBackend]): Backend for lookups this one
+                                             delegates; a
+                                             `SubprocessBackend` when
+                                             omitted.
+
+        Raises:
+            SpaceGitException: If dulwich is not installed.
+        """
+        if Repo is None:
+            raise SpaceGitException(
+                message=(
+                    "The in-process backend needs dulwich; install "
+                    "darca-space-git[inprocess]."
+                ),
+                error_code="BACKEND_UNAVAILABLE",
+                metadata={"backend": self.name},
+            )
+        self.fallback = fallback or SubprocessBackend()
+        self._repos: Dict[str, Tuple[Tuple[float, ...], Any]] = {}
+        self._lock = threading.Lock()
+
+    def resolve_ref(self, repo_path: str, ref: str) -> Optional[str]:
+        if not self._is_plain(ref):
+            return self.fallback.resolve_ref(repo_path, ref)
+        with self._lock:
+            repo = self._repo(repo_path)
+            if repo is not None:
+                sha = self._lookup(repo, ref)
+                commit = sha and self._peel_to_commit(repo, sha)
+        # Abbreviated ids are left to git and its ambiguity rules.
+        if repo is None or (not sha and _HEX.match(ref) and len(ref) < 40):
+            return self.fallback.resolve_ref(repo_path, ref)
+        return commit.id.decode("ascii") if commit else None
+
+    def read_blobs(
+        self, repo_path: str, ref: str, paths: Sequence[str]
+    ) -> List[Optional[bytes]]:
+        names = [p.lstrip("/") for p in paths]
+        if not self._is_plain(ref) or not all(map(self._is_plain_path, names)):
+            return self.fallback.read_blobs(repo_path, ref, paths)
+        with self._lock:
+            repo = self._repo(repo_path)
+            sha = repo and self._lookup(repo, ref)
+            commit = sha and self._peel_to_commit(repo, sha)
+            if commit:
+                return [self._read(repo, commit.tree, name) for name in names]
+        # Unknown refs, abbreviated ids, tree-ish objects other than commits
+        # and unreadable repositories take git's path.
+        return self.fallback.read_blobs(repo_path, ref, paths)
+
+    def status(self, repo_path: str, untracked: bool) -> List[StatusEntry]:
+        return self.fallback.status(repo_path, untracked)
+
+    def close(self) -> None:
+        with self._lock:
+            repos = [repo for _, repo in self._repos.values()]
+            self._repos.clear()
+        for repo in repos:
+            repo.close()
+        self.fallback.close()
+
+    @staticmethod
+    def _is_plain(ref: str) -> bool:
+        return bool(_PLAIN_REF.match(ref)) and ".." not in ref
+
+    @staticmethod
+    def _is_plain_path(path: str) -> bool:
+        return path == "" or all(
+            part not in ("", ".", "..") for part in path.split("/")
+        )
+
+    def _repo(self, repo_path: str) -> Any:
+        """
+        Return the open repository at a path, or None if dulwich cannot
+        open it.
+        """
+        key = os.path.realpath(repo_path)
+        cached = self._repos.get(key)
+        if cached is not None:
+            if cached[0] == self._fingerprint(cached[1]):
+                return cached[1]
+            cached[1].close()
+            del self._repos[key]
+        try:
+            repo = Repo(key)
+        except Exception:  # not a repository, or unsupported by dulwich
+            return None
+        self._repos[key] = (self._fingerprint(repo), repo)
+        return repo
+
+    @staticmethod
+    def _fingerprint(repo: Any) -> Tuple[float, ...]:
+        """
+        Modification times of the files whose changes dulwich may not
+        notice on an open repository. They live in the common git
+        directory, which linked worktrees share with the main one.
+        """
+        git_dir = repo.commondir()
+        times = []
+        for name in ("packed-refs", os.path.join("objects", "pack")):
+            try:
+                times.append(os.stat(os.path.join(git_dir, name)).st_mtime)
+            except OSError:
+                times.append(0.0)
+        return tuple(times)
+
+    @staticmethod
+    def _lookup(repo: Any, ref: str) -> Optional[bytes]:
+        if len(ref) == 40 and _HEX.match(ref):
+            sha = ref.encode("ascii")
+            return sha if sha in repo.object_store else None
+        for prefix in _REF_PREFIXES:
+            try:
+                return repo.refs[prefix.format(ref).encode("utf-8")]
+            except (KeyError, ValueError):
+                continue
+        return None
+
+    @staticmethod
+    def _peel_to_commit(repo: Any, sha: bytes) -> Any:
+        try:
+            obj = repo[sha]
+            while isinstance(obj, Tag):
+                obj = repo[obj.object[1]]
+        except KeyError:
+            return None
+        return obj if isinstance(obj, Commit) else None
+
+    @staticmethod
+    def _read(repo: Any, tree: bytes, path: str) -> Optional[bytes]:
+        if not path:
+            return repo[tree].as_raw_string()
+        try:
+            mode, sha = tree_lookup_path(
+                repo.__getitem__, tree, path.encode("utf-8")
+            )
+            if stat.S_ISDIR(mode) or stat.S_ISREG(mode) or stat.S_ISLNK(mode):
+                return repo[sha].as_raw_string()
+        except (KeyError, NotTreeError):
+            pass
+        # Submodule entries point at commits outside this repository.
+        return None
+
+
+def validate_backends(
+    backends: Optional[Mapping[str, GitBackend]],
+) -> Dict[str, GitBackend]:
+    """
+    Check a mapping of operation class to backend.
+
+    Raises:
+        SpaceGitException: If an operation class is unknown or assigned to a
+        backend that does not implement it.
+    """
+    checked = dict(backends or {})
+    for operation, backend in checked.items():
+        if operation not in backend.operations:
+            raise SpaceGitException(
+                message=(
+                    f"Backend '{backend.name}' cannot serve '{operation}'; "
+                    f"operation classes are {', '.join(OPERATION_CLASSES)}."
+                ),
+                error_code="INVALID_BACKEND",
+                metadata={"operation": operation, "backend": backend.name},
+            )
+    return checked
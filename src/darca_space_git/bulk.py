@@ -0,0 +1,311 @@
+import pickle  # nosec B403
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlsplit
+
+from .exceptions import SpaceGitException
+
+_SCP_LIKE_URL = re.compile(r"^(?:[^@/]+@)?([^:/]+):(?!//)")
+_REMOTE_SECTION = re.compile(r'^\s*\[remote\s+"([^"]+)"\]\s*$')
+_URL_KEY = re.compile(r"^\s*url\s*=\s*(.+?)\s*$")
+
+
+@dataclass(frozen=True)
+class BulkResult:
+    """
+    Outcome of one space within a bulk operation.
+
+    Attributes:
+        space_name (str): The space the operation ran against.
+        operation (str): Name of the `SpaceGitManager` method.
+        value (Any): Return value of the method when it succeeded.
+        error (Optional[SpaceGitException]): The failure, if any.
+        elapsed (float): Wall time of the operation in seconds.
+    """
+
+    space_name: str
+    operation: str
+    value: Any = None
+    error: Optional[SpaceGitException] = field(default=None, compare=False)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def remote_host(url: Optional[str]) -> Optional[str]:
+    """
+    Extract the host part of a git remote URL.
+
+    Handles ``scheme://host/...`` and scp-like ``user@host:path`` URLs.
+    Local paths and ``file://`` URLs have no host and return ``None``.
+    """
+    if not url:
+        return None
+    if "://" in url:
+        return urlsplit(url).hostname or None
+    match = _SCP_LIKE_URL.match(url)
+    return match.group(1) if match else None
+
+
+def read_remote_url(repo_path: str, remote: str = "origin") -> Optional[str]:
+    """
+    Read the URL of a remote straight from ``.git/config``.
+
+    This avoids a git subprocess per space when grouping a fleet by host.
+    Returns ``None`` when the repository or remote is not configured.
+    """
+    current = None
+    try:
+        with open(f"{repo_path}/.git/config", encoding="utf-8") as config:
+            for line in config:
+                section = _REMOTE_SECTION.match(line)
+                if section:
+                    current = section.group(1)
+                    continue
+                if line.lstrip().startswith("["):
+                    current = None
+                    continue
+                url = _URL_KEY.match(line)
+                if url and current == remote:
+                    return url.group(1)
+    except OSError:
+        return None
+    return None
+
+
+def _call(
+    fn: Callable[..., Any], space_name: str, operation: str, kwargs: dict
+) -> BulkResult:
+    start = time.perf_counter()
+    try:
+        value = fn(space_name, **kwargs)
+    except SpaceGitException as e:
+        return BulkResult(
+            space_name, operation, error=e, elapsed=time.perf_counter() - start
+        )
+    except Exception as e:
+        error = SpaceGitException(
+            message=f"Unexpected error during {operation}.",
+            error_code="BULK_OPERATION_FAILED",
+            metadata={"space": space_name, "operation": operation},
+            cause=e,
+        )
+        return BulkResult(
+            space_name,
+            operation,
+            error=error,
+            elapsed=time.perf_counter() - start,
+        )
+    return BulkResult(
+        space_name, operation, value=value, elapsed=time.perf_counter() - start
+    )
+
+
+_process_managers: Dict[Tuple[type, bytes], Any] = {}
+
+
+def _no_state(space_name: str) -> dict:
+    return {}
+
+
+def _with_state(manager: Any, operation: str, state: dict) -> Callable:
+    """
+    Return the operation of a worker's manager, restoring the submitting
+    manager's per-space ``state`` first.
+    """
+    run = getattr(manager, operation)
+    if not state:
+        return run
+
+    def call(space_name: str, **kwargs: Any) -> Any:
+        manager.restore_process_state(space_name, state)
+        return run(space_name, **kwargs)
+
+    return call
+
+
+def _process_call(
+    manager_cls: type,
+    settings: bytes,
+    operation: str,
+    space_name: str,
+    kwargs: dict,
+    state: Optional[dict] = None,
+) -> Tuple[str, Any, Optional[tuple], float]:
+    """
+    Entry point for process pools: one manager per worker process and
+    configuration, built from the pickled ``process_settings`` of the
+    submitting manager. ``state`` is the submitting manager's
+    ``process_state`` of the space, such as its active worktree.
+
+    Exceptions are flattened to plain tuples because the darca exception
+    hierarchy is not guaranteed to survive pickling.
+    """
+    key = (manager_cls, settings)
+    manager = _process_managers.get(key)
+    if manager is None:
+        manager = _process_managers[key] = manager_cls(
+            **pickle.loads(settings)  # nosec B301 - from the parent process
+        )
+    result = _call(
+        _with_state(manager, operation, state or {}),
+        space_name,
+        operation,
+        kwargs,
+    )
+    error = None
+    if result.error is not None:
+        error = (
+            result.error.message,
+            result.error.error_code,
+            result.error.metadata,
+            repr(result.error.cause) if result.error.cause else None,
+        )
+    return space_name, result.value, error, result.elapsed
+
+
+def _from_process(operation: str, payload: tuple) -> BulkResult:
+    space_name, value, error, elapsed = payload
+    if error is None:
+        return BulkResult(space_name, operation, value=value, elapsed=elapsed)
+    message, error_code, metadata, cause = error
+    if cause:
+        metadata = dict(metadata or {}, cause=cause)
+    return BulkResult(
+        space_name,
+        operation,
+        error=SpaceGitException(message, error_code, metadata),
+        elapsed=elapsed,
+    )
+
+
+def run_bulk(
+    manager: Any,
+    operation: str,
+    space_names: Iterable[str],
+    kwargs: Optional[dict] = None,
+    max_workers: int = 8,
+    per_host_limit: Optional[int] = None,
+    host_of: Optional[Callable[[str], Optional[str]]] = None,
+    executor: Optional[Executor] = None,
+) -> Iterator[BulkResult]:
+    """
+    Run a manager operation over many spaces and yield results as they
+    complete.
+
+    At most ``max_workers`` operations are in flight, and at most
+    ``per_host_limit`` per remote host. Spaces waiting on a saturated host
+    do not block spaces on other hosts.
+
+    Args:
+        manager: The `SpaceGitManager` whose method is invoked.
+        operation (str): Method name, e.g. ``"pull_repo"``.
+        space_names (Iterable[str]): Spaces to process.
+        kwargs (Optional[dict]): Extra keyword arguments for every call.
+        max_workers (int): Global concurrency cap.
+        per_host_limit (Optional[int]): Concurrency cap per remote host.
+        host_of (Optional[Callable]): Maps a space to its remote host.
+        executor (Optional[Executor]): Pool to run on. A thread pool of
+                                       ``max_workers`` is created when
+                                       omitted. With a `ProcessPoolExecutor`
+                                       each worker builds its own manager of
+                                       the same class from the manager's
+                                       ``process_settings()``, when it
+                                       defines them, and restores the
+                                       space's ``process_state()`` (e.g.
+                                       the active worktree) as it was at
+                                       submission.
+
+    Yields:
+        BulkResult: One result per space, in completion order.
+    """
+    kwargs = kwargs or {}
+    owns_executor = executor is None
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="space-git-bulk"
+        )
+    in_process = isinstance(executor, ProcessPoolExecutor)
+    fn = getattr(manager, operation)
+    settings = b""
+    state_of: Callable[[str], dict] = _no_state
+    if in_process:
+        settings = pickle.dumps(getattr(manager, "process_settings", dict)())
+        state_of = getattr(manager, "process_state", _no_state)
+
+    queues: "OrderedDict[Optional[str], Deque[str]]" = OrderedDict()
+    for space_name in space_names:
+        host = host_of(space_name) if per_host_limit and host_of else None
+        queues.setdefault(host, deque()).append(space_name)
+
+    running: Dict[Future, Optional[str]] = {}
+    active: Dict[Optional[str], int] = {}
+
+    def fill() -> None:
+        for host in list(queues):
+            queue = queues[host]
+            while queue and len(running) < max_workers:
+                if host is not None and active.get(host, 0) >= per_host_limit:
+                    break
+                space_name = queue.popleft()
+                if in_process:
+                    future = executor.submit(
+                        _process_call,
+                        type(manager),
+                        settings,
+                        operation,
+                        space_name,
+                        kwargs,
+                        state_of(space_name),
+                    )
+                else:
+                    future = executor.submit(
+                        _call, fn, space_name, operation, kwargs
+                    )
+                running[future] = host
+                active[host] = active.get(host, 0) + 1
+            if not queue:
+                del queues[host]
+            if len(running) >= max_workers:
+                return
+
+    try:
+        fill()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                host = running.pop(future)
+                active[host] -= 1
+                payload = future.result()
+                if in_process:
+                    yield _from_process(operation, payload)
+                else:
+                    yield payload
+            fill()
+    finally:
+        for future in running:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,274 @@
+import os
+import subprocess  # nosec B404
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from .exceptions import SpaceGitException
+
+# Requests are written in batches small enough to fit in a pipe buffer, so
+# git can never block on a full stdout while we are still writing stdin.
+_MAX_BATCH_BYTES = 32 * 1024
+
+
+def parse_batch_output(data: bytes) -> List[Optional[bytes]]:
+    """
+    Parse the complete output of a one-shot ``git cat-file --batch`` call.
+
+    Returns:
+        List[Optional[bytes]]: Blob contents in request order; ``None``
+                               when the object is missing or not a blob.
+
+    Raises:
+        SpaceGitException: If the output is truncated.
+    """
+    results: List[Optional[bytes]] = []
+    start = 0
+    while start < len(data):
+        end = data.find(b"\n", start)
+        if end < 0:
+            raise _truncated()
+        fields = data[start:end].split()
+        start = end + 1
+        if len(fields) != 3:
+            # "<name> missing" or "<name> ambiguous"
+            results.append(None)
+            continue
+        _, object_type, size = fields
+        end = start + int(size)
+        if len(data) <= end:
+            raise _truncated()
+        results.append(data[start:end] if object_type == b"blob" else None)
+        start = end + 1
+    return results
+
+
+def _truncated() -> SpaceGitException:
+    return SpaceGitException(
+        message="git cat-file returned a truncated object.",
+        error_code="GIT_COMMAND_FAILED",
+    )
+
+
+class CatFileBatch:
+    """
+    A long-lived ``git cat-file --batch`` process bound to one repository.
+
+    Each lookup costs one pipe round-trip instead of a process spawn.
+    Instances are not meant to be shared directly; use `CatFilePool`.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        git_binary: str = "git",
+        env: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.repo_path = repo_path
+        self.last_used = time.monotonic()
+        # Pool bookkeeping: threads using the process, and whether it left
+        # the pool and must be closed once the last of them is done.
+        self.users = 0
+        self.retired = False
+        self._lock = threading.Lock()
+        self._proc = subprocess.Popen(  # nosec B603
+            [git_binary, "cat-file", "--batch"],
+            cwd=repo_path,
+            env=env,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def read_many(self, specs: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        Read objects by ``<ref>:<path>`` specification.
+
+        Args:
+            specs (Sequence[str]): Object names understood by git.
+
+        Returns:
+            List[Optional[bytes]]: Blob contents in request order; ``None``
+                                   when the object is missing or not a blob.
+
+        Raises:
+            SpaceGitException: If the process died or the protocol broke.
+        """
+        for spec in specs:
+            if "\n" in spec:
+                raise SpaceGitException(
+                    message="Object names may not contain newlines.",
+                    error_code="INVALID_PATH",
+                    metadata={"spec": spec},
+                )
+
+        results: List[Optional[bytes]] = []
+        with self._lock:
+            try:
+                start = 0
+                while start < len(specs):
+                    end, size = start, 0
+                    while end < len(specs) and (
+                        end == start or size < _MAX_BATCH_BYTES
+                    ):
+                        size += len(specs[end]) + 1
+                        end += 1
+                    batch = specs[start:end]
+                    request = "".join(f"{spec}\n" for spec in batch)
+                    self._proc.stdin.write(os.fsencode(request))
+                    self._proc.stdin.flush()
+                    results.extend(self._read_response() for _ in batch)
+                    start = end
+            except (OSError, ValueError) as e:
+                self.close()
+                raise SpaceGitException(
+                    message="git cat-file process failed.",
+                    error_code="GIT_COMMAND_FAILED",
+                    metadata={"repo": self.repo_path},
+                    cause=e,
+                )
+        return results
+
+    def _read_response(self) -> Optional[bytes]:
+        header = self._proc.stdout.readline()
+        if not header.endswith(b"\n"):
+            raise OSError("git cat-file closed its output")
+        fields = header.split()
+        if len(fields) != 3:
+            # "<name> missing" or "<name> ambiguous"
+            return None
+        _, object_type, size = fields
+        body = self._proc.stdout.read(int(size) + 1)
+        if len(body) != int(size) + 1:
+            raise OSError("git cat-file returned a truncated object")
+        return body[:-1] if object_type == b"blob" else None
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            try:
+                self._proc.stdin.close()
+                self._proc.wait(timeout=1)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+                self._proc.wait()
+
+
+class CatFilePool:
+    """
+    Pool of `CatFileBatch` processes, one per repository path.
+
+    Processes idle for longer than ``idle_timeout`` are closed on the next
+    pool access, and the least recently used process is evicted when
+    ``max_processes`` is reached. Processes are checked out for each read,
+    so one evicted while another thread uses it is closed only when that
+    read finishes. A failed process is replaced and the request retried
+    once.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: float = 300.0,
+        max_processes: int = 64,
+        git_binary: str = "git",
+        env: Optional[Dict[str, str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.max_processes = max_processes
+        self.git_binary = git_binary
+        self.env = env
+        self._clock = clock
+        self._processes: Dict[str, CatFileBatch] = {}
+        self._lock = threading.Lock()
+
+    def read_many(
+        self, repo_path: str, specs: Sequence[str]
+    ) -> List[Optional[bytes]]:
+        """
+        Read objects from a repository through its pooled process.
+        """
+        try:
+            with self._checkout(repo_path) as batch:
+                return batch.read_many(specs)
+        except SpaceGitException as e:
+            if e.error_code != "GIT_COMMAND_FAILED":
+                raise
+            with self._checkout(repo_path) as batch:
+                return batch.read_many(specs)
+
+    @contextmanager
+    def _checkout(self, repo_path: str) -> Iterator[CatFileBatch]:
+        with self._lock:
+            batch = self._acquire(repo_path)
+            batch.users += 1
+        try:
+            yield batch
+        finally:
+            with self._lock:
+                batch.users -= 1
+                batch.last_used = self._clock()
+                close = batch.retired and batch.users == 0
+            if close:
+                batch.close()
+
+    def _acquire(self, repo_path: str) -> CatFileBatch:
+        self._evict_idle()
+        batch = self._processes.get(repo_path)
+        if batch is not None and batch.alive:
+            batch.last_used = self._clock()
+            return batch
+        if batch is not None:
+            self._retire(self._processes.pop(repo_path))
+        if len(self._processes) >= self.max_processes:
+            oldest = min(
+                self._processes.values(),
+                key=lambda b: (b.users > 0, b.last_used),
+            )
+            self._retire(self._processes.pop(oldest.repo_path))
+        batch = CatFileBatch(repo_path, self.git_binary, self.env)
+        batch.last_used = self._clock()
+        self._processes[repo_path] = batch
+        return batch
+
+    @staticmethod
+    def _retire(batch: CatFileBatch) -> None:
+        # Called with the pool lock held; busy processes are closed by the
+        # last thread checking them back in.
+        batch.retired = True
+        if batch.users == 0:
+            batch.close()
+
+    def _evict_idle(self) -> None:
+        deadline = self._clock() - self.idle_timeout
+        for path, batch in list(self._processes.items()):
+            if batch.users == 0 and (
+                batch.last_used < deadline or not batch.alive
+            ):
+                self._retire(self._processes.pop(path))
+
+    def evict_idle(self) -> None:
+        """
+        Close every process that exceeded the idle timeout.
+        """
+        with self._lock:
+            self._evict_idle()
+
+    def close(self, repo_path: Optional[str] = None) -> None:
+        """
+        Close the process of one repository, or all of them. Processes in
+        use are closed as soon as their current read finishes.
+        """
+        with self._lock:
+            paths = list(self._processes) if repo_path is None else [repo_path]
+            for path in paths:
+                batch = self._processes.pop(path, None)
+                if batch is not None:
+                    self._retire(batch)
+
+    def __len__(self) -> int:
+        return len(self._processes)
@@ -0,0 +1,157 @@
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+
+# Type changes (e.g. file to symlink) are reported as modifications.
+_BUCKET_BY_STATUS = {"A": 0, "M": 1, "T": 1, "D": 2}
+
+
+@dataclass(frozen=True)
+class PullResult:
+    """
+    What a change-aware pull did to a space.
+
+    Attributes:
+        old_head (Optional[str]): HEAD before the pull (None if unborn).
+        new_head (Optional[str]): HEAD after the pull.
+        added (Tuple[str, ...]): Paths that did not exist before.
+        modified (Tuple[str, ...]): Paths whose content or type changed.
+        deleted (Tuple[str, ...]): Paths that no longer exist.
+        fetched (bool): False when the remote matched the tracking branch
+                        and the fetch was skipped.
+    """
+
+    old_head: Optional[str]
+    new_head: Optional[str]
+    added: Tuple[str, ...] = ()
+    modified: Tuple[str, ...] = ()
+    deleted: Tuple[str, ...] = ()
+    fetched: bool = True
+
+    @property
+    def changed(self) -> bool:
+        return self.old_head != self.new_head
+
+    @property
+    def paths(self) -> Tuple[str, ...]:
+        return self.added + self.modified + self.deleted
+
+
+def parse_name_status(
+    output: bytes,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Split ``git diff-tree -r -z --name-status --no-renames`` output into
+    added, modified and deleted paths.
+    """
+    buckets: Tuple[List[str], List[str], List[str]] = ([], [], [])
+    fields = output.split(b"\0")
+    for i in range(0, len(fields) - 1, 2):
+        status = fields[i].decode("ascii")[:1]
+        bucket = _BUCKET_BY_STATUS.get(status)
+        if bucket is not None:
+            buckets[bucket].append(os.fsdecode(fields[i + 1]))
+    return tuple(buckets[0]), tuple(buckets[1]), tuple(buckets[2])
+
+
+def changed_paths(
+    git_process: GitProcess,
+    repo_path: str,
+    old: Optional[str],
+    new: Optional[str],
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """
+    List the paths that differ between two commits.
+
+    Returns:
+        Tuple: ``(added, modified, deleted)`` paths.
+    """
+    if old == new or new is None:
+        return (), (), ()
+    if old is None:
+        out = git_process.run(
+            ["ls-tree", "-r", "-z", "--name-only", new], repo_path
+        )
+        return tuple(os.fsdecode(p) for p in out.split(b"\0") if p), (), ()
+    out = git_process.run(
+        [
+            "diff-tree",
+            "-r",
+            "-z",
+            "--no-commit-id",
+            "--name-status",
+            "--no-renames",
+            old,
+            new,
+        ],
+        repo_path,
+    )
+    return parse_name_status(out)
+
+
+def upstream_of(
+    git_process: GitProcess, repo_path: str
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Return ``(remote, remote_ref, tracking_ref)`` of the checked-out branch,
+    or None when HEAD is detached or the branch has no upstream.
+    """
+    try:
+        head_ref = (
+            git_process.run(["symbolic-ref", "-q", "HEAD"], repo_path)
+            .decode("utf-8")
+            .strip()
+        )
+        out = git_process.run(
+            [
+                "for-each-ref",
+                "--format=%(upstream:remotename)%00"
+                "%(upstream:remoteref)%00%(upstream)",
+                head_ref,
+            ],
+            repo_path,
+        )
+    except SpaceGitException:
+        return None
+    fields = out.decode("utf-8").rstrip("\n").split("\0")
+    if len(fields) != 3 or not all(fields):
+        return None
+    return fields[0], fields[1], fields[2]
+
+
+def remote_matches_tracking(
+    git_process: GitProcess, repo_path: str
+) -> Optional[bool]:
+    """
+    Ask the remote for the upstream branch tip with one ``ls-remote`` and
+    compare it to the local tracking ref, which must also be merged into
+    HEAD.
+
+    Returns:
+        Optional[bool]: True when a pull would change nothing, False when
+                        it would, None when there is no upstream to compare.
+    """
+    upstream = upstream_of(git_process, repo_path)
+    if upstream is None:
+        return None
+    remote, remote_ref, tracking_ref = upstream
+    out = git_process.run(["ls-remote", remote, remote_ref], repo_path)
+    line = out.decode("ascii").split("\n", 1)[0]
+    remote_oid = line.split("\t", 1)[0] if line else None
+    try:
+        tracking_oid = (
+            git_process.run(
+                ["rev-parse", "--verify", "-q", tracking_ref], repo_path
+            )
+            .decode("ascii")
+            .strip()
+        )
+        git_process.run(
+            ["merge-base", "--is-ancestor", tracking_oid, "HEAD"], repo_path
+        )
+    except SpaceGitException:
+        return False
+    return remote_oid == tracking_oid
@@ -0,0 +1,350 @@
+"""
+Command line interface of darca-space-git.
+
+``darca-space-git batch`` reads operations as JSON lines from stdin or a
+file, runs them in parallel on one `SpaceGitManager` and writes one JSON
+result line per operation as it completes. Operations on the same space run
+one at a time in input order; different spaces run concurrently.
+
+Each input line names a manager method, the space and keyword arguments::
+
+    {"id": 1, "op": "pull_changes", "space": "docs", "args": {"timeout": 60}}
+    {"id": 2, "op": "commit_file", "space": "docs",
+     "args": {"relative_path": "a.txt", "message": "m", "content": "x"}}
+
+Each result line carries the ``id`` (the line number when omitted), ``ok``,
+the JSON-encoded ``result`` or the ``error_code``, ``error`` and
+``metadata`` of the failure, and timings: ``queued`` (seconds waiting for a
+worker or for earlier operations on the space) and ``elapsed``.
+"""
+
+import argparse
+import base64
+import inspect
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable as AnyIterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+)
+
+from .exceptions import SpaceGitException
+from .space_git import SpaceGitManager
+
+# Space methods that need Python objects JSON cannot carry.
+_UNSUPPORTED = frozenset({"export", "enqueue_commit"})
+
+
+def batch_operations(manager_cls: type = SpaceGitManager) -> List[str]:
+    """
+    Return the manager methods batch mode accepts: every public method
+    operating on a single space.
+    """
+    names = []
+    for name, fn in inspect.getmembers(manager_cls, inspect.isfunction):
+        if name.startswith("_") or name in _UNSUPPORTED:
+            continue
+        params = list(inspect.signature(fn).parameters)
+        if params[1:2] == ["space_name"]:
+            names.append(name)
+    return names
+
+
+def to_json(value: Any) -> Any:
+    """
+    Convert an operation result into JSON-compatible data: dataclasses
+    become objects, iterables lists and bytes ``{"base64": ...}``.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return {"base64": base64.b64encode(value).decode("ascii")}
+    if is_dataclass(value) and not isinstance(value, type):
+        return {f.name: to_json(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, AnyIterable):
+        return [to_json(v) for v in value]
+    return str(value)
+
+
+@dataclass
+class _Job:
+    id: Any
+    op: Optional[str] = None
+    space: Optional[str] = None
+    args: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[SpaceGitException] = None
+    submitted: float = field(default_factory=time.perf_counter)
+
+
+class BatchRunner:
+    """
+    Run a stream of operations on a manager with bounded parallelism while
+    keeping the order of operations per space.
+    """
+
+    def __init__(
+        self, manager: Any, workers: int = 8, max_pending: int = 1000
+    ) -> None:
+        """
+        Args:
+            manager: The `SpaceGitManager` to run operations on.
+            workers (int): Operations running at the same time.
+            max_pending (int): Operations read ahead of their results; input
+                               is not read further until results catch up.
+
+        Raises:
+            SpaceGitException: If ``workers`` or ``max_pending`` is below 1.
+        """
+        if workers < 1 or max_pending < 1:
+            raise SpaceGitException(
+                message="workers and max_pending must be at least 1.",
+                error_code="INVALID_BATCH_OPTIONS",
+                metadata={"workers": workers, "max_pending": max_pending},
+            )
+        self.manager = manager
+        self.workers = workers
+        self.max_pending = max_pending
+        self.operations = frozenset(batch_operations(type(manager)))
+
+    def parse(self, line_no: int, line: str) -> _Job:
+        """
+        Parse one input line; problems are recorded on the job.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("a request must be a JSON object")
+        except ValueError as e:
+            return _Job(line_no, error=self._invalid(line_no, e))
+        job = _Job(
+            request.get("id", line_no),
+            request.get("op"),
+            request.get("space"),
+            request.get("args") or {},
+        )
+        try:
+            if job.op not in self.operations:
+                raise ValueError(f"unknown operation {job.op!r}")
+            if not isinstance(job.space, str) or not job.space:
+                raise ValueError("'space' must be a non-empty string")
+            if not isinstance(job.args, dict):
+                raise ValueError("'args' must be a JSON object")
+            fn = getattr(self.manager, job.op)
+            inspect.signature(fn).bind(job.space, **job.args)
+        except (ValueError, TypeError) as e:
+            job.error = self._invalid(line_no, e)
+        return job
+
+    @staticmethod
+    def _invalid(line_no: int, cause: Exception) -> SpaceGitException:
+        return SpaceGitException(
+            message=f"Invalid batch request on line {line_no}: {cause}",
+            error_code="INVALID_BATCH_REQUEST",
+            metadata={"line": line_no},
+        )
+
+    def run(self, lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Run the operations of JSON lines and yield result objects in
+        completion order. Blank lines are skipped.
+        """
+        results: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        slots = threading.BoundedSemaphore(self.max_pending)
+        lock = threading.Lock()
+        # Spaces with a running operation -> their operations waiting.
+        busy: Dict[str, Deque[_Job]] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="space-git-batch"
+        )
+        failures: List[BaseException] = []
+
+        def finish(result: Dict[str, Any]) -> None:
+            results.put(result)
+            slots.release()
+
+        def work(job: _Job) -> None:
+            finish(self._execute(job))
+            with lock:
+                waiting = busy[job.space]
+                following = waiting.popleft() if waiting else None
+                if following is None:
+                    del busy[job.space]
+            if following is not None:
+                executor.submit(work, following)
+
+        def read() -> None:
+            try:
+                for line_no, line in enumerate(lines, 1):
+                    if not line.strip():
+                        continue
+                    slots.acquire()
+                    job = self.parse(line_no, line)
+                    if job.error is not None:
+                        finish(self._result(job, 0.0, error=job.error))
+                        continue
+                    with lock:
+                        if job.space in busy:
+                            busy[job.space].append(job)
+                            continue
+                        busy[job.space] = deque()
+                    executor.submit(work, job)
+            except BaseException as e:  # reported by the consuming thread
+                failures.append(e)
+            finally:
+                # Wait for every slot to come back: all results are queued.
+                for _ in range(self.max_pending):
+                    slots.acquire()
+                results.put(None)
+
+        reader = threading.Thread(
+            target=read, name="space-git-batch-reader", daemon=True
+        )
+        reader.start()
+        try:
+            while True:
+                result = results.get()
+                if result is None:
+                    break
+                yield result
+            if failures:
+                raise failures[0]
+        finally:
+            executor.shutdown(wait=True)
+
+    def _execute(self, job: _Job) -> Dict[str, Any]:
+        started = time.perf_counter()
+        queued = started - job.submitted
+        try:
+            value = to_json(
+                getattr(self.manager, job.op)(job.space, **job.args)
+            )
+        except SpaceGitException as e:
+            return self._result(job, queued, started, error=e)
+        except Exception as e:
+            error = SpaceGitException(
+                message=f"Unexpected error during {job.op}: {e!r}",
+                error_code="BATCH_OPERATION_FAILED",
+                metadata={"space": job.space, "operation": job.op},
+                cause=e,
+            )
+            return self._result(job, queued, started, error=error)
+        return self._result(job, queued, started, value=value)
+
+    @staticmethod
+    def _result(
+        job: _Job,
+        queued: float,
+        started: Optional[float] = None,
+        value: Any = None,
+        error: Optional[SpaceGitException] = None,
+    ) -> Dict[str, Any]:
+        elapsed = 0.0 if started is None else time.perf_counter() - started
+        result = {
+            "id": job.id,
+            "op": job.op,
+            "space": job.space,
+            "ok": error is None,
+            "result": value,
+            "error_code": None,
+            "error": None,
+            "metadata": None,
+            "queued": round(queued, 6),
+            "elapsed": round(elapsed, 6),
+        }
+        if error is not None:
+            result["error_code"] = error.error_code
+            result["error"] = error.message
+            result["metadata"] = to_json(error.metadata)
+        return result
+
+
+def _batch(args: argparse.Namespace, stdin: TextIO, stdout: TextIO) -> int:
+    timeouts = {"default": args.timeout} if args.timeout else None
+    manager = SpaceGitManager(timeouts=timeouts)
+    source = stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = (
+        stdout
+        if args.output == "-"
+        else open(args.output, "w", encoding="utf-8")
+    )
+    failed = 0
+    try:
+        runner = BatchRunner(manager, args.workers, args.max_pending)
+        for result in runner.run(source):
+            failed += not result["ok"]
+            sink.write(json.dumps(result) + "\n")
+            sink.flush()
+    finally:
+        manager.close()
+        if source is not stdin:
+            source.close()
+        if sink is not stdout:
+            sink.close()
+    return 1 if failed else 0
+
+
+def main(
+    argv: Optional[List[str]] = None,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None,
+) -> int:
+    """
+    Entry point of the ``darca-space-git`` command.
+
+    Returns:
+        int: ``0`` when every operation succeeded, ``1`` otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="darca-space-git",
+        description="Git operations on darca spaces.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    batch = commands.add_parser(
+        "batch",
+        help="run JSONL operations, writing JSONL results",
+        description=__doc__.split("\n\n")[1],
+    )
+    batch.add_argument(
+        "--input", default="-", help="JSONL operations file (default stdin)"
+    )
+    batch.add_argument(
+        "--output", default="-", help="JSONL results file (default stdout)"
+    )
+    batch.add_argument(
+        "--workers", type=int, default=8, help="concurrent operations"
+    )
+    batch.add_argument(
+        "--max-pending",
+        type=int,
+        default=1000,
+        help="operations read ahead of their results",
+    )
+    batch.add_argument(
+        "--timeout",
+        type=float,
+        help="default deadline in seconds for every operation",
+    )
+    args = parser.parse_args(argv)
+    try:
+        return _batch(args, stdin or sys.stdin, stdout or sys.stdout)
+    except (SpaceGitException, OSError) as e:
+        parser.exit(2, f"darca-space-git: error: {e}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
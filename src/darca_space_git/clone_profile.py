@@ -0,0 +1,150 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+from .exceptions import SpaceGitException
+
+PROFILE_FILE = "darca-clone-profile.json"
+
+
+@dataclass(frozen=True)
+class CloneProfile:
+    """
+    How much of a remote a space clones.
+
+    Attributes:
+        depth (Optional[int]): Keep only this many commits of history.
+        shallow_since (Optional[str]): Keep only history after this date.
+        filter (Optional[str]): Partial clone filter such as ``blob:none``
+                                or ``tree:0``.
+        single_branch (bool): Fetch only one branch.
+        branch (Optional[str]): Branch to check out (and to track with
+                                ``single_branch``).
+        sparse_paths (Tuple[str, ...]): Directories to check out in cone
+                                        mode; everything else stays out of
+                                        the working tree.
+
+    Git itself keeps the filter, the single-branch refspec and the sparse
+    patterns after the clone. ``depth`` and ``shallow_since`` are not
+    remembered by git, so the profile is stored in the repository and
+    reapplied after every pull to keep the history from deepening.
+    """
+
+    depth: Optional[int] = None
+    shallow_since: Optional[str] = None
+    filter: Optional[str] = None
+    single_branch: bool = False
+    branch: Optional[str] = None
+    sparse_paths: Tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "sparse_paths", tuple(self.sparse_paths))
+        problem = None
+        if self.depth is not None and self.depth < 1:
+            problem = "depth must be at least 1"
+        elif self.depth is not None and self.shallow_since:
+            problem = "depth and shallow_since are mutually exclusive"
+        elif self.filter is not None and not self.filter.strip():
+            problem = "filter must not be empty"
+        elif any(
+            not p or "\n" in p or p.startswith("/") for p in self.sparse_paths
+        ):
+            problem = "sparse paths must be non-empty relative paths"
+        if problem:
+            raise SpaceGitException(
+                message=f"Invalid clone profile: {problem}.",
+                error_code="INVALID_CLONE_PROFILE",
+                metadata={"profile": asdict(self)},
+            )
+
+    @property
+    def shallow(self) -> bool:
+        return self.depth is not None or bool(self.shallow_since)
+
+    def clone_args(self) -> List[str]:
+        """
+        Returns:
+            List[str]: Options for ``git clone``.
+        """
+        args = self._history_args()
+        if self.filter:
+            args.append(f"--filter={self.filter}")
+        if self.single_branch:
+            args.append("--single-branch")
+        elif self.shallow:
+            # --depth implies --single-branch; keep every branch unless
+            # asked otherwise.
+            args.append("--no-single-branch")
+        if self.branch:
+            args += ["--branch", self.branch]
+        if self.sparse_paths:
+            args.append("--sparse")
+        return args
+
+    def trim_args(self) -> List[str]:
+        """
+        Returns:
+            List[str]: ``git fetch`` arguments that cut the history back to
+                       the cloned depth after a pull. Passing the depth to
+                       the pull itself would graft the new tip and leave it
+                       unrelated to the local branch.
+        """
+        return ["fetch", *self._history_args()]
+
+    def _history_args(self) -> List[str]:
+        if self.depth is not None:
+            return [f"--depth={self.depth}"]
+        if self.shallow_since:
+            return [f"--shallow-since={self.shallow_since}"]
+        return []
+
+    def sparse_input(self) -> bytes:
+        """
+        Returns:
+            bytes: Cone patterns for ``git sparse-checkout set --stdin``.
+        """
+        return "".join(f"{p.strip('/')}\n" for p in self.sparse_paths).encode(
+            "utf-8"
+        )
+
+    def save(self, repo_path: str) -> None:
+        """
+        Store the profile inside the repository's ``.git`` directory.
+        """
+        with open(
+            os.path.join(repo_path, ".git", PROFILE_FILE),
+            "w",
+            encoding="utf-8",
+        ) as handle:
+            json.dump(asdict(self), handle)
+
+    @classmethod
+    def load(cls, repo_path: str) -> Optional["CloneProfile"]:
+        """
+        Read the profile stored by `save`.
+
+        Returns:
+            Optional[CloneProfile]: The profile, or ``None`` for repositories
+                                    cloned without one.
+
+        Raises:
+            SpaceGitException: If the stored profile does not match the
+            current fields.
+        """
+        try:
+            with open(
+                os.path.join(repo_path, ".git", PROFILE_FILE), encoding="utf-8"
+            ) as handle:
+                data = json.load(handle)
+        except FileNotFoundError:
+            return None
+        try:
+            return cls(**data)
+        except TypeError as e:
+            raise SpaceGitException(
+                message="Stored clone profile is not readable.",
+                error_code="INVALID_CLONE_PROFILE",
+                metadata={"repo_path": repo_path},
+                cause=e,
+            )
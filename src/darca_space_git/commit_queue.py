@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .content import FileContent
+from .exceptions import SpaceGitException
+
+_Pending = Tuple[str, FileContent, str, "Future[str]"]
+
+
+def aggregate_messages(messages: List[str]) -> str:
+    """
+    Combine the messages of a group commit into one commit message.
+
+    A single distinct message is used as-is; otherwise a summary line is
+    followed by one bullet per distinct message, in arrival order.
+    """
+    unique = list(dict.fromkeys(messages))
+    if len(unique) == 1:
+        return unique[0]
+    bullets = "\n".join(f"- {message}" for message in unique)
+    return f"Group commit of {len(messages)} changes\n\n{bullets}"
+
+
+class CommitQueue:
+    """
+    Write-behind queue that coalesces commits to one space.
+
+    Writes arriving within ``window`` seconds of the first pending write,
+    or until ``max_files`` writes are pending, are committed together as a
+    single commit. Each caller receives a future that resolves to the
+    commit id or the exception raised by the commit.
+
+    The worker thread starts on demand and exits after ``idle_timeout``
+    seconds without writes, so idle spaces hold no threads.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[Dict[str, FileContent], str], str],
+        window: float = 0.05,
+        max_files: int = 100,
+        idle_timeout: float = 1.0,
+        name: str = "",
+    ) -> None:
+        """
+        Args:
+            commit (Callable): Called with ``(files, message)`` for every
+                               batch; returns the commit id.
+            window (float): Seconds to collect writes before committing.
+            max_files (int): Commit immediately once this many writes are
+                             pending.
+            idle_timeout (float): Seconds before an idle worker exits.
+            name (str): Used to name the worker thread.
+        """
+        self.window = window
+        self.max_files = max_files
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self._commit = commit
+        self._pending: List[_Pending] = []
+        self._first_at = 0.0
+        self._cond = threading.Condition()
+        self._commit_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(
+        self, relative_path: str, content: FileContent, message: str
+    ) -> "Future[str]":
+        """
+        Queue a file write for the next group commit.
+
+        Returns:
+            Future[str]: Resolves to the id of the commit containing it.
+
+        Raises:
+            SpaceGitException: If the queue has been closed.
+        """
+        future: "Future[str]" = Future()
+        with self._cond:
+            if self._closed:
+                raise SpaceGitException(
+                    message="Commit queue is closed.",
+                    error_code="COMMIT_QUEUE_CLOSED",
+                    metadata={"space": self.name, "file": relative_path},
+                )
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append((relative_path, content, message, future))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name=f"commit-queue-{self.name}",
+                    daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify_all()
+        return future
+
+    def flush(self) -> None:
+        """
+        Commit everything pending now, in the calling thread.
+        """
+        while self._commit_pending():
+            pass
+
+    def close(self) -> None:
+        """
+        Flush pending writes and reject new ones.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                idle_until = time.monotonic() + self.idle_timeout
+                while not self._pending:
+                    remaining = idle_until - time.monotonic()
+                    if self._closed or remaining <= 0:
+                        self._thread = None
+                        return
+                    self._cond.wait(remaining)
+                flush_at = self._first_at + self.window
+                while len(self._pending) < self.max_files and not self._closed:
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._commit_pending()
+
+    def _commit_pending(self) -> bool:
+        """
+        Commit one batch of at most ``max_files`` writes.
+
+        Returns:
+            bool: Whether writes are still pending afterwards.
+        """
+        # Batches are taken and committed under one lock so they land in
+        # arrival order even when flush() races the worker.
+        with self._commit_lock:
+            with self._cond:
+                batch = self._pending[: self.max_files]
+                del self._pending[: self.max_files]
+                if self._pending:
+                    self._first_at = time.monotonic()
+                remaining = bool(self._pending)
+            batch = [
+                item
+                for item in batch
+                if item[3].set_running_or_notify_cancel()
+            ]
+            if not batch:
+                return remaining
+            files = {path: content for path, content, _, _ in batch}
+            message = aggregate_messages([item[2] for item in batch])
+            try:
+                commit = self._commit(files, message)
+            except Exception as e:
+                for item in batch:
+                    item[3].set_exception(e)
+            else:
+                for item in batch:
+                    item[3].set_result(commit)
+        return remaining
@@ -0,0 +1,220 @@
+import json
+import os
+import posixpath
+import threading
+from collections import OrderedDict
+from typing import IO, Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+import yaml
+
+from .archive import write_chunks
+from .exceptions import SpaceGitException
+
+FileContent = Union[str, bytes, dict]
+# Content that can be written without holding it in memory as one string:
+# buffers, binary (or text) file objects and iterables of chunks.
+StreamContent = Union[FileContent, memoryview, IO, Iterable[bytes]]
+
+CHUNK_SIZE = 1024 * 1024
+
+# Serialized dict payloads keyed by extension and a compact JSON dump, which
+# keeps key order and is much cheaper than the indented JSON or YAML dump it
+# stands for. Only plain data is memoized (see `_plain`), so equal keys
+# always mean equal payloads.
+SERIALIZED_CACHE_SIZE = 256
+_PLAIN_SCALARS = (str, int, float, bool, type(None))
+_serialized: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+_serialized_lock = threading.Lock()
+
+
+def normalize_path(relative_path: str) -> str:
+    """
+    Normalize a space-relative path to git's slash-separated form.
+
+    Raises:
+        SpaceGitException: If the path is empty or escapes the space root.
+    """
+    path = posixpath.normpath(relative_path.replace("\\", "/")).lstrip("/")
+    if path in ("", ".") or path == ".." or path.startswith("../"):
+        raise SpaceGitException(
+            message=f"Invalid path '{relative_path}'.",
+            error_code="INVALID_PATH",
+            metadata={"file": relative_path},
+        )
+    return path
+
+
+def serialize_content(relative_path: str, content: FileContent) -> bytes:
+    """
+    Serialize file content the way it is stored in the repository.
+
+    Strings are UTF-8 encoded and bytes are kept as-is. Dicts are written
+    as JSON for ``.json`` files and YAML for ``.yml``/``.yaml`` files,
+    byte for byte as ``SpaceFileManager.set_file`` writes them; plain-data
+    results are memoized, so re-serializing an equal dict is cheap.
+
+    Raises:
+        SpaceGitException: If the content type or extension is unsupported.
+    """
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    if isinstance(content, dict):
+        extension = posixpath.splitext(relative_path)[1]
+        if extension in (".json", ".yml", ".yaml"):
+            return _serialize_dict(extension, content)
+    raise _unsupported(relative_path, content)
+
+
+def _serialize_dict(extension: str, content: dict) -> bytes:
+    # Mirrors SpaceFileManager.set_file: ``json.dumps(indent=2)`` without a
+    # trailing newline, and ``yaml.dump(sort_keys=False)``.
+    if not _plain(content):
+        return _dump_dict(extension, content)
+    key = (extension, json.dumps(content))
+    with _serialized_lock:
+        data = _serialized.get(key)
+        if data is not None:
+            _serialized.move_to_end(key)
+            return data
+    data = _dump_dict(extension, content)
+    with _serialized_lock:
+        _serialized[key] = data
+        while len(_serialized) > SERIALIZED_CACHE_SIZE:
+            _serialized.popitem(last=False)
+    return data
+
+
+def _dump_dict(extension: str, content: dict) -> bytes:
+    if extension == ".json":
+        return json.dumps(content, indent=2).encode("utf-8")
+    return yaml.dump(content, sort_keys=False).encode("utf-8")
+
+
+def _plain(value: object) -> bool:
+    """
+    Tell whether a value is built from str-keyed dicts, lists and scalars of
+    exactly those types, whose compact JSON dump identifies it uniquely.
+    """
+    kind = type(value)
+    if kind is dict:
+        return all(
+            type(key) is str and _plain(item) for key, item in value.items()
+        )
+    if kind is list:
+        return all(_plain(item) for item in value)
+    return kind in _PLAIN_SCALARS
+
+
+def content_chunks(
+    relative_path: str, content: StreamContent, chunk_size: int = CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Return file content as chunks of at most ``chunk_size`` bytes. File
+    objects and iterators are read lazily, so memory stays bounded.
+
+    Strings and dicts are serialized like `serialize_content`; text chunks
+    are UTF-8 encoded. Buffers are sliced without copying.
+
+    Raises:
+        SpaceGitException: If the content type is unsupported; checked
+        before any chunk is produced.
+    """
+    if isinstance(content, (str, dict)):
+        return iter([serialize_content(relative_path, content)])
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return _slices(memoryview(content).cast("B"), chunk_size)
+    if hasattr(content, "read"):
+        return _reads(relative_path, content, chunk_size)
+    if isinstance(content, Iterable):
+        return (_as_bytes(relative_path, chunk) for chunk in content)
+    raise _unsupported(relative_path, content)
+
+
+def _slices(view: memoryview, chunk_size: int) -> Iterator[bytes]:
+    for start in range(0, len(view), chunk_size):
+        end = start + chunk_size
+        yield view[start:end]
+
+
+def _reads(
+    relative_path: str, fileobj: IO, chunk_size: int
+) -> Iterator[bytes]:
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield _as_bytes(relative_path, chunk)
+
+
+def _as_bytes(relative_path: str, chunk: object) -> bytes:
+    if isinstance(chunk, str):
+        return chunk.encode("utf-8")
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+        return chunk
+    raise _unsupported(relative_path, chunk)
+
+
+def _unsupported(relative_path: str, content: object) -> SpaceGitException:
+    return SpaceGitException(
+        message="Unsupported content for file.",
+        error_code="UNSUPPORTED_CONTENT",
+        metadata={"file": relative_path, "type": type(content).__name__},
+    )
+
+
+def is_buffered(content: StreamContent) -> bool:
+    """
+    Tell whether content is already held in memory as a str, dict or bytes
+    (as opposed to a buffer, file object or iterator to stream).
+    """
+    return isinstance(content, (str, bytes, dict))
+
+
+def is_managed(content: StreamContent) -> bool:
+    """
+    Tell whether content is a str or dict, the types
+    ``SpaceFileManager.set_file`` writes; everything else, bytes included,
+    is written with `write_file_chunks`.
+    """
+    return isinstance(content, (str, dict))
+
+
+def write_file_chunks(
+    repo_path: str, relative_path: str, chunks: Iterable[bytes]
+) -> None:
+    """
+    Write chunks to a normalized path in a working tree, creating parent
+    directories as needed.
+    """
+    target = os.path.join(repo_path, *relative_path.split("/"))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as handle:
+        write_chunks(chunks, handle)
+
+
+def missing_paths(repo_path: str, relative_paths: Iterable[str]) -> List[str]:
+    """
+    Return the normalized paths that do not exist in a working tree.
+
+    Each parent directory is listed once with ``os.scandir``, so checking
+    thousands of paths costs one scan per directory instead of one lookup
+    per path.
+    """
+    listings: Dict[str, Set[str]] = {}
+    missing = []
+    for relative_path in relative_paths:
+        parent, name = posixpath.split(relative_path)
+        names = listings.get(parent)
+        if names is None:
+            directory = os.path.join(repo_path, *parent.split("/"))
+            try:
+                with os.scandir(directory) as entries:
+                    names = {entry.name for entry in entries}
+            except OSError:
+                names = set()
+            listings[parent] = names
+        if name not in names:
+            missing.append(relative_path)
+    return missing
@@ -0,0 +1,237 @@
+import os
+import signal
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Set
+
+from .exceptions import SpaceGitException
+
+# Error codes of operations stopped by a deadline.
+TIMEOUT_CODE = "OPERATION_TIMEOUT"
+CANCELLED_CODE = "OPERATION_CANCELLED"
+
+
+def kill_process_tree(proc: Any) -> None:
+    """
+    Kill a git process started in its own session together with the helpers
+    it spawned (``ssh``, ``git-remote-https``, hooks, ...).
+
+    Accepts `subprocess.Popen` and asyncio processes.
+    """
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+
+
+class Deadline:
+    """
+    Point in time by which an operation must finish, which another thread
+    can also cancel early.
+
+    While a deadline is current (see `deadline_scope`), `GitProcess` starts
+    git in its own process group and kills the whole group when the
+    deadline expires or is cancelled; the command then raises
+    ``OPERATION_TIMEOUT`` or ``OPERATION_CANCELLED``.
+
+    A deadline with a ``parent`` stops when either of them does.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        parent: Optional["Deadline"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            timeout (Optional[float]): Seconds from now. ``None`` never
+                                       expires, but can still be
+                                       cancelled.
+            parent (Optional[Deadline]): Enclosing deadline.
+            clock (Callable[[], float]): Monotonic clock.
+
+        Raises:
+            SpaceGitException: If ``timeout`` is not positive.
+        """
+        if timeout is not None and timeout <= 0:
+            raise SpaceGitException(
+                message=f"Timeouts must be positive, got {timeout}.",
+                error_code="INVALID_TIMEOUT",
+                metadata={"timeout": timeout},
+            )
+        self.timeout = timeout
+        self.parent = parent
+        self._clock = clock
+        self.expires_at = None if timeout is None else clock() + timeout
+        self._cancelled = False
+        self._procs: Set[Any] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """
+        Return the seconds left, or None when neither this deadline nor its
+        parents expire.
+        """
+        left = None
+        if self.expires_at is not None:
+            left = max(0.0, self.expires_at - self._clock())
+        if self.parent is not None:
+            outer = self.parent.remaining()
+            if outer is not None and (left is None or outer < left):
+                left = outer
+        return left
+
+    @property
+    def expired(self) -> bool:
+        own = self.expires_at is not None and self._clock() >= self.expires_at
+        return own or (self.parent is not None and self.parent.expired)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled or (
+            self.parent is not None and self.parent.cancelled
+        )
+
+    @property
+    def stopped(self) -> bool:
+        return self.cancelled or self.expired
+
+    def cancel(self) -> None:
+        """
+        Stop the operation: kill its running git processes now and make
+        further git calls fail.
+        """
+        with self._lock:
+            self._cancelled = True
+            procs = list(self._procs)
+        for proc in procs:
+            kill_process_tree(proc)
+
+    def check(self) -> None:
+        """
+        Raise if the deadline expired or was cancelled.
+        """
+        if self.stopped:
+            raise self.error()
+
+    def error(
+        self,
+        cause: Optional[BaseException] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> SpaceGitException:
+        """
+        Build the exception for an operation this deadline stopped.
+        """
+        metadata = dict(metadata or {}, timeout=self.timeout)
+        if self.cancelled:
+            return SpaceGitException(
+                message="Operation was cancelled.",
+                error_code=CANCELLED_CODE,
+                metadata=metadata,
+                cause=cause,
+            )
+        return SpaceGitException(
+            message="Operation exceeded its deadline.",
+            error_code=TIMEOUT_CODE,
+            metadata=metadata,
+            cause=cause,
+        )
+
+    @contextmanager
+    def watch(self, proc: Any) -> Iterator[None]:
+        """
+        Kill a process started in its own session when this deadline or a
+        parent stops while it runs.
+        """
+        with ExitStack() as stack:
+            if self.parent is not None:
+                stack.enter_context(self.parent.watch(proc))
+            with self._lock:
+                self._procs.add(proc)
+                if self._timer is None and self.expires_at is not None:
+                    self._timer = threading.Timer(
+                        max(0.0, self.expires_at - self._clock()),
+                        self._expire,
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
+            if self.stopped:
+                kill_process_tree(proc)
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._procs.discard(proc)
+
+    def _expire(self) -> None:
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            kill_process_tree(proc)
+
+    def close(self) -> None:
+        """
+        Stop the expiry timer.
+        """
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar(
+    "darca_space_git_deadline", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    Return the deadline of the operation running in this context.
+    """
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Any]:
+    """
+    Make a deadline current for the ``with`` block, so every git command
+    run by the manager in this context honours it.
+    """
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def validate_timeouts(
+    timeouts: Optional[Mapping[str, float]],
+) -> Dict[str, float]:
+    """
+    Check default timeouts per operation name; the ``"default"`` key
+    applies to operations without their own entry.
+
+    Raises:
+        SpaceGitException: If a timeout is not positive.
+    """
+    checked = dict(timeouts or {})
+    for operation, timeout in checked.items():
+        if timeout is None or timeout <= 0:
+            raise SpaceGitException(
+                message=(
+                    f"Timeout of '{operation}' must be positive, "
+                    f"got {timeout}."
+                ),
+                error_code="INVALID_TIMEOUT",
+                metadata={"operation": operation, "timeout": timeout},
+            )
+    return checked
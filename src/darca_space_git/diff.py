@@ -0,0 +1,348 @@
+import codecs
+import re
+from dataclasses import dataclass
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .exceptions import SpaceGitException
+
+DIFF_MODES = ("patch", "name-status", "stat")
+
+_QUOTED_FIRST_PATH = re.compile(rb'^("(?:\\.|[^"\\])*") (.*)$')
+_HUNK_HEADER = re.compile(
+    rb"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$"
+)
+
+
+@dataclass(frozen=True)
+class Hunk:
+    """
+    One hunk of a textual diff.
+
+    Attributes:
+        old_start (int): First line in the old file.
+        old_count (int): Number of lines in the old file.
+        new_start (int): First line in the new file.
+        new_count (int): Number of lines in the new file.
+        header (str): Text after the ``@@`` range, usually a function name.
+        lines (Tuple[str, ...]): Hunk lines including their ``' '``,
+                                 ``'+'`` or ``'-'`` prefix.
+    """
+
+    old_start: int
+    old_count: int
+    new_start: int
+    new_count: int
+    header: str = ""
+    lines: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class FileDiff:
+    """
+    Change of a single file.
+
+    Attributes:
+        path (str): Path after the change (before it, for deletions).
+        status (str): ``A``dded, ``M``odified, ``D``eleted or ``R``enamed;
+                      name-status mode may also report ``T`` (type
+                      change). Patch mode reports a type change as a
+                      deletion followed by an addition.
+        old_path (Optional[str]): Source path of a rename.
+        added (Optional[int]): Added lines; None in name-status mode and
+                               for binary files.
+        deleted (Optional[int]): Deleted lines, like ``added``.
+        binary (bool): Whether git treated the file as binary.
+        hunks (Tuple[Hunk, ...]): Hunks, only filled in patch mode.
+    """
+
+    path: str
+    status: str
+    old_path: Optional[str] = None
+    added: Optional[int] = None
+    deleted: Optional[int] = None
+    binary: bool = False
+    hunks: Tuple[Hunk, ...] = ()
+
+
+def diff_args(
+    from_ref: str,
+    to_ref: Optional[str] = None,
+    paths: Optional[Sequence[str]] = None,
+    mode: str = "patch",
+    cached: bool = False,
+    context: int = 3,
+) -> List[str]:
+    """
+    Build ``git diff`` arguments.
+
+    Without ``to_ref`` ``from_ref`` is compared with the working tree, or
+    with the index when ``cached`` is set. Refs always follow
+    ``--end-of-options``, so they are never parsed as options.
+
+    Raises:
+        SpaceGitException: If ``mode`` is unknown or ``to_ref`` is combined
+        with ``cached``.
+    """
+    if mode not in DIFF_MODES or (cached and to_ref):
+        raise SpaceGitException(
+            message=(
+                f"Invalid diff options: mode '{mode}' must be one of "
+                f"{', '.join(DIFF_MODES)} and cached excludes to_ref."
+            ),
+            error_code="INVALID_DIFF_OPTIONS",
+            metadata={"mode": mode, "cached": cached, "to_ref": to_ref},
+        )
+    args = ["diff", "--no-color", "--no-ext-diff", "--find-renames"]
+    if mode == "patch":
+        args += [f"-U{context}", "--src-prefix=a/", "--dst-prefix=b/"]
+    elif mode == "name-status":
+        args += ["--name-status", "-z"]
+    else:
+        args += ["--numstat", "-z"]
+    if cached:
+        args.append("--cached")
+    # Refs come from callers (and the CLI): never let one read as an
+    # option such as ``--output=<file>``.
+    args += ["--end-of-options", from_ref]
+    if to_ref:
+        args.append(to_ref)
+    args.append("--")
+    args += list(paths or ())
+    return args
+
+
+def split_records(
+    chunks: Iterable[bytes], separator: bytes
+) -> Iterator[bytes]:
+    """
+    Re-split a stream of chunks into records, holding at most one partial
+    record in memory.
+    """
+    pending = b""
+    for chunk in chunks:
+        pending += chunk
+        *records, pending = pending.split(separator)
+        yield from records
+    if pending:
+        yield pending
+
+
+async def split_records_async(
+    chunks: AsyncIterable[bytes], separator: bytes
+) -> AsyncIterator[bytes]:
+    """
+    Asyncio counterpart of `split_records`.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *records, pending = pending.split(separator)
+        for record in records:
+            yield record
+    if pending:
+        yield pending
+
+
+async def parse_diff_stream_async(
+    chunks: AsyncIterable[bytes], mode: str
+) -> AsyncIterator[FileDiff]:
+    """
+    Parse ``git diff`` output in ``mode`` from an asynchronous stream.
+
+    The records of each file are collected first and handed to the
+    synchronous parser of ``mode``, so memory stays bounded by the largest
+    single file diff as with the synchronous parsers.
+    """
+    if mode == "patch":
+        lines: List[bytes] = []
+        async for line in split_records_async(chunks, b"\n"):
+            if line.startswith(b"diff --git ") and lines:
+                for diff in parse_patch_stream(lines):
+                    yield diff
+                lines = []
+            lines.append(line)
+        for diff in parse_patch_stream(lines):
+            yield diff
+        return
+    parse = (
+        parse_name_status_stream
+        if mode == "name-status"
+        else parse_numstat_stream
+    )
+    fields = split_records_async(chunks, b"\0")
+    async for field in fields:
+        record = [field]
+        for _ in range(_paths_following(mode, field)):
+            record.append(await anext(fields))
+        for diff in parse(record):
+            yield diff
+
+
+def _paths_following(mode: str, field: bytes) -> int:
+    """
+    Count the NUL-separated path fields that follow the first field of a
+    ``-z`` record: a rename or copy names two paths, other changes one
+    (numstat prints that one inside the first field).
+    """
+    if mode == "name-status":
+        return 2 if field[:1] in (b"R", b"C") else 1
+    return 2 if field.split(b"\t", 2)[2:] == [b""] else 0
+
+
+def parse_name_status_stream(fields: Iterable[bytes]) -> Iterator[FileDiff]:
+    """
+    Parse ``git diff --name-status -z`` fields.
+    """
+    fields = iter(fields)
+    for status in fields:
+        code = status.decode("ascii")[:1]
+        if code in ("R", "C"):
+            old_path, path = _decode(next(fields)), _decode(next(fields))
+            yield FileDiff(path, code, old_path)
+        else:
+            yield FileDiff(_decode(next(fields)), code)
+
+
+def parse_numstat_stream(fields: Iterable[bytes]) -> Iterator[FileDiff]:
+    """
+    Parse ``git diff --numstat -z`` fields. Status is ``M`` or ``R`` only;
+    numstat does not tell additions from modifications.
+    """
+    fields = iter(fields)
+    for record in fields:
+        added, deleted, path = record.split(b"\t", 2)
+        binary = added == b"-"
+        counts = (None, None) if binary else (int(added), int(deleted))
+        if path:
+            yield FileDiff(_decode(path), "M", None, *counts, binary)
+        else:
+            old_path, new_path = _decode(next(fields)), _decode(next(fields))
+            yield FileDiff(new_path, "R", old_path, *counts, binary)
+
+
+class _FileBuilder:
+    __slots__ = (
+        "path",
+        "old_path",
+        "status",
+        "binary",
+        "hunks",
+        "added",
+        "deleted",
+        "lines",
+        "range",
+    )
+
+    def __init__(self, header: bytes) -> None:
+        old, new = _split_header_paths(header)
+        self.path = new
+        self.old_path = old
+        self.status = "M"
+        self.binary = False
+        self.hunks: List[Hunk] = []
+        self.added = 0
+        self.deleted = 0
+        self.lines: List[str] = []
+        self.range: Optional[Tuple[int, int, int, int, str]] = None
+
+    def close_hunk(self) -> None:
+        if self.range is not None:
+            self.hunks.append(Hunk(*self.range, tuple(self.lines)))
+            self.range = None
+            self.lines = []
+
+    def build(self) -> FileDiff:
+        self.close_hunk()
+        rename = self.status == "R"
+        path = self.old_path if self.status == "D" else self.path
+        return FileDiff(
+            path=path,
+            status=self.status,
+            old_path=self.old_path if rename else None,
+            added=None if self.binary else self.added,
+            deleted=None if self.binary else self.deleted,
+            binary=self.binary,
+            hunks=tuple(self.hunks),
+        )
+
+
+def parse_patch_stream(lines: Iterable[bytes]) -> Iterator[FileDiff]:
+    """
+    Parse ``git diff`` patch output line by line, yielding each file as
+    soon as its last hunk has been read.
+    """
+    current: Optional[_FileBuilder] = None
+    for line in lines:
+        if line.startswith(b"diff --git "):
+            if current is not None:
+                yield current.build()
+            current = _FileBuilder(line.removeprefix(b"diff --git "))
+            continue
+        if current is None:
+            continue
+        if current.range is not None and line[:1] in (b" ", b"+", b"-", b"\\"):
+            current.lines.append(line.decode("utf-8", "replace"))
+            if line[:1] == b"+":
+                current.added += 1
+            elif line[:1] == b"-":
+                current.deleted += 1
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match:
+            current.close_hunk()
+            old_start, old_count, new_start, new_count, header = match.groups()
+            current.range = (
+                int(old_start),
+                1 if old_count is None else int(old_count),
+                int(new_start),
+                1 if new_count is None else int(new_count),
+                header.decode("utf-8", "replace"),
+            )
+        elif line.startswith(b"new file mode"):
+            current.status = "A"
+        elif line.startswith(b"deleted file mode"):
+            current.status = "D"
+        elif line.startswith(b"rename from "):
+            current.status = "R"
+            current.old_path = _decode(line.removeprefix(b"rename from "))
+        elif line.startswith(b"rename to "):
+            current.path = _decode(line.removeprefix(b"rename to "))
+        elif line.startswith(b"Binary files "):
+            current.binary = True
+    if current is not None:
+        yield current.build()
+
+
+def _decode(raw: bytes) -> str:
+    """
+    Decode a path as printed by git, unquoting C-style quoted names.
+    """
+    if raw.startswith(b'"') and raw.endswith(b'"'):
+        raw = codecs.escape_decode(raw[1:-1])[0]
+    return raw.decode("utf-8", "surrogateescape")
+
+
+def _split_header_paths(header: bytes) -> Tuple[str, str]:
+    """
+    Split ``a/<old> b/<new>`` from a ``diff --git`` line.
+    """
+    quoted = _QUOTED_FIRST_PATH.match(header)
+    if quoted:
+        old, new = quoted.groups()
+    else:
+        # Without a rename both names are equal: "a/<p> b/<p>".
+        half = (len(header) - 1) // 2
+        old, new = header[:half], header[half:].removeprefix(b" ")
+        if old[2:] != new[2:]:
+            old, _, new = header.partition(b" b/")
+            new = b"b/" + new
+    return _decode(old)[2:], _decode(new)[2:]
@@ -0,0 +1,54 @@
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Set
+
+
+class DirtyPathTracker:
+    """
+    Paths written per space since its last commit.
+
+    Writes made through `SpaceGitManager.write_file` (or reported with
+    `SpaceGitManager.mark_dirty`) are recorded here so `commit_all` can
+    stage just those paths instead of scanning the whole working tree.
+    Changes made behind the manager's back are not seen; spaces with such
+    writers should keep dirty tracking disabled.
+    """
+
+    def __init__(self) -> None:
+        self._paths: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, space_name: str, paths: Iterable[str]) -> None:
+        with self._lock:
+            self._paths.setdefault(space_name, set()).update(paths)
+
+    def take(self, space_name: str) -> Set[str]:
+        """
+        Remove and return the dirty paths of a space.
+        """
+        with self._lock:
+            return self._paths.pop(space_name, set())
+
+    def remove(self, space_name: str, paths: Iterable[str]) -> None:
+        """
+        Forget paths of a space that have been committed.
+        """
+        with self._lock:
+            dirty = self._paths.get(space_name)
+            if dirty is not None:
+                dirty.difference_update(paths)
+                if not dirty:
+                    del self._paths[space_name]
+
+    def pending(self, space_name: str) -> FrozenSet[str]:
+        with self._lock:
+            return frozenset(self._paths.get(space_name, ()))
+
+    def discard(self, space_name: Optional[str] = None) -> None:
+        """
+        Forget the dirty paths of a space, or of all spaces.
+        """
+        with self._lock:
+            if space_name is None:
+                self._paths.clear()
+            else:
+                self._paths.pop(space_name, None)
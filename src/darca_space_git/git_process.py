@@ -0,0 +1,254 @@
+import asyncio
+import os
+import subprocess  # nosec B404
+import tempfile
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence
+
+from .deadline import Deadline, current_deadline, kill_process_tree
+from .exceptions import SpaceGitException
+from .metrics import note_spawn
+
+
+class GitProcess:
+    """
+    Thin runner for git commands that are not covered by `darca_git.Git`.
+
+    Non-zero exit codes are reported as `SpaceGitException` with error code
+    ``GIT_COMMAND_FAILED``; callers wrap them into their own error codes.
+
+    Commands honour the current `Deadline` (see `deadline_scope`): they run
+    in their own process group, which is killed when the deadline expires
+    or is cancelled, and raise ``OPERATION_TIMEOUT`` or
+    ``OPERATION_CANCELLED`` instead.
+    """
+
+    def __init__(self, git_binary: str = "git") -> None:
+        """
+        Args:
+            git_binary (str): Name or path of the git executable.
+        """
+        self.git_binary = git_binary
+        self.env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+
+    def run(
+        self,
+        args: Sequence[str],
+        cwd: str,
+        input: Optional[bytes] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> bytes:
+        """
+        Run a git command and return its standard output.
+
+        Args:
+            args (Sequence[str]): Arguments passed after the git binary.
+            cwd (str): Working directory of the command.
+            input (Optional[bytes]): Data written to the process stdin.
+            env (Optional[Dict[str, str]]): Extra environment variables,
+                                            e.g. ``GIT_INDEX_FILE``.
+
+        Returns:
+            bytes: Captured standard output.
+
+        Raises:
+            SpaceGitException: If git exits with a non-zero status, or the
+            current deadline stops it.
+        """
+        deadline = self._deadline()
+        proc = subprocess.Popen(  # nosec B603
+            [self.git_binary, *args],
+            cwd=cwd,
+            env=dict(self.env, **env) if env else self.env,
+            stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=deadline is not None,
+        )
+        with self._watch(proc, deadline):
+            stdout, stderr = proc.communicate(input)
+        note_spawn(len(stdout))
+        self._check(args, cwd, proc.returncode, stderr, deadline)
+        return stdout
+
+    def stream(
+        self,
+        args: Sequence[str],
+        cwd: str,
+        chunk_size: int = 65536,
+    ) -> Iterator[bytes]:
+        """
+        Run a git command and yield its standard output in chunks as it is
+        produced, without buffering the whole output.
+
+        Closing the generator early kills the git process.
+
+        Args:
+            args (Sequence[str]): Arguments passed after the git binary.
+            cwd (str): Working directory of the command.
+            chunk_size (int): Maximum bytes per yielded chunk.
+
+        Yields:
+            bytes: Chunks of standard output.
+
+        Raises:
+            SpaceGitException: If git exits with a non-zero status, once the
+            output has been consumed, or the current deadline stops it.
+        """
+        deadline = self._deadline()
+        with tempfile.TemporaryFile() as stderr:
+            proc = subprocess.Popen(  # nosec B603
+                [self.git_binary, *args],
+                cwd=cwd,
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                start_new_session=deadline is not None,
+            )
+            total = 0
+            try:
+                with self._watch(proc, deadline):
+                    while True:
+                        chunk = proc.stdout.read1(chunk_size)
+                        if not chunk:
+                            break
+                        total += len(chunk)
+                        yield chunk
+                    proc.wait()
+            finally:
+                if proc.returncode is None:
+                    kill_process_tree(proc)
+                    proc.wait()
+                proc.stdout.close()
+                note_spawn(total)
+            stderr.seek(0)
+            self._check(args, cwd, proc.returncode, stderr.read(), deadline)
+
+    async def run_async(
+        self,
+        args: Sequence[str],
+        cwd: str,
+        input: Optional[bytes] = None,
+    ) -> bytes:
+        """
+        Run a git command on the event loop without blocking it.
+
+        Cancelling the awaiting task kills the git process before the
+        cancellation propagates.
+
+        Args:
+            args (Sequence[str]): Arguments passed after the git binary.
+            cwd (str): Working directory of the command.
+            input (Optional[bytes]): Data written to the process stdin.
+
+        Returns:
+            bytes: Captured standard output.
+
+        Raises:
+            SpaceGitException: If git exits with a non-zero status, or the
+            current deadline stops it.
+        """
+        deadline = self._deadline()
+        proc = await asyncio.create_subprocess_exec(
+            self.git_binary,
+            *args,
+            cwd=cwd,
+            env=self.env,
+            stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=deadline is not None,
+        )
+        try:
+            with self._watch(proc, deadline):
+                stdout, stderr = await proc.communicate(input)
+        except asyncio.CancelledError:
+            if proc.returncode is None:
+                kill_process_tree(proc)
+                await proc.wait()
+            raise
+        note_spawn(len(stdout))
+        self._check(args, cwd, proc.returncode, stderr, deadline)
+        return stdout
+
+    async def stream_async(
+        self,
+        args: Sequence[str],
+        cwd: str,
+        chunk_size: int = 65536,
+    ) -> AsyncIterator[bytes]:
+        """
+        Asyncio counterpart of `stream`.
+
+        Closing the generator early, or cancelling the consuming task, kills
+        the git process.
+
+        Raises:
+            SpaceGitException: If git exits with a non-zero status, once the
+            output has been consumed, or the current deadline stops it.
+        """
+        deadline = self._deadline()
+        with tempfile.TemporaryFile() as stderr:
+            proc = await asyncio.create_subprocess_exec(
+                self.git_binary,
+                *args,
+                cwd=cwd,
+                env=self.env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=stderr,
+                start_new_session=deadline is not None,
+            )
+            total = 0
+            try:
+                with self._watch(proc, deadline):
+                    while True:
+                        chunk = await proc.stdout.read(chunk_size)
+                        if not chunk:
+                            break
+                        total += len(chunk)
+                        yield chunk
+                    await proc.wait()
+            finally:
+                if proc.returncode is None:
+                    kill_process_tree(proc)
+                    await proc.wait()
+                note_spawn(total)
+            stderr.seek(0)
+            self._check(args, cwd, proc.returncode, stderr.read(), deadline)
+
+    @staticmethod
+    def _deadline() -> Optional[Deadline]:
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+        return deadline
+
+    @staticmethod
+    def _watch(proc: Any, deadline: Optional[Deadline]) -> Any:
+        return nullcontext() if deadline is None else deadline.watch(proc)
+
+    @staticmethod
+    def _check(
+        args: Sequence[str],
+        cwd: str,
+        returncode: Optional[int],
+        stderr: bytes,
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        # Metadata is logged as JSON by DarcaException; accept path objects.
+        cwd = os.fspath(cwd)
+        if returncode != 0 and deadline is not None and deadline.stopped:
+            raise deadline.error(metadata={"args": list(args), "cwd": cwd})
+        if returncode != 0:
+            raise SpaceGitException(
+                message=f"git {args[0]} exited with status {returncode}.",
+                error_code="GIT_COMMAND_FAILED",
+                metadata={
+                    "args": list(args),
+                    "cwd": cwd,
+                    "returncode": returncode,
+                    "stderr": stderr.decode("utf-8", "replace").strip(),
+                },
+            )
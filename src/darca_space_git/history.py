@@ -0,0 +1,195 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .exceptions import SpaceGitException
+
+TimeFilter = Union[str, int, datetime]
+
+# One NUL-separated field per Commit attribute; ``-z`` ends each record
+# with another NUL. Messages cannot contain NUL, so the split is exact.
+LOG_FORMAT = "%x00".join(
+    ("%H", "%P", "%an", "%ae", "%at", "%cn", "%ce", "%ct", "%B")
+)
+_FIELDS = 9
+
+COMMIT_GRAPH_ARGS = [
+    "commit-graph",
+    "write",
+    "--reachable",
+    "--changed-paths",
+    "--split",
+]
+
+
+@dataclass(frozen=True)
+class Commit:
+    """
+    One commit of a space's history.
+
+    Attributes:
+        sha (str): Full commit id.
+        parents (Tuple[str, ...]): Parent commit ids.
+        author_name (str): Author name.
+        author_email (str): Author email.
+        authored_at (int): Author time as a Unix timestamp.
+        committer_name (str): Committer name.
+        committer_email (str): Committer email.
+        committed_at (int): Commit time as a Unix timestamp.
+        message (str): Full commit message.
+    """
+
+    sha: str
+    parents: Tuple[str, ...]
+    author_name: str
+    author_email: str
+    authored_at: int
+    committer_name: str
+    committer_email: str
+    committed_at: int
+    message: str
+
+    @property
+    def subject(self) -> str:
+        return self.message.split("\n", 1)[0]
+
+
+@dataclass(frozen=True)
+class HistoryPage:
+    """
+    One page of history.
+
+    Attributes:
+        commits (Tuple[Commit, ...]): Commits of this page, newest first.
+        cursor (Optional[str]): Opaque cursor of the next page; None on the
+                                last page.
+    """
+
+    commits: Tuple[Commit, ...]
+    cursor: Optional[str] = None
+
+
+def encode_cursor(tip: str, offset: int) -> str:
+    """
+    Build a page cursor.
+
+    The cursor pins the resolved tip commit, so pages stay consistent while
+    the branch moves on.
+    """
+    return f"{tip}:{offset}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Split a page cursor into its tip commit and offset.
+
+    Raises:
+        SpaceGitException: If the cursor was not produced by
+        `encode_cursor`.
+    """
+    tip, _, offset = cursor.partition(":")
+    if not (
+        offset.isdigit()
+        and len(tip) in (40, 64)
+        and all(c in "0123456789abcdef" for c in tip)
+    ):
+        raise SpaceGitException(
+            message=f"Invalid history cursor '{cursor}'.",
+            error_code="INVALID_HISTORY_OPTIONS",
+            metadata={"cursor": cursor},
+        )
+    return tip, int(offset)
+
+
+def log_args(
+    ref: str,
+    paths: Optional[Sequence[str]] = None,
+    author: Optional[str] = None,
+    since: Optional[TimeFilter] = None,
+    until: Optional[TimeFilter] = None,
+    max_count: Optional[int] = None,
+    skip: int = 0,
+) -> List[str]:
+    """
+    Build ``git log`` arguments producing records for `parse_log_stream`.
+
+    ``author`` is matched against the author name and email as git's
+    ``--author`` pattern. ``since``/``until`` take a datetime, a Unix
+    timestamp or any date string git understands.
+    """
+    args = ["log", "-z", f"--format={LOG_FORMAT}", "--no-color"]
+    if author:
+        args.append(f"--author={author}")
+    if since is not None:
+        args.append(f"--since={_format_time(since)}")
+    if until is not None:
+        args.append(f"--until={_format_time(until)}")
+    if max_count is not None:
+        args.append(f"--max-count={max_count}")
+    if skip:
+        args.append(f"--skip={skip}")
+    args += [ref, "--"]
+    args += list(paths or ())
+    return args
+
+
+def parse_log_stream(fields: Iterable[bytes]) -> Iterator[Commit]:
+    """
+    Parse NUL-separated ``git log`` fields into commits as they arrive.
+    """
+    record: List[bytes] = []
+    for field in fields:
+        record.append(field)
+        if len(record) == _FIELDS:
+            yield _commit(record)
+            record = []
+
+
+async def parse_log_stream_async(
+    fields: AsyncIterable[bytes],
+) -> AsyncIterator[Commit]:
+    """
+    Asyncio counterpart of `parse_log_stream`.
+    """
+    record: List[bytes] = []
+    async for field in fields:
+        record.append(field)
+        if len(record) == _FIELDS:
+            yield _commit(record)
+            record = []
+
+
+def _commit(record: List[bytes]) -> Commit:
+    sha, parents, an, ae, at, cn, ce, ct, message = (
+        os.fsdecode(f) for f in record
+    )
+    return Commit(
+        sha=sha,
+        parents=tuple(parents.split()),
+        author_name=an,
+        author_email=ae,
+        authored_at=int(at),
+        committer_name=cn,
+        committer_email=ce,
+        committed_at=int(ct),
+        message=message.rstrip("\n"),
+    )
+
+
+def _format_time(value: TimeFilter) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, int):
+        return f"@{value}"
+    return value
@@ -0,0 +1,335 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .exceptions import SpaceGitException
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+
+class FairRWLock:
+    """
+    Reader/writer lock that serves waiters strictly in arrival order.
+
+    Consecutive readers share the lock; a writer waits for the readers
+    ahead of it and blocks every request queued behind it, so neither side
+    can starve the other.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._queue: Deque[List[bool]] = deque()
+        self._readers = 0
+        self._writer = False
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def acquire(self, exclusive: bool) -> None:
+        entry = [exclusive]
+        with self._cond:
+            self._queue.append(entry)
+            while not (
+                self._queue[0] is entry
+                and not self._writer
+                and (not exclusive or self._readers == 0)
+            ):
+                self._cond.wait()
+            self._queue.popleft()
+            if exclusive:
+                self._writer = True
+            else:
+                self._readers += 1
+            self._cond.notify_all()
+
+    def try_acquire(self, exclusive: bool) -> bool:
+        """
+        Take the lock only if that needs no waiting, including behind
+        queued requests.
+        """
+        with self._cond:
+            if (
+                self._queue
+                or self._writer
+                or (exclusive and self._readers > 0)
+            ):
+                return False
+            if exclusive:
+                self._writer = True
+            else:
+                self._readers += 1
+            return True
+
+    def release(self, exclusive: bool) -> None:
+        with self._cond:
+            if exclusive:
+                self._writer = False
+            else:
+                self._readers -= 1
+            self._cond.notify_all()
+
+
+class AsyncFairRWLock:
+    """
+    Asyncio counterpart of `FairRWLock`, waited for on the event loop.
+
+    Waiters are served in arrival order; a task cancelled while queued
+    leaves the queue, and one cancelled after being granted the lock
+    releases it. Not thread-safe: use it from one event loop at a time.
+    """
+
+    def __init__(self) -> None:
+        self._queue: Deque[Tuple[bool, "asyncio.Future[None]"]] = deque()
+        self._readers = 0
+        self._writer = False
+
+    @property
+    def waiting(self) -> int:
+        return len(self._queue)
+
+    def _free(self, exclusive: bool) -> bool:
+        return not self._writer and (not exclusive or self._readers == 0)
+
+    def _take(self, exclusive: bool) -> None:
+        if exclusive:
+            self._writer = True
+        else:
+            self._readers += 1
+
+    def _wake(self) -> None:
+        while self._queue:
+            exclusive, future = self._queue[0]
+            if not future.cancelled():
+                if not self._free(exclusive):
+                    return
+                self._take(exclusive)
+                future.set_result(None)
+            self._queue.popleft()
+
+    async def acquire(self, exclusive: bool) -> None:
+        if not self._queue and self._free(exclusive):
+            self._take(exclusive)
+            return
+        entry = (exclusive, asyncio.get_running_loop().create_future())
+        self._queue.append(entry)
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry[1].cancelled():
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                self._wake()
+            else:
+                self.release(exclusive)
+            raise
+
+    def release(self, exclusive: bool) -> None:
+        if exclusive:
+            self._writer = False
+        else:
+            self._readers -= 1
+        self._wake()
+
+
+class FairSlots:
+    """
+    Global concurrency limit shared fairly between spaces.
+
+    When all slots are taken, freed slots are handed to waiting spaces in
+    round-robin order (FIFO within a space), so one busy space cannot
+    starve the others.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._cond = threading.Condition()
+        self._free = limit
+        self._waiting: "OrderedDict[str, Deque[List[bool]]]" = OrderedDict()
+
+    def acquire(self, space_name: str) -> None:
+        with self._cond:
+            if self._free > 0 and not self._waiting:
+                self._free -= 1
+                return
+            entry = [False]
+            self._waiting.setdefault(space_name, deque()).append(entry)
+            while not entry[0]:
+                self._cond.wait()
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self._waiting.values())
+
+    def release(self) -> None:
+        with self._cond:
+            if not self._waiting:
+                self._free += 1
+                return
+            space_name, queue = next(iter(self._waiting.items()))
+            queue.popleft()[0] = True
+            if queue:
+                self._waiting.move_to_end(space_name)
+            else:
+                del self._waiting[space_name]
+            self._cond.notify_all()
+
+
+class SpaceLockManager:
+    """
+    Per-space reader/writer locking for `SpaceGitManager` operations.
+
+    Read-only operations share a space; mutations hold it exclusively.
+    Within a process the locks are fair `FairRWLock` instances. Across
+    processes they are backed by ``flock`` on one lock file per space in
+    ``lock_dir``. An optional ``max_concurrent`` limit caps operations
+    across all spaces and hands out slots round-robin between spaces.
+
+    Queue depth and wait times are available through `stats`.
+    """
+
+    def __init__(
+        self,
+        lock_dir: Optional[str] = None,
+        max_concurrent: Optional[int] = None,
+        cross_process: bool = True,
+    ) -> None:
+        """
+        Args:
+            lock_dir (Optional[str]): Directory for the inter-process lock
+                                      files. Processes sharing spaces must
+                                      use the same directory.
+            max_concurrent (Optional[int]): Cap on concurrent operations
+                                            across all spaces.
+            cross_process (bool): Whether to take ``flock`` locks.
+        """
+        self.lock_dir = lock_dir or os.path.join(
+            tempfile.gettempdir(), "darca-space-git-locks"
+        )
+        self.cross_process = cross_process and fcntl is not None
+        if self.cross_process:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self.max_concurrent = max_concurrent
+        self._slots = FairSlots(max_concurrent) if max_concurrent else None
+        self._locks: Dict[str, FairRWLock] = {}
+        self._guard = threading.Lock()
+        self._acquired = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def __reduce__(self) -> Tuple[type, tuple]:
+        # Pickled for process pools as its configuration: worker processes
+        # get their own in-process locks and share the ``flock`` files.
+        return (
+            type(self),
+            (self.lock_dir, self.max_concurrent, self.cross_process),
+        )
+
+    def _lock_for(self, space_name: str) -> FairRWLock:
+        with self._guard:
+            lock = self._locks.get(space_name)
+            if lock is None:
+                lock = self._locks[space_name] = FairRWLock()
+            return lock
+
+    def _lock_path(self, space_name: str) -> str:
+        digest = hashlib.sha256(space_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.lock_dir, f"{digest[:32]}.lock")
+
+    @contextmanager
+    def hold(
+        self, space_name: str, exclusive: bool = True, blocking: bool = True
+    ) -> Iterator[None]:
+        """
+        Hold a space for the duration of the ``with`` block.
+
+        Args:
+            space_name (str): The space to lock.
+            exclusive (bool): Take a write lock instead of a shared one.
+            blocking (bool): Wait for the space. When False, a space that is
+                             held or has queued requests (in this or another
+                             process) raises ``SPACE_BUSY`` instead. The
+                             global slot limit is still waited for.
+
+        Raises:
+            SpaceGitException: If ``blocking`` is False and the space is
+            busy.
+        """
+        started = time.perf_counter()
+        lock = self._lock_for(space_name)
+        if blocking:
+            lock.acquire(exclusive)
+        elif not lock.try_acquire(exclusive):
+            raise self._busy(space_name)
+        handle = None
+        try:
+            if self.cross_process:
+                handle = open(self._lock_path(space_name), "a+b")
+                mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+                try:
+                    fcntl.flock(
+                        handle, mode if blocking else mode | fcntl.LOCK_NB
+                    )
+                except BlockingIOError:
+                    raise self._busy(space_name)
+            if self._slots is not None:
+                self._slots.acquire(space_name)
+        except BaseException:
+            if handle is not None:
+                handle.close()
+            lock.release(exclusive)
+            raise
+        self._record_wait(time.perf_counter() - started)
+        try:
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+            if handle is not None:
+                handle.close()
+            lock.release(exclusive)
+
+    @staticmethod
+    def _busy(space_name: str) -> SpaceGitException:
+        return SpaceGitException(
+            message=f"Space '{space_name}' is busy.",
+            error_code="SPACE_BUSY",
+            metadata={"space": space_name},
+        )
+
+    def _record_wait(self, waited: float) -> None:
+        with self._guard:
+            self._acquired += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: ``acquired`` count, total ``waiting`` requests,
+                            ``queue_depth`` per space with waiters,
+                            ``slot_waiting`` for the global limit, and
+                            ``wait_seconds_total``/``wait_seconds_max``.
+        """
+        with self._guard:
+            depth = {
+                name: lock.waiting
+                for name, lock in self._locks.items()
+                if lock.waiting
+            }
+            return {
+                "acquired": self._acquired,
+                "waiting": sum(depth.values()),
+                "queue_depth": depth,
+                "slot_waiting": self._slots.waiting if self._slots else 0,
+                "wait_seconds_total": self._wait_total,
+                "wait_seconds_max": self._wait_max,
+            }
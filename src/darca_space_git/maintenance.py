@@ -0,0 +1,371 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from datetime import time as day_time
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from darca_log_facility.logger import DarcaLogger
+
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+from .history import COMMIT_GRAPH_ARGS
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .space_git import SpaceGitManager
+
+logger = DarcaLogger(name="space_git").get_logger()
+
+# Cheap tasks first, so a run cut short still did the useful part.
+MAINTENANCE_TASKS = (
+    "pack-refs",
+    "repack",
+    "prune",
+    "multi-pack-index",
+    "commit-graph",
+)
+
+STAMP_FILE = "darca-maintained"
+
+
+@dataclass(frozen=True)
+class ObjectCounts:
+    """
+    Object storage of a repository, as reported by ``git count-objects``.
+
+    Attributes:
+        loose (int): Loose objects.
+        loose_kib (int): Disk space used by loose objects, in KiB.
+        packed (int): Objects in packs.
+        packs (int): Number of pack files.
+        packs_kib (int): Disk space used by packs, in KiB.
+        garbage (int): Files in the object store git does not recognize.
+    """
+
+    loose: int = 0
+    loose_kib: int = 0
+    packed: int = 0
+    packs: int = 0
+    packs_kib: int = 0
+    garbage: int = 0
+
+
+@dataclass(frozen=True)
+class MaintenancePolicy:
+    """
+    What maintenance does and when a space is due for it.
+
+    A space is due when it has at least ``loose_threshold`` loose objects,
+    more than ``pack_limit`` packs, or was last maintained ``interval``
+    seconds ago or longer.
+
+    Attributes:
+        tasks (Tuple[str, ...]): Tasks to run, a subset of
+                                 `MAINTENANCE_TASKS`; run in that order.
+        loose_threshold (int): Loose objects that make a space due.
+        pack_limit (int): Packs above which a space is due and ``repack``
+                          consolidates all packs into one.
+        interval (Optional[float]): Seconds after which a space is due
+                                    regardless of counts; None disables.
+        prune_expire (str): Only unreachable loose objects older than this
+                            are pruned, protecting concurrent writers.
+        pack_threads (Optional[int]): Threads git may use for packing;
+                                      None lets git decide.
+    """
+
+    tasks: Tuple[str, ...] = MAINTENANCE_TASKS
+    loose_threshold: int = 1000
+    pack_limit: int = 50
+    interval: Optional[float] = 24 * 3600.0
+    prune_expire: str = "2.weeks.ago"
+    pack_threads: Optional[int] = 1
+
+    def __post_init__(self) -> None:
+        unknown = [t for t in self.tasks if t not in MAINTENANCE_TASKS]
+        if unknown:
+            raise SpaceGitException(
+                message=(
+                    f"Unknown maintenance tasks {unknown}; expected any of "
+                    f"{', '.join(MAINTENANCE_TASKS)}."
+                ),
+                error_code="INVALID_MAINTENANCE_POLICY",
+                metadata={"tasks": list(self.tasks)},
+            )
+
+    def is_due(self, counts: ObjectCounts, age: Optional[float]) -> bool:
+        """
+        Args:
+            counts (ObjectCounts): Current object counts.
+            age (Optional[float]): Seconds since the last maintenance; None
+                                   if the space was never maintained.
+        """
+        return (
+            counts.loose >= self.loose_threshold
+            or counts.packs > self.pack_limit
+            or (
+                self.interval is not None
+                and (age is None or age >= self.interval)
+            )
+        )
+
+    def task_args(self, task: str, counts: ObjectCounts) -> List[str]:
+        """
+        Build the git arguments of one task.
+        """
+        config = []
+        if self.pack_threads is not None:
+            config = ["-c", f"pack.threads={self.pack_threads}"]
+        if task == "pack-refs":
+            return ["pack-refs", "--all"]
+        if task == "repack":
+            # Without -a only loose objects are packed, which is cheap; all
+            # packs are rewritten once there are too many of them. -l keeps
+            # objects borrowed from a mirror out of the space's packs.
+            consolidate = ["-a"] if counts.packs > self.pack_limit else []
+            return [*config, "repack", "-d", "-l", "-q", *consolidate]
+        if task == "prune":
+            return ["prune", f"--expire={self.prune_expire}"]
+        if task == "multi-pack-index":
+            return [*config, "multi-pack-index", "write"]
+        return list(COMMIT_GRAPH_ARGS)
+
+
+@dataclass(frozen=True)
+class MaintenanceReport:
+    """
+    Outcome of maintenance for one space.
+
+    Attributes:
+        space_name (str): The space.
+        status (str): ``maintained``, ``not_due``, ``busy`` (locked by
+                      another operation), ``deferred`` (budget or window
+                      exhausted) or ``failed``.
+        tasks (Tuple[str, ...]): Tasks that ran.
+        before (Optional[ObjectCounts]): Counts before maintenance.
+        after (Optional[ObjectCounts]): Counts after maintenance.
+        elapsed (float): Wall time spent on the space, in seconds.
+        error (Optional[SpaceGitException]): The failure, if any.
+    """
+
+    space_name: str
+    status: str
+    tasks: Tuple[str, ...] = ()
+    before: Optional[ObjectCounts] = None
+    after: Optional[ObjectCounts] = None
+    elapsed: float = 0.0
+    error: Optional[SpaceGitException] = field(default=None, compare=False)
+
+
+def count_objects(git_process: GitProcess, repo_path: str) -> ObjectCounts:
+    """
+    Read object counts with ``git count-objects -v``.
+    """
+    out = git_process.run(["count-objects", "-v"], repo_path)
+    values: Dict[str, int] = {}
+    for line in out.decode("ascii", "replace").splitlines():
+        key, _, value = line.partition(":")
+        if value.strip().isdigit():
+            values[key.strip()] = int(value)
+    return ObjectCounts(
+        loose=values.get("count", 0),
+        loose_kib=values.get("size", 0),
+        packed=values.get("in-pack", 0),
+        packs=values.get("packs", 0),
+        packs_kib=values.get("size-pack", 0),
+        garbage=values.get("garbage", 0),
+    )
+
+
+def last_maintained(repo_path: str) -> Optional[float]:
+    """
+    Return when a space was last maintained, or None if never.
+    """
+    try:
+        return os.stat(os.path.join(repo_path, ".git", STAMP_FILE)).st_mtime
+    except OSError:
+        return None
+
+
+def mark_maintained(repo_path: str) -> None:
+    with open(os.path.join(repo_path, ".git", STAMP_FILE), "w"):
+        pass
+
+
+class MaintenanceScheduler:
+    """
+    Runs `SpaceGitManager.maintain` across spaces within a budget.
+
+    Each run visits the spaces in turn (those deferred by the previous run
+    first) and stops starting new spaces once ``time_budget`` is used up or
+    the current time leaves ``window``. Spaces that are locked by another
+    operation are skipped rather than waited for. ``duty_cycle`` bounds
+    the share of wall time spent maintaining: at 0.25 the scheduler rests
+    three times as long as each space took, leaving CPU and disk to
+    regular traffic.
+
+    Runs happen on demand through `run_once`, or every ``period`` seconds
+    on a background thread started with `start`.
+    """
+
+    def __init__(
+        self,
+        manager: "SpaceGitManager",
+        policy: Optional[MaintenancePolicy] = None,
+        spaces: Optional[Iterable[str]] = None,
+        time_budget: Optional[float] = None,
+        window: Optional[Tuple[day_time, day_time]] = None,
+        duty_cycle: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        now: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        """
+        Args:
+            manager (SpaceGitManager): Manager whose spaces are maintained.
+            policy (Optional[MaintenancePolicy]): Tasks and due rules.
+            spaces (Optional[Iterable[str]]): Spaces to maintain; all spaces
+                                              of the `SpaceManager` when
+                                              omitted.
+            time_budget (Optional[float]): Seconds per run after which no
+                                           new space is started.
+            window (Optional[Tuple[time, time]]): Local start and end time
+                                                  of day during which runs
+                                                  may work; may wrap past
+                                                  midnight.
+            duty_cycle (float): Share of wall time spent maintaining,
+                                between 0 (exclusive) and 1.
+        """
+        if not 0 < duty_cycle <= 1:
+            raise SpaceGitException(
+                message=f"duty_cycle must be in (0, 1], got {duty_cycle}.",
+                error_code="INVALID_MAINTENANCE_POLICY",
+                metadata={"duty_cycle": duty_cycle},
+            )
+        self.manager = manager
+        self.policy = policy or MaintenancePolicy()
+        self.spaces = list(spaces) if spaces is not None else None
+        self.time_budget = time_budget
+        self.window = window
+        self.duty_cycle = duty_cycle
+        self.clock = clock
+        self.now = now
+        self.reports: Dict[str, MaintenanceReport] = {}
+        self._deferred: Deque[str] = deque()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def in_window(self) -> bool:
+        if self.window is None:
+            return True
+        start, end = self.window
+        current = self.now().time()
+        if start <= end:
+            return start <= current < end
+        return current >= start or current < end
+
+    def _space_names(self) -> List[str]:
+        if self.spaces is not None:
+            names = list(self.spaces)
+        else:
+            names = [
+                space if isinstance(space, str) else space["name"]
+                for space in self.manager.space_manager.list_spaces()
+            ]
+        deferred = [name for name in self._deferred if name in names]
+        return deferred + [name for name in names if name not in deferred]
+
+    def run_once(self) -> List[MaintenanceReport]:
+        """
+        Maintain every due space once, within the budget and window.
+
+        Failures are reported per space and never stop the run.
+
+        Returns:
+            List[MaintenanceReport]: One report per space.
+        """
+        started = self.clock()
+        reports: List[MaintenanceReport] = []
+        names = self._space_names()
+        self._deferred.clear()
+        for name in names:
+            out_of_budget = (
+                self.time_budget is not None
+                and self.clock() - started >= self.time_budget
+            )
+            if out_of_budget or self._stop.is_set() or not self.in_window():
+                self._deferred.append(name)
+                reports.append(MaintenanceReport(name, "deferred"))
+                continue
+            report = self._maintain(name)
+            reports.append(report)
+            if report.status == "maintained" and self.duty_cycle < 1:
+                self._stop.wait(
+                    report.elapsed * (1 - self.duty_cycle) / self.duty_cycle
+                )
+        for report in reports:
+            self.reports[report.space_name] = report
+        return reports
+
+    def _maintain(self, space_name: str) -> MaintenanceReport:
+        try:
+            return self.manager.maintain(
+                space_name, self.policy, blocking=False
+            )
+        except SpaceGitException as e:
+            if e.error_code == "SPACE_BUSY":
+                return MaintenanceReport(space_name, "busy")
+            logger.warning(f"Maintenance of space '{space_name}' failed: {e}")
+            return MaintenanceReport(space_name, "failed", error=e)
+
+    def start(self, period: float) -> None:
+        """
+        Run `run_once` every ``period`` seconds on a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop,
+            args=(period,),
+            name="darca-space-git-maintenance",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _loop(self, period: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:  # keep the scheduler alive
+                logger.error(f"Maintenance run failed: {e}")
+            self._stop.wait(period)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread after the space it is working on.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Number of spaces per status in the latest
+                            reports.
+        """
+        counts: Dict[str, int] = {}
+        for report in self.reports.values():
+            counts[report.status] = counts.get(report.status, 0) + 1
+        return counts
@@ -0,0 +1,354 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from darca_log_facility.logger import DarcaLogger
+
+from .exceptions import SpaceGitException
+
+logger = DarcaLogger(name="space_git").get_logger()
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed bucket bounds.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            yield repr(bound), total
+        yield "+Inf", self.count
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": dict(self.cumulative()),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class OperationRecord:
+    """
+    Timing and resource usage of one running operation.
+    """
+
+    __slots__ = (
+        "operation",
+        "space_name",
+        "started",
+        "phases",
+        "spawns",
+        "stdout_bytes",
+    )
+
+    def __init__(self, operation: str, space_name: str) -> None:
+        self.operation = operation
+        self.space_name = space_name
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.spawns = 0
+        self.stdout_bytes = 0
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Attribute the time spent in the ``with`` block to a phase.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (
+                self.phases.get(name, 0.0) + time.perf_counter() - started
+            )
+
+    @contextmanager
+    def git_call(self) -> Iterator[None]:
+        """
+        Time one git subprocess started outside `GitProcess`.
+        """
+        self.spawns += 1
+        with self.phase("git"):
+            yield
+
+    def spawned(self, stdout_bytes: int = 0) -> None:
+        self.spawns += 1
+        self.stdout_bytes += stdout_bytes
+
+    def add_stdout(self, stdout_bytes: int) -> None:
+        self.stdout_bytes += stdout_bytes
+
+
+class _NullRecord:
+    """
+    Stand-in used when metrics are disabled; every method is a no-op.
+    """
+
+    __slots__ = ()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        yield
+
+    @contextmanager
+    def git_call(self) -> Iterator[None]:
+        yield
+
+    def spawned(self, stdout_bytes: int = 0) -> None:
+        pass
+
+    def add_stdout(self, stdout_bytes: int) -> None:
+        pass
+
+
+NULL_RECORD = _NullRecord()
+
+_current: ContextVar[Optional[OperationRecord]] = ContextVar(
+    "darca_space_git_operation", default=None
+)
+
+
+def current_record() -> Any:
+    """
+    Return the record of the operation running in this context, or a
+    no-op record when there is none.
+    """
+    return _current.get() or NULL_RECORD
+
+
+def note_spawn(stdout_bytes: int = 0) -> None:
+    """
+    Count a git subprocess against the operation running in this context.
+    """
+    record = _current.get()
+    if record is not None:
+        record.spawned(stdout_bytes)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class OperationMetrics:
+    """
+    Instrumentation for `SpaceGitManager` operations.
+
+    Collects latency histograms per operation and per space, time per
+    phase (lock, resolve, write, git), git subprocess spawns, bytes read
+    from git and error counts by ``error_code``. Operations slower than
+    ``slow_threshold`` seconds are logged with their phase breakdown.
+
+    When ``enabled`` is False operations receive a shared no-op record and
+    nothing is collected.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        slow_threshold: Optional[float] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        per_space: bool = True,
+    ) -> None:
+        """
+        Args:
+            enabled (bool): Whether to collect anything.
+            slow_threshold (Optional[float]): Log operations slower than
+                                              this many seconds.
+            buckets (Sequence[float]): Histogram bucket upper bounds.
+            per_space (bool): Also keep a latency histogram per space.
+        """
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.buckets = tuple(buckets)
+        self.per_space = per_space
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Discard everything collected so far.
+        """
+        with self._lock:
+            self._operations: Dict[str, Histogram] = {}
+            self._spaces: Dict[str, Histogram] = {}
+            self._phases: Dict[Tuple[str, str], float] = {}
+            self._spawns: Dict[str, int] = {}
+            self._stdout: Dict[str, int] = {}
+            self._errors: Dict[Tuple[str, str], int] = {}
+
+    @contextmanager
+    def track(self, operation: str, space_name: str) -> Iterator[Any]:
+        """
+        Measure an operation for the duration of the ``with`` block.
+
+        Yields:
+            OperationRecord: The record to attach phases to, or a no-op
+                             record when disabled.
+        """
+        if not self.enabled:
+            yield NULL_RECORD
+            return
+        record = OperationRecord(operation, space_name)
+        token = _current.set(record)
+        error_code = None
+        try:
+            yield record
+        except SpaceGitException as e:
+            error_code = e.error_code
+            raise
+        except Exception:
+            error_code = "UNEXPECTED_ERROR"
+            raise
+        finally:
+            _current.reset(token)
+            self._finish(record, error_code)
+
+    def _finish(
+        self, record: OperationRecord, error_code: Optional[str]
+    ) -> None:
+        elapsed = time.perf_counter() - record.started
+        operation = record.operation
+        with self._lock:
+            self._histogram(self._operations, operation).observe(elapsed)
+            if self.per_space:
+                self._histogram(self._spaces, record.space_name).observe(
+                    elapsed
+                )
+            for phase, seconds in record.phases.items():
+                key = (operation, phase)
+                self._phases[key] = self._phases.get(key, 0.0) + seconds
+            self._spawns[operation] = (
+                self._spawns.get(operation, 0) + record.spawns
+            )
+            self._stdout[operation] = (
+                self._stdout.get(operation, 0) + record.stdout_bytes
+            )
+            if error_code:
+                key = (operation, error_code)
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+        if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+            breakdown = ", ".join(
+                f"{phase}={seconds:.3f}s"
+                for phase, seconds in sorted(record.phases.items())
+            )
+            logger.warning(
+                f"Slow operation '{operation}' on space "
+                f"'{record.space_name}' took {elapsed:.3f}s "
+                f"({breakdown or 'no phases'}; spawns={record.spawns})"
+            )
+
+    def _histogram(self, table: Dict[str, Histogram], key: str) -> Histogram:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        return histogram
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: All collected metrics as plain data.
+        """
+        with self._lock:
+            return {
+                "operations": {
+                    name: h.to_dict() for name, h in self._operations.items()
+                },
+                "spaces": {
+                    name: h.to_dict() for name, h in self._spaces.items()
+                },
+                "phases": {
+                    f"{op}.{phase}": seconds
+                    for (op, phase), seconds in self._phases.items()
+                },
+                "spawns": dict(self._spawns),
+                "stdout_bytes": dict(self._stdout),
+                "errors": {
+                    f"{op}.{code}": count
+                    for (op, code), count in self._errors.items()
+                },
+            }
+
+    def to_prometheus(self, prefix: str = "darca_space_git") -> str:
+        """
+        Render the collected metrics in the Prometheus text format.
+        """
+        lines = []
+
+        def histogram(name: str, label: str, table: Dict[str, Histogram]):
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, h in sorted(table.items()):
+                value = _escape(key)
+                for bound, count in h.cumulative():
+                    lines.append(
+                        f'{prefix}_{name}_bucket{{{label}="{value}",'
+                        f'le="{bound}"}} {count}'
+                    )
+                lines.append(
+                    f'{prefix}_{name}_sum{{{label}="{value}"}} {h.sum}'
+                )
+                lines.append(
+                    f'{prefix}_{name}_count{{{label}="{value}"}} {h.count}'
+                )
+
+        with self._lock:
+            histogram("operation_seconds", "operation", self._operations)
+            if self.per_space:
+                histogram("space_operation_seconds", "space", self._spaces)
+            lines.append(f"# TYPE {prefix}_phase_seconds_total counter")
+            for (op, phase), seconds in sorted(self._phases.items()):
+                lines.append(
+                    f'{prefix}_phase_seconds_total{{operation="{op}",'
+                    f'phase="{phase}"}} {seconds}'
+                )
+            for name, table in (
+                ("subprocess_spawns_total", self._spawns),
+                ("stdout_bytes_total", self._stdout),
+            ):
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for op, value in sorted(table.items()):
+                    lines.append(
+                        f'{prefix}_{name}{{operation="{op}"}} {value}'
+                    )
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for (op, code), count in sorted(self._errors.items()):
+                lines.append(
+                    f'{prefix}_errors_total{{operation="{op}",'
+                    f'error_code="{_escape(code)}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
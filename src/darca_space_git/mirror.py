@@ -0,0 +1,232 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from darca_log_facility.logger import DarcaLogger
+
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = DarcaLogger(name="space_git").get_logger()
+
+_STAMP = "darca-refreshed"
+
+# Spaces borrow objects from the mirror through alternates, so the mirror
+# must never drop an object on its own: no automatic gc, no pruning of
+# unreachable objects and no pruning of refs deleted upstream.
+_MIRROR_CONFIG = (
+    ("gc.auto", "0"),
+    ("gc.pruneExpire", "never"),
+    ("gc.reflogExpireUnreachable", "never"),
+    ("fetch.prune", "false"),
+    ("repack.writeBitmaps", "true"),
+)
+
+
+def _alternates(repo_path: str) -> str:
+    return os.path.join(repo_path, ".git", "objects", "info", "alternates")
+
+
+def dissociate(git_process: GitProcess, repo_path: str) -> bool:
+    """
+    Copy every borrowed object into a repository and stop using its
+    alternates, so it no longer depends on any mirror.
+
+    Returns:
+        bool: False if the repository had no alternates.
+
+    Raises:
+        SpaceGitException: If repacking fails.
+    """
+    alternates = _alternates(repo_path)
+    if not os.path.exists(alternates):
+        return False
+    try:
+        git_process.run(["repack", "-a", "-d", "-q"], repo_path)
+        os.remove(alternates)
+    except (SpaceGitException, OSError) as e:
+        raise SpaceGitException(
+            message="Failed to dissociate repository from its mirror.",
+            error_code="MIRROR_FAILED",
+            metadata={"repo_path": repo_path},
+            cause=e,
+        )
+    return True
+
+
+class MirrorCache:
+    """
+    Bare mirrors of remotes shared by every space cloning the same URL.
+
+    Each remote URL gets one ``git clone --mirror`` below ``root``. Spaces
+    are cloned with ``--reference`` to it, so objects are fetched and stored
+    once for the whole fleet and spaces only keep what is local to them.
+
+    Because spaces depend on the mirror's objects, mirrors are configured to
+    never prune anything, and `repack` keeps unreachable objects. Use
+    `dissociate` to make a space self-contained before deleting a mirror.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        refresh_interval: float = 60.0,
+        git_process: Optional[GitProcess] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            root (Optional[str]): Directory holding the mirrors. Processes
+                                  sharing mirrors must use the same root.
+            refresh_interval (float): Seconds before `ensure` fetches into an
+                                      existing mirror again.
+            git_process (Optional[GitProcess]): Runner for git commands.
+            clock (Callable[[], float]): Wall clock, compared against file
+                                         modification times.
+        """
+        self.root = root or os.path.join(
+            tempfile.gettempdir(), "darca-space-git-mirrors"
+        )
+        self.refresh_interval = refresh_interval
+        self.git_process = git_process or GitProcess()
+        self._clock = clock
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def __reduce__(self) -> Tuple[type, tuple]:
+        # Pickled for process pools as its configuration; every process
+        # sharing ``root`` sees the same mirrors.
+        return type(self), (self.root, self.refresh_interval)
+
+    def mirror_path(self, repo_url: str) -> str:
+        """
+        Returns:
+            str: Path of the mirror for ``repo_url`` (it may not exist yet).
+        """
+        digest = hashlib.sha256(repo_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, f"{digest[:32]}.git")
+
+    def uses_mirror(self, repo_path: str) -> bool:
+        """
+        Whether a repository borrows objects from a mirror under ``root``.
+        """
+        root = os.path.realpath(self.root) + os.sep
+        try:
+            with open(_alternates(repo_path), encoding="utf-8") as handle:
+                return any(
+                    os.path.realpath(line.strip()).startswith(root)
+                    for line in handle
+                    if line.strip()
+                )
+        except OSError:
+            return False
+
+    def ensure(self, repo_url: str, refresh: bool = True) -> str:
+        """
+        Create the mirror of a remote, or refresh it when it is older than
+        ``refresh_interval``.
+
+        Args:
+            repo_url (str): URL of the remote.
+            refresh (bool): Fetch into an existing, stale mirror.
+
+        Returns:
+            str: Path of the mirror.
+
+        Raises:
+            SpaceGitException: If cloning or fetching the mirror fails.
+        """
+        path = self.mirror_path(repo_url)
+        with self._hold(path):
+            try:
+                if not os.path.isdir(path):
+                    self._create(repo_url, path)
+                elif refresh and self._is_stale(path):
+                    self.git_process.run(["fetch", "--quiet", "origin"], path)
+                    self._stamp(path)
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message="Failed to update mirror.",
+                    error_code="MIRROR_FAILED",
+                    metadata={"url": repo_url, "mirror": path},
+                    cause=e,
+                )
+        return path
+
+    def repack(self, repo_url: str) -> None:
+        """
+        Repack a mirror into a single pack without dropping any object that
+        spaces may still borrow.
+
+        Raises:
+            SpaceGitException: If the mirror does not exist or repacking
+            fails.
+        """
+        path = self.mirror_path(repo_url)
+        with self._hold(path):
+            try:
+                self.git_process.run(
+                    ["repack", "-a", "-d", "-q", "--keep-unreachable"], path
+                )
+                self.git_process.run(["pack-refs", "--all"], path)
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to repack mirror.",
+                    error_code="MIRROR_FAILED",
+                    metadata={"url": repo_url, "mirror": path},
+                    cause=e,
+                )
+
+    def _create(self, repo_url: str, path: str) -> None:
+        # Clone next to the final location and rename, so a half-written
+        # mirror is never picked up as a reference.
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            self.git_process.run(
+                ["clone", "--mirror", "--quiet", repo_url, tmp], self.root
+            )
+            for key, value in _MIRROR_CONFIG:
+                self.git_process.run(["config", key, value], tmp)
+            self._stamp(tmp)
+            os.rename(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.debug(f"Created mirror of '{repo_url}' at '{path}'")
+
+    def _is_stale(self, path: str) -> bool:
+        try:
+            refreshed = os.path.getmtime(os.path.join(path, _STAMP))
+        except OSError:
+            return True
+        return self._clock() - refreshed >= self.refresh_interval
+
+    @staticmethod
+    def _stamp(path: str) -> None:
+        stamp = os.path.join(path, _STAMP)
+        with open(stamp, "a"):
+            pass
+        os.utime(stamp)
+
+    @contextmanager
+    def _hold(self, path: str) -> Iterator[None]:
+        with self._guard:
+            lock = self._locks.setdefault(path, threading.Lock())
+        with lock:
+            if fcntl is None:  # pragma: no cover
+                yield
+                return
+            with open(path + ".lock", "a+b") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                yield
@@ -0,0 +1,130 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Optional
+
+
+class _CachedPath(NamedTuple):
+    path: str
+    expires_at: Optional[float]
+    st_dev: int
+    st_ino: int
+
+
+class SpacePathCache:
+    """
+    Thread-safe LRU/TTL cache of resolved space paths.
+
+    Entries are validated on every hit with a single ``os.stat`` call. If the
+    directory has disappeared or was replaced (different device/inode), the
+    entry is dropped and the path is resolved again, so a stale path never
+    reaches git.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that required a resolution.
+        stale (int): Number of cached entries rejected by validation.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 30.0,
+        maxsize: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            ttl (Optional[float]): Seconds an entry stays valid. ``None``
+                                   disables expiry.
+            maxsize (int): Maximum number of cached spaces. ``0`` disables
+                           caching entirely.
+            clock (Callable[[], float]): Monotonic time source.
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries: "OrderedDict[str, _CachedPath]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, space_name: str, resolver: Callable[[str], str]) -> str:
+        """
+        Return the cached path of a space, resolving it on a miss.
+
+        Args:
+            space_name (str): Name of the space.
+            resolver (Callable[[str], str]): Called with the space name to
+                                             resolve the path on a miss.
+
+        Returns:
+            str: Filesystem path of the space.
+        """
+        with self._lock:
+            entry = self._entries.get(space_name)
+            if entry is not None:
+                if self._is_valid(entry):
+                    self._entries.move_to_end(space_name)
+                    self.hits += 1
+                    return entry.path
+                del self._entries[space_name]
+            self.misses += 1
+
+        path = resolver(space_name)
+        self._store(space_name, path)
+        return path
+
+    def invalidate(self, space_name: Optional[str] = None) -> None:
+        """
+        Drop a single cached space, or every entry when no name is given.
+        """
+        with self._lock:
+            if space_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(space_name, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Hit, miss and stale counters plus current size.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "size": len(self._entries),
+            }
+
+    def _is_valid(self, entry: _CachedPath) -> bool:
+        if entry.expires_at is not None and self._clock() >= entry.expires_at:
+            return False
+        try:
+            st = os.stat(entry.path)
+        except OSError:
+            self.stale += 1
+            return False
+        if (st.st_dev, st.st_ino) != (entry.st_dev, entry.st_ino):
+            self.stale += 1
+            return False
+        return True
+
+    def _store(self, space_name: str, path: str) -> None:
+        if self.maxsize <= 0:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Never cache a path we cannot validate later.
+            return
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[space_name] = _CachedPath(
+                path, expires_at, st.st_dev, st.st_ino
+            )
+            self._entries.move_to_end(space_name)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
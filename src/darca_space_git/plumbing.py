@@ -0,0 +1,238 @@
+import hashlib
+import os
+import tempfile
+from contextlib import nullcontext
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+)
+
+from .archive import write_chunks
+from .content import write_file_chunks
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+
+REGULAR_FILE_MODE = "100644"
+PATHSPEC_FROM_STDIN = ("--pathspec-from-file=-", "--pathspec-file-nul")
+
+
+def resolve_commit(
+    git_process: GitProcess, repo_path: str, ref: str = "HEAD"
+) -> Optional[str]:
+    """
+    Return the commit id a ref points to, or None for an unborn branch.
+    """
+    try:
+        out = git_process.run(
+            ["rev-parse", "--verify", "-q", f"{ref}^{{commit}}"], repo_path
+        )
+    except SpaceGitException:
+        return None
+    return out.decode("ascii").strip()
+
+
+def tree_entry(
+    git_process: GitProcess, repo_path: str, path: str, ref: str = "HEAD"
+) -> Optional[str]:
+    """
+    Return the object id recorded for ``path`` at ``ref``, or None when
+    the path (or the ref) does not exist.
+    """
+    try:
+        out = git_process.run(
+            ["rev-parse", "--verify", "-q", f"{ref}:{path}"], repo_path
+        )
+    except SpaceGitException:
+        return None
+    return out.decode("ascii").strip() or None
+
+
+def blob_id(data: bytes, oid_length: int = 40) -> str:
+    """
+    Return the id git gives a blob holding ``data``, as ``git hash-object
+    --no-filters`` would, without running git.
+
+    Args:
+        oid_length (int): Length of the repository's object ids; ``64``
+                          selects SHA-256 repositories.
+    """
+    if oid_length == 64:
+        digest = hashlib.sha256()
+    else:
+        digest = hashlib.sha1(usedforsecurity=False)
+    digest.update(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def hash_files(
+    git_process: GitProcess,
+    repo_path: str,
+    file_paths: Sequence[str],
+    no_filters: bool = False,
+) -> List[str]:
+    """
+    Write files into the object database with a single
+    ``git hash-object -w --stdin-paths`` call.
+
+    Args:
+        file_paths (Sequence[str]): Paths of the files to hash, absolute or
+                                    relative to ``repo_path``.
+        no_filters (bool): Hash raw bytes, skipping attribute filters.
+
+    Returns:
+        List[str]: Blob ids in input order.
+    """
+    args = ["hash-object", "-w", "--stdin-paths"]
+    if no_filters:
+        args.append("--no-filters")
+    stdin = "".join(f"{p}\n" for p in file_paths)
+    out = git_process.run(args, repo_path, input=os.fsencode(stdin))
+    return out.decode("ascii").split()
+
+
+def pathspec_input(paths: Sequence[str]) -> bytes:
+    """
+    Build NUL-terminated input for ``--pathspec-from-file=-
+    --pathspec-file-nul``, which has no argument size limit.
+    """
+    return b"".join(os.fsencode(p) + b"\0" for p in paths)
+
+
+def push_commands(remote_url: Optional[str] = None) -> List[List[str]]:
+    """
+    Build the commands ``darca_git``'s ``Git.push`` runs: point ``origin``
+    at ``remote_url`` when given, then push ``HEAD`` setting its upstream.
+    """
+    commands = []
+    if remote_url:
+        commands += [
+            ["remote", "remove", "origin"],
+            ["remote", "add", "origin", remote_url],
+        ]
+    return commands + [["push", "-u", "origin", "HEAD"]]
+
+
+def index_info(blobs: Dict[str, str]) -> bytes:
+    """
+    Build NUL-terminated ``git update-index -z --index-info`` input.
+    """
+    return b"".join(
+        os.fsencode(f"{REGULAR_FILE_MODE} blob {oid}\t{path}") + b"\0"
+        for path, oid in blobs.items()
+    )
+
+
+def commit_blobs(
+    git_process: GitProcess,
+    repo_path: str,
+    blobs: Dict[str, str],
+    message: str,
+    ref: str = "HEAD",
+) -> str:
+    """
+    Create one commit that sets ``blobs`` on top of ``ref`` without
+    touching the working tree or the repository's index.
+
+    A throw-away index is seeded from the parent, updated with the new
+    blobs, turned into a tree and committed. The ref is then moved with a
+    compare-and-swap, so a concurrent commit makes this call fail instead
+    of being silently overwritten.
+
+    Args:
+        blobs (Dict[str, str]): Blob id per repository-relative path.
+        message (str): Commit message.
+        ref (str): Ref to commit onto.
+
+    Returns:
+        str: The new commit id.
+    """
+    parent = resolve_commit(git_process, repo_path, ref)
+    with tempfile.TemporaryDirectory(prefix="darca-index-") as tmp:
+        env = {"GIT_INDEX_FILE": os.path.join(tmp, "index")}
+        if parent:
+            git_process.run(["read-tree", parent], repo_path, env=env)
+        git_process.run(
+            ["update-index", "--add", "-z", "--index-info"],
+            repo_path,
+            input=index_info(blobs),
+            env=env,
+        )
+        tree = git_process.run(["write-tree"], repo_path, env=env)
+    commit_args = ["commit-tree", tree.decode("ascii").strip(), "-m", message]
+    if parent:
+        commit_args += ["-p", parent]
+    commit = git_process.run(commit_args, repo_path).decode("ascii").strip()
+    summary = message.splitlines()[0] if message else ""
+    git_process.run(
+        ["update-ref", "-m", f"commit: {summary}", ref, commit, parent or ""],
+        repo_path,
+    )
+    return commit
+
+
+def commit_contents(
+    git_process: GitProcess,
+    repo_path: str,
+    contents: Dict[str, Iterable[bytes]],
+    message: str,
+    materialize: bool = True,
+    phase: Optional[Callable[[str], ContextManager[object]]] = None,
+) -> str:
+    """
+    Commit chunked content per normalized path as one commit with
+    `commit_blobs`.
+
+    With ``materialize`` the files are written to the working tree, hashed
+    from there and recorded in the index; otherwise they are hashed from
+    temporary files without filters and the working tree is left alone.
+
+    Args:
+        contents (Dict[str, Iterable[bytes]]): Chunks per path.
+        message (str): Commit message.
+        materialize (bool): Also update the working tree and index.
+        phase (Optional[Callable]): Context manager factory timing the
+                                    ``"write"`` and ``"git"`` phases, such
+                                    as `OperationRecord.phase`.
+
+    Returns:
+        str: The new commit id.
+    """
+    phase = phase or _untimed
+    if materialize:
+        with phase("write"):
+            for relative_path, chunks in contents.items():
+                write_file_chunks(repo_path, relative_path, chunks)
+        with phase("git"):
+            oids = hash_files(git_process, repo_path, list(contents))
+    else:
+        with tempfile.TemporaryDirectory(prefix="darca-blobs-") as tmp:
+            blob_paths = []
+            with phase("write"):
+                for i, chunks in enumerate(contents.values()):
+                    blob_paths.append(os.path.join(tmp, str(i)))
+                    with open(blob_paths[-1], "wb") as blob:
+                        write_chunks(chunks, blob)
+            with phase("git"):
+                oids = hash_files(
+                    git_process, repo_path, blob_paths, no_filters=True
+                )
+    blobs = dict(zip(contents, oids))
+    with phase("git"):
+        commit = commit_blobs(git_process, repo_path, blobs, message)
+        if materialize:
+            git_process.run(
+                ["update-index", "--add", "-z", "--index-info"],
+                repo_path,
+                input=index_info(blobs),
+            )
+    return commit
+
+
+def _untimed(name: str) -> ContextManager[object]:
+    return nullcontext()
@@ -1,11 +1,96 @@
-from typing import List, Optional, Union
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 from darca_git.git import Git, GitException
 from darca_log_facility.logger import DarcaLogger
 from darca_space_manager.space_file_manager import SpaceFileManager
 from darca_space_manager.space_manager import SpaceManager
 
+from .archive import archive_args, write_chunks
+from .backend import GitBackend, SubprocessBackend, validate_backends
+from .bulk import BulkResult, read_remote_url, remote_host, run_bulk
+from .cat_file import CatFilePool
+from .changes import PullResult, changed_paths, remote_matches_tracking
+from .clone_profile import CloneProfile
+from .commit_queue import CommitQueue
+from .content import (
+    FileContent,
+    StreamContent,
+    content_chunks,
+    is_buffered,
+    is_managed,
+    missing_paths,
+    normalize_path,
+    serialize_content,
+    write_file_chunks,
+)
+from .deadline import (
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    validate_timeouts,
+)
+from .diff import (
+    FileDiff,
+    diff_args,
+    parse_name_status_stream,
+    parse_numstat_stream,
+    parse_patch_stream,
+    split_records,
+)
+from .dirty import DirtyPathTracker
 from .exceptions import SpaceGitException
+from .git_process import GitProcess
+from .history import (
+    COMMIT_GRAPH_ARGS,
+    Commit,
+    HistoryPage,
+    TimeFilter,
+    decode_cursor,
+    encode_cursor,
+    log_args,
+    parse_log_stream,
+)
+from .locking import SpaceLockManager
+from .maintenance import (
+    MaintenancePolicy,
+    MaintenanceReport,
+    count_objects,
+    last_maintained,
+    mark_maintained,
+)
+from .metrics import OperationMetrics, OperationRecord, current_record
+from .mirror import MirrorCache, dissociate
+from .path_cache import SpacePathCache
+from .plumbing import (
+    PATHSPEC_FROM_STDIN,
+    blob_id,
+    commit_contents,
+    pathspec_input,
+    push_commands,
+    tree_entry,
+)
+from .status import StatusCache, StatusEntry
+from .worktrees import WorktreePool, remove_stale_index_lock
+
+T = TypeVar("T")
 
 logger = DarcaLogger(name="space_git").get_logger()
 
@@ -19,15 +104,416 @@ class SpaceGitManager:
     and avoid any direct user interaction with the file system.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        path_cache_ttl: Optional[float] = 30.0,
+        path_cache_size: int = 1024,
+        cat_file_idle_timeout: float = 300.0,
+        commit_queue_window: float = 0.05,
+        commit_queue_max_files: int = 100,
+        locks: Optional[SpaceLockManager] = None,
+        metrics: Optional[OperationMetrics] = None,
+        mirrors: Optional[MirrorCache] = None,
+        dirty_tracking: bool = False,
+        bulk_path_threshold: int = 64,
+        commit_graph: bool = False,
+        backends: Optional[Dict[str, GitBackend]] = None,
+        worktree_pool_size: int = 0,
+        timeouts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        """
+        Args:
+            path_cache_ttl (Optional[float]): Seconds a resolved space path
+                                              is cached. ``None`` disables
+                                              expiry.
+            path_cache_size (int): Maximum number of cached space paths.
+                                   ``0`` disables the cache.
+            cat_file_idle_timeout (float): Seconds before an idle pooled
+                                           ``git cat-file`` process is
+                                           closed.
+            commit_queue_window (float): Seconds `enqueue_commit` collects
+                                         writes before a group commit.
+            commit_queue_max_files (int): Writes that trigger a group commit
+                                          before the window ends.
+            locks (Optional[SpaceLockManager]): Lock manager serializing
+                                                operations per space. A
+                                                default instance is created
+                                                when omitted.
+            metrics (Optional[OperationMetrics]): Operation instrumentation.
+                                                  Disabled by default.
+            mirrors (Optional[MirrorCache]): Shared mirrors that clones
+                                             borrow objects from. Disabled
+                                             by default.
+            dirty_tracking (bool): Record paths written through
+                                   `write_file` so `commit_all` stages
+                                   only those. Enable only when every
+                                   write goes through the manager.
+            bulk_path_threshold (int): Path lists longer than this are
+                                       checked out in one git call with
+                                       paths on stdin.
+            commit_graph (bool): Keep each space's commit-graph file (with
+                                 changed-path filters) up to date after
+                                 clones and pulls, which speeds up
+                                 `history` on long histories.
+            backends (Optional[Dict[str, GitBackend]]): Backend per
+                                                        operation class
+                                                        (``refs``,
+                                                        ``blobs``,
+                                                        ``status``). Classes
+                                                        left out run git
+                                                        subprocesses.
+
+            worktree_pool_size (int): Keep up to this many linked worktrees
+                                      per space so `checkout_branch` can
+                                      switch between recently used branches
+                                      without rewriting files. ``0``
+                                      disables the pool.
+            timeouts (Optional[Dict[str, float]]): Default deadline in
+                                                   seconds per operation
+                                                   name (e.g.
+                                                   ``"pull_repo"``); the
+                                                   ``"default"`` key covers
+                                                   the others. No deadline
+                                                   by default.
+
+        Raises:
+            SpaceGitException: If a backend cannot serve the operation
+            class it is assigned to, or a timeout is not positive.
+        """
         self.git = Git()
+        self.git_process = GitProcess()
         self.space_manager = SpaceManager()
         self.file_manager = SpaceFileManager()
+        self.path_cache = SpacePathCache(
+            ttl=path_cache_ttl, maxsize=path_cache_size
+        )
+        self.status_cache = StatusCache()
+        self.cat_file_pool = CatFilePool(idle_timeout=cat_file_idle_timeout)
+        self.commit_queue_window = commit_queue_window
+        self.commit_queue_max_files = commit_queue_max_files
+        self.commit_queues: Dict[str, CommitQueue] = {}
+        self._commit_queues_lock = threading.Lock()
+        self.locks = locks or SpaceLockManager()
+        self.metrics = metrics or OperationMetrics()
+        self.mirrors = mirrors
+        self.dirty_tracking = dirty_tracking
+        self.dirty_paths = DirtyPathTracker()
+        self.bulk_path_threshold = bulk_path_threshold
+        self.commit_graph = commit_graph
+        self.backends = validate_backends(backends)
+        self.worktrees = (
+            WorktreePool(worktree_pool_size, self.git_process)
+            if worktree_pool_size
+            else None
+        )
+        self.timeouts = validate_timeouts(timeouts)
+
+    def process_settings(self) -> Dict[str, Any]:
+        """
+        Return the constructor arguments that rebuild this manager in a
+        worker process of a `ProcessPoolExecutor` (see `pull_many`).
+
+        Locks and mirrors are carried as their configuration: workers share
+        the ``flock`` files and mirror directories, while ``max_concurrent``
+        applies per worker.
+
+        Raises:
+            SpaceGitException: If a setting cannot be carried to another
+            process: custom backends, enabled metrics (they would be
+            collected in the workers and lost) or locks without
+            ``cross_process``.
+        """
+        unsupported = []
+        if self.backends:
+            unsupported.append("backends")
+        if self.metrics.enabled:
+            unsupported.append("metrics")
+        if not self.locks.cross_process:
+            unsupported.append("locks")
+        if unsupported:
+            raise SpaceGitException(
+                message=(
+                    "Process pools cannot carry these manager settings: "
+                    f"{', '.join(unsupported)}."
+                ),
+                error_code="PROCESS_POOL_UNSUPPORTED",
+                metadata={"settings": unsupported},
+            )
+        return {
+            "path_cache_ttl": self.path_cache.ttl,
+            "path_cache_size": self.path_cache.maxsize,
+            "cat_file_idle_timeout": self.cat_file_pool.idle_timeout,
+            "commit_queue_window": self.commit_queue_window,
+            "commit_queue_max_files": self.commit_queue_max_files,
+            "locks": self.locks,
+            "mirrors": self.mirrors,
+            "dirty_tracking": self.dirty_tracking,
+            "bulk_path_threshold": self.bulk_path_threshold,
+            "commit_graph": self.commit_graph,
+            "worktree_pool_size": (
+                self.worktrees.max_worktrees if self.worktrees else 0
+            ),
+            "timeouts": dict(self.timeouts),
+        }
+
+    def process_state(self, space_name: str) -> Dict[str, Any]:
+        """
+        Return the per-space state a `ProcessPoolExecutor` worker restores
+        (see `restore_process_state`) before running an operation on the
+        space: the active pooled branch, so that work runs in the same
+        working tree as on a thread pool.
+
+        A space that cannot be resolved has no state; the worker reports
+        the failure when it runs the operation.
+        """
+        if self.worktrees is None:
+            return {}
+        try:
+            repo_path = self._get_repo_path(space_name)
+        except SpaceGitException:
+            return {}
+        return {"branch": self.worktrees.active_branch(repo_path)}
+
+    def restore_process_state(
+        self, space_name: str, state: Dict[str, Any]
+    ) -> None:
+        """
+        Adopt the per-space state returned by `process_state` in another
+        process.
+
+        Raises:
+            SpaceGitException: If the space does not exist or the active
+            branch's worktree cannot be added.
+        """
+        if self.worktrees is None or "branch" not in state:
+            return
+        self.worktrees.activate(
+            self._get_repo_path(space_name), state["branch"]
+        )
+
+    def close(self) -> None:
+        """
+        Flush commit queues and release background resources such as
+        pooled git processes.
+        """
+        with self._commit_queues_lock:
+            queues = list(self.commit_queues.values())
+            self.commit_queues.clear()
+        for queue in queues:
+            queue.close()
+        self.cat_file_pool.close()
+        for backend in set(self.backends.values()):
+            backend.close()
+
+    def _backend(self, operation: str) -> GitBackend:
+        """
+        Return the backend serving an operation class.
+        """
+        backend = self.backends.get(operation)
+        if backend is None:
+            return SubprocessBackend(self.git_process, self.cat_file_pool)
+        return backend
+
+    @contextmanager
+    def _operation(
+        self,
+        operation: str,
+        space_name: str,
+        exclusive: bool = True,
+        blocking: bool = True,
+        timeout: Optional[float] = None,
+        locked: bool = True,
+    ) -> Iterator[OperationRecord]:
+        """
+        Scope a public operation on a space.
+
+        Holds the space's lock for the whole operation: shared for read-only
+        operations, exclusive for mutations. Without ``blocking`` a busy
+        space raises ``SPACE_BUSY`` instead of waiting. Streaming operations
+        pass ``locked=False`` and run through `_stream`, which locks each
+        read instead. The yielded record attributes time to phases when
+        metrics are enabled.
+
+        The operation runs under a `Deadline` when ``timeout``, a default
+        from ``timeouts`` or an enclosing `deadline_scope` applies; time
+        spent waiting for the lock counts against it.
+        """
+        with self.metrics.track(operation, space_name) as record:
+            with self._deadline(operation, space_name, timeout) as deadline:
+                with ExitStack() as stack:
+                    if locked:
+                        with record.phase("lock"):
+                            stack.enter_context(
+                                self.locks.hold(
+                                    space_name,
+                                    exclusive=exclusive,
+                                    blocking=blocking,
+                                )
+                            )
+                    if deadline is not None:
+                        deadline.check()
+                    yield record
+
+    def _stream(self, space_name: str, records: Iterator[T]) -> Iterator[T]:
+        """
+        Drive a streaming operation started with ``locked=False``.
+
+        Every step of ``records`` runs in a context of its own, so the
+        operation's deadline and metrics never leak into the caller between
+        items, and holds the space's shared lock only while the next item
+        is read. A consumer may therefore run other operations on the same
+        space while iterating without queueing behind a writer that waits
+        for this stream.
+        """
+        context = contextvars.copy_context()
+        try:
+            while True:
+                with self.locks.hold(space_name, exclusive=False):
+                    try:
+                        item = context.run(next, records)
+                    except StopIteration:
+                        return
+                yield item
+        finally:
+            context.run(records.close)
+
+    @contextmanager
+    def _deadline(
+        self, operation: str, space_name: str, timeout: Optional[float]
+    ) -> Iterator[Optional[Deadline]]:
+        """
+        Run an operation under its deadline, if any.
+
+        When the deadline stops the operation, its git processes have been
+        killed; a stale ``index.lock`` they left is removed and the failure
+        is raised as ``OPERATION_TIMEOUT`` or ``OPERATION_CANCELLED``.
+        """
+        if timeout is None:
+            timeout = self.timeouts.get(
+                operation, self.timeouts.get("default")
+            )
+        outer = current_deadline()
+        if timeout is None and outer is None:
+            yield None
+            return
+        deadline = outer if timeout is None else Deadline(timeout, outer)
+        started = time.time()
+        try:
+            with deadline_scope(deadline):
+                yield deadline
+        except (GitException, SpaceGitException, OSError) as e:
+            if not deadline.stopped:
+                raise
+            self._remove_stale_index_locks(space_name, started)
+            raise deadline.error(
+                cause=e,
+                metadata={"operation": operation, "space": space_name},
+            )
+        finally:
+            if deadline is not outer:
+                deadline.close()
+
+    def _git_command(
+        self,
+        record: OperationRecord,
+        args: List[str],
+        path: str,
+        call: Callable[[], Any],
+    ) -> Any:
+        """
+        Run a git command through ``darca_git`` (``call``), or through
+        `GitProcess` with ``args`` while a deadline applies, so the deadline
+        can kill it.
+
+        Returns:
+            Any: The result of ``call``, or the decoded output of ``args``.
+        """
+        return self._git_commands(record, [args], path, call)
+
+    def _git_commands(
+        self,
+        record: OperationRecord,
+        commands: List[List[str]],
+        path: str,
+        call: Callable[[], Any],
+    ) -> Any:
+        """
+        Like `_git_command`, for a ``darca_git`` call that runs several
+        commands: under a deadline they run in order through `GitProcess`.
+
+        Returns:
+            Any: The result of ``call``, or the decoded output of the last
+            command.
+        """
+        if current_deadline() is None:
+            with record.git_call():
+                return call()
+        with record.phase("git"):
+            for args in commands:
+                out = self.git_process.run(args, path)
+        return out.decode("utf-8", "replace")
+
+    def _remove_stale_index_locks(self, space_name: str, since: float) -> None:
+        """
+        Remove ``index.lock`` files of a space created since ``since`` by
+        git processes a deadline killed.
+        """
+        try:
+            paths = {
+                self._get_repo_path(space_name),
+                self._get_work_path(space_name),
+            }
+        except SpaceGitException:
+            return
+        for path in paths:
+            lock = remove_stale_index_lock(path, since)
+            if lock is not None:
+                logger.warning(
+                    f"Removed stale '{lock}' of space '{space_name}'"
+                )
 
     def _get_repo_path(self, space_name: str) -> str:
         """
         Resolve the absolute path of a given logical space.
 
+        Lookups are served from ``path_cache`` when possible; a cached path
+        is only returned while its directory still exists unchanged.
+
+        Raises:
+            SpaceGitException: If the space does not exist.
+
+        Returns:
+            str: Filesystem path to the Git repository.
+        """
+        with current_record().phase("resolve"):
+            return self.path_cache.get(space_name, self._resolve_space_path)
+
+    def _get_work_path(self, space_name: str) -> str:
+        """
+        Resolve the working tree of a space that working-tree operations
+        (status, writes, commits, pulls, pushes, path checkouts, diffs) and
+        reads at a ref use: the worktree of the active branch when a
+        `WorktreePool` is enabled, otherwise the space root. Refs are shared
+        between worktrees, but ``HEAD`` is the active branch's only here.
+        """
+        path = self._get_repo_path(space_name)
+        if self.worktrees is None:
+            return path
+        return self.worktrees.active_path(path)
+
+    def _dirty_key(self, space_name: str) -> str:
+        """
+        Key of the dirty paths of a space's active working tree.
+        """
+        if self.worktrees is None:
+            return space_name
+        branch = self.worktrees.active_branch(self._get_repo_path(space_name))
+        return space_name if branch is None else f"{space_name}@{branch}"
+
+    def _resolve_space_path(self, space_name: str) -> str:
+        """
+        Resolve the path of a space through the `SpaceManager`.
+
         Raises:
             SpaceGitException: If the space does not exist.
 
@@ -42,200 +528,935 @@ class SpaceGitManager:
             )
         return self.space_manager._get_space_path(space_name)
 
-    def init_repo(self, space_name: str) -> bool:
+    def invalidate_path_cache(self, space_name: Optional[str] = None) -> None:
+        """
+        Forget the cached path of a space, or of all spaces.
+
+        Call this after deleting, moving or recreating a space outside of
+        this manager.
+
+        Args:
+            space_name (Optional[str]): Space to invalidate. Invalidates every
+                                        entry when omitted.
+        """
+        self.path_cache.invalidate(space_name)
+
+    def init_repo(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> bool:
         """
         Initialize a new Git repository in the given space.
 
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
         Returns:
             bool: True if successful.
 
         Raises:
-            SpaceGitException: If initialization fails.
+            SpaceGitException: If initialization fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            self.git.init(path)
-            return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to initialize git repository.",
-                error_code="INIT_FAILED",
-                metadata={"space": space_name},
-                cause=e,
-            )
+        with self._operation(
+            "init_repo", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_repo_path(space_name)
+            try:
+                self._git_command(
+                    op, ["init"], path, lambda: self.git.init(path)
+                )
+                return True
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to initialize git repository.",
+                    error_code="INIT_FAILED",
+                    metadata={"space": space_name},
+                    cause=e,
+                )
 
-    def clone_repo(self, space_name: str, repo_url: str) -> bool:
+    def clone_repo(
+        self,
+        space_name: str,
+        repo_url: str,
+        profile: Optional[CloneProfile] = None,
+        timeout: Optional[float] = None,
+    ) -> bool:
         """
         Clone a Git repository into the given space.
 
+        With a `MirrorCache` configured, the clone borrows objects from the
+        shared mirror of ``repo_url`` (``--reference``), which is created or
+        refreshed first.
+
         Args:
             repo_url (str): URL of the remote repository.
+            profile (Optional[CloneProfile]): Shallow, partial, single-branch
+                                              or sparse clone options. The
+                                              profile is stored in the space
+                                              and reused by `pull_repo`.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful.
 
         Raises:
-            SpaceGitException: If cloning fails.
+            SpaceGitException: If cloning fails, or ``OPERATION_TIMEOUT``
+            when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            self.git.clone(repo_url, cwd=path)
+        with self._operation(
+            "clone_repo", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_repo_path(space_name)
+            if (
+                profile is not None
+                or self.mirrors is not None
+                or current_deadline() is not None
+            ):
+                self._clone_with_options(space_name, path, repo_url, profile)
+            else:
+                try:
+                    with op.git_call():
+                        self.git.clone(repo_url, cwd=path)
+                except GitException as e:
+                    raise SpaceGitException(
+                        message="Failed to clone repository.",
+                        error_code="CLONE_FAILED",
+                        metadata={"space": space_name, "url": repo_url},
+                        cause=e,
+                    )
+            self._maintain_commit_graph(space_name, path)
             return True
-        except GitException as e:
+
+    def _clone_with_options(
+        self,
+        space_name: str,
+        path: str,
+        repo_url: str,
+        profile: Optional[CloneProfile],
+    ) -> None:
+        record = current_record()
+        args = ["clone"]
+        if self.mirrors is not None:
+            try:
+                with record.phase("mirror"):
+                    args += ["--reference", self.mirrors.ensure(repo_url)]
+            except SpaceGitException as e:
+                logger.warning(
+                    f"Cloning '{repo_url}' into space '{space_name}' "
+                    f"without mirror: {e}"
+                )
+        if profile is not None:
+            args += profile.clone_args()
+        metadata = {"space": space_name, "url": repo_url}
+        if profile is not None:
+            metadata["profile"] = asdict(profile)
+        try:
+            with record.phase("git"):
+                self.git_process.run([*args, repo_url, "."], path)
+                if profile is not None and profile.sparse_paths:
+                    self.git_process.run(
+                        ["sparse-checkout", "set", "--cone", "--stdin"],
+                        path,
+                        input=profile.sparse_input(),
+                    )
+            if profile is not None:
+                profile.save(path)
+        except (SpaceGitException, OSError) as e:
             raise SpaceGitException(
                 message="Failed to clone repository.",
                 error_code="CLONE_FAILED",
-                metadata={"space": space_name, "url": repo_url},
+                metadata=metadata,
                 cause=e,
             )
+        logger.debug(
+            f"Cloned '{repo_url}' into space '{space_name}' "
+            f"({' '.join(args[1:]) or 'full clone'})"
+        )
 
-    def get_status(self, space_name: str, porcelain: bool = True) -> str:
+    def get_status(
+        self,
+        space_name: str,
+        porcelain: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
         """
         Retrieve the Git status of the repository.
 
         Args:
             porcelain (bool): Whether to return porcelain output.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             str: Output of `git status`.
 
         Raises:
-            SpaceGitException: If status command fails.
+            SpaceGitException: If status command fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            return self.git.status(path, porcelain=porcelain)
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to get git status.",
-                error_code="STATUS_FAILED",
-                metadata={"space": space_name, "porcelain": porcelain},
-                cause=e,
-            )
+        with self._operation(
+            "get_status", space_name, exclusive=False, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            try:
+                status = self._git_command(
+                    op,
+                    ["status", "--porcelain"] if porcelain else ["status"],
+                    path,
+                    lambda: self.git.status(path, porcelain=porcelain),
+                )
+                op.add_stdout(len(status))
+                return status
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to get git status.",
+                    error_code="STATUS_FAILED",
+                    metadata={"space": space_name, "porcelain": porcelain},
+                    cause=e,
+                )
+
+    def get_status_entries(
+        self,
+        space_name: str,
+        untracked: bool = True,
+        use_cache: bool = False,
+        timeout: Optional[float] = None,
+    ) -> List[StatusEntry]:
+        """
+        Retrieve the Git status of the repository as parsed entries.
 
-    def commit_all(self, space_name: str, message: str) -> bool:
+        Built on ``git status --porcelain=v2 -z`` so any path parses
+        correctly. With ``use_cache`` the result is reused until the index,
+        HEAD or HEAD reflog of the space change; see `StatusCache` for the
+        trade-off.
+
+        Args:
+            untracked (bool): Whether to include untracked files.
+            use_cache (bool): Serve unchanged spaces from ``status_cache``.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            List[StatusEntry]: One entry per changed path.
+
+        Raises:
+            SpaceGitException: If status command fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
+        """
+        with self._operation(
+            "get_status_entries", space_name, exclusive=False, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            fingerprint = None
+            if use_cache:
+                fingerprint = self.status_cache.fingerprint(path, untracked)
+                cached = self.status_cache.get(space_name, fingerprint)
+                if cached is not None:
+                    return cached
+
+            try:
+                with op.phase("git"):
+                    entries = self._backend("status").status(path, untracked)
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to get git status.",
+                    error_code="STATUS_FAILED",
+                    metadata={"space": space_name, "porcelain": "v2"},
+                    cause=e,
+                )
+            if use_cache:
+                self.status_cache.put(space_name, fingerprint, entries)
+            return entries
+
+    def commit_all(
+        self, space_name: str, message: str, timeout: Optional[float] = None
+    ) -> bool:
         """
         Stage and commit all changes in the repository.
 
+        With ``dirty_tracking`` enabled and paths recorded for the space,
+        only those paths are staged; otherwise the whole working tree is
+        scanned with ``git add .``.
+
         Args:
             message (str): Commit message.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful.
 
         Raises:
-            SpaceGitException: If committing fails.
+            SpaceGitException: If committing fails, or ``OPERATION_TIMEOUT``
+            when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            self.git.add(".", cwd=path)
-            self.git.commit(message, cwd=path)
+        with self._operation(
+            "commit_all", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            dirty = (
+                self.dirty_paths.take(self._dirty_key(space_name))
+                if self.dirty_tracking
+                else set()
+            )
+            try:
+                if dirty:
+                    with op.phase("git"):
+                        self._stage_paths(path, sorted(dirty))
+                else:
+                    self._git_command(
+                        op,
+                        ["add", "."],
+                        path,
+                        lambda: self.git.add(".", cwd=path),
+                    )
+                self._git_command(
+                    op,
+                    ["commit", "-m", message],
+                    path,
+                    lambda: self.git.commit(message, cwd=path),
+                )
+                return True
+            except (GitException, SpaceGitException) as e:
+                if dirty:
+                    self.dirty_paths.mark(self._dirty_key(space_name), dirty)
+                raise SpaceGitException(
+                    message="Failed to commit all changes.",
+                    error_code="COMMIT_ALL_FAILED",
+                    metadata={"space": space_name, "message": message},
+                    cause=e,
+                )
+
+    def _stage_paths(self, repo_path: str, paths: List[str]) -> None:
+        """
+        Stage the given paths, including deletions, without scanning the
+        rest of the working tree.
+        """
+        present, gone = [], []
+        for relative_path in paths:
+            target = os.path.join(repo_path, *relative_path.split("/"))
+            (present if os.path.lexists(target) else gone).append(
+                relative_path
+            )
+        for args, group in (
+            (["add", "-A", *PATHSPEC_FROM_STDIN], present),
+            (
+                ["rm", "--cached", "-q", "--ignore-unmatch"]
+                + list(PATHSPEC_FROM_STDIN),
+                gone,
+            ),
+        ):
+            if group:
+                self.git_process.run(
+                    args, repo_path, input=pathspec_input(group)
+                )
+
+    def write_file(
+        self, space_name: str, relative_path: str, content: FileContent
+    ) -> bool:
+        """
+        Write a file into a space without committing it.
+
+        With ``dirty_tracking`` enabled the path is recorded for the next
+        `commit_all`.
+
+        Args:
+            relative_path (str): Path to the file relative to the space root.
+            content (str | bytes | dict): File content.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If the space does not exist or the path
+            escapes it.
+        """
+        with self._operation("write_file", space_name, exclusive=True) as op:
+            path = self._get_work_path(space_name)
+            relative_path = normalize_path(relative_path)
+            with op.phase("write"):
+                self._set_file(space_name, path, relative_path, content)
+            self.status_cache.invalidate(space_name)
+            if self.dirty_tracking:
+                self.dirty_paths.mark(
+                    self._dirty_key(space_name), [relative_path]
+                )
             return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to commit all changes.",
-                error_code="COMMIT_ALL_FAILED",
-                metadata={"space": space_name, "message": message},
-                cause=e,
+
+    def mark_dirty(self, space_name: str, paths: Iterable[str]) -> None:
+        """
+        Report paths changed outside of `write_file`, so the next
+        `commit_all` stages them. Ignored unless ``dirty_tracking`` is
+        enabled.
+        """
+        self.status_cache.invalidate(space_name)
+        if self.dirty_tracking:
+            self.dirty_paths.mark(
+                self._dirty_key(space_name), [normalize_path(p) for p in paths]
             )
 
+    def enable_index_acceleration(
+        self,
+        space_name: str,
+        untracked_cache: bool = True,
+        fsmonitor: bool = False,
+        many_files: bool = False,
+    ) -> bool:
+        """
+        Configure git's own change detection for a large space, which
+        speeds up the full scans of `commit_all` and status.
+
+        Args:
+            untracked_cache (bool): Cache untracked directory contents
+                                    (``core.untrackedCache``).
+            fsmonitor (bool): Use git's builtin file system monitor
+                              (``core.fsmonitor``). Requires a platform
+                              supported by git.
+            many_files (bool): Enable ``feature.manyFiles`` (index v4 and
+                               related defaults).
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If configuring the repository fails.
+        """
+        settings = []
+        if untracked_cache:
+            settings.append(("core.untrackedCache", "true"))
+        if fsmonitor:
+            settings.append(("core.fsmonitor", "true"))
+        if many_files:
+            settings.append(("feature.manyFiles", "true"))
+        with self._operation(
+            "enable_index_acceleration", space_name, exclusive=True
+        ) as op:
+            path = self._get_repo_path(space_name)
+            try:
+                with op.phase("git"):
+                    for key, value in settings:
+                        self.git_process.run(["config", key, value], path)
+                    if untracked_cache:
+                        self.git_process.run(
+                            ["update-index", "--untracked-cache"], path
+                        )
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to configure index acceleration.",
+                    error_code="INDEX_CONFIG_FAILED",
+                    metadata={"space": space_name, "settings": settings},
+                    cause=e,
+                )
+            return True
+
     def commit_file(
         self,
         space_name: str,
         relative_path: str,
         message: str,
-        content: Optional[Union[str, dict]] = None,
+        content: Optional[StreamContent] = None,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
-        Commit a specific file. Creates the file if it doesn't exist and
-        content is provided.
+        Commit a specific file, writing ``content`` to it first when given.
+
+        Besides str, bytes and dict, content may be a memoryview, a file
+        object or an iterable of byte chunks. Those are streamed to disk
+        chunk by chunk, so memory use does not grow with the file size.
+
+        When str, bytes or dict content hashes to the blob already
+        committed at HEAD and the working tree file holds it too, nothing
+        is written, staged or committed.
 
         Args:
             relative_path (str): Path to the file relative to the space root.
             message (str): Commit message.
-            content (Optional[str | dict]): Optional file content to create if
-            missing.
+            content (Optional[StreamContent]): Content to write. Without it
+                                               the file must already exist.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
-            bool: True if successful.
+            bool: True if a commit was made, False if the content was
+                  unchanged.
 
         Raises:
-            SpaceGitException: If file is missing with no content, or commit
-            fails.
+            SpaceGitException: If file is missing with no content, the
+            content is unsupported, or commit fails; ``OPERATION_TIMEOUT``
+            when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            if not self.file_manager.file_exists(space_name, relative_path):
-                if content is None:
-                    raise SpaceGitException(
-                        message="File does not exist and no content provided.",
-                        error_code="FILE_MISSING",
-                        metadata={"space": space_name, "file": relative_path},
-                    )
-                self.file_manager.set_file(space_name, relative_path, content)
+        with self._operation(
+            "commit_file", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            metadata = {"space": space_name, "file": relative_path}
+            if content is not None and self._is_committed(
+                path, relative_path, content
+            ):
                 logger.debug(
-                    f"Created file '{relative_path}' in space '{space_name}'"
+                    f"File '{relative_path}' in space '{space_name}' "
+                    "is unchanged; nothing to commit"
                 )
-
-            self.git.add(relative_path, cwd=path)
-            self.git.commit(message, cwd=path)
+                return False
+            if content is None and not self._file_exists(
+                space_name, path, relative_path
+            ):
+                raise SpaceGitException(
+                    message="File does not exist and no content provided.",
+                    error_code="FILE_MISSING",
+                    metadata=metadata,
+                )
+            try:
+                if content is not None:
+                    with op.phase("write"):
+                        self._set_file(
+                            space_name, path, relative_path, content
+                        )
+                    logger.debug(
+                        f"Wrote file '{relative_path}' in space "
+                        f"'{space_name}'"
+                    )
+            except OSError as e:
+                raise SpaceGitException(
+                    message="Failed to commit file.",
+                    error_code="COMMIT_FILE_FAILED",
+                    metadata=metadata,
+                    cause=e,
+                )
+            try:
+                self._git_command(
+                    op,
+                    ["add", "--", relative_path],
+                    path,
+                    lambda: self.git.add(relative_path, cwd=path),
+                )
+                self._git_command(
+                    op,
+                    ["commit", "-m", message],
+                    path,
+                    lambda: self.git.commit(message, cwd=path),
+                )
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to commit file.",
+                    error_code="COMMIT_FILE_FAILED",
+                    metadata=metadata,
+                    cause=e,
+                )
+            self._mark_committed(space_name, [relative_path])
             return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to commit file.",
-                error_code="COMMIT_FILE_FAILED",
-                metadata={"space": space_name, "file": relative_path},
-                cause=e,
+
+    def commit_files(
+        self,
+        space_name: str,
+        files: Dict[str, StreamContent],
+        message: str,
+        materialize: bool = True,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Commit many files at once as a single commit using git plumbing.
+
+        All blobs are written with one ``hash-object`` call and the commit
+        is assembled in a temporary index (``read-tree``, ``update-index``,
+        ``write-tree``, ``commit-tree``, ``update-ref``), so the cost does
+        not grow with one process spawn per file.
+
+        Content is accepted in every form `commit_file` takes; streamed
+        content is copied chunk by chunk to the working tree (or to
+        temporary blob files without ``materialize``) and never held in
+        memory as a whole.
+
+        Args:
+            files (Dict[str, StreamContent]): Content per path relative to
+                                              the space root.
+            message (str): Commit message.
+            materialize (bool): Also write the files to the working tree and
+                                record them in the index. Disable for
+                                headless spaces whose working tree is not
+                                used.
+
+        Returns:
+            str: The new commit id.
+
+        Raises:
+            SpaceGitException: If no files are given, a path or content is
+            invalid, or the commit fails.
+        """
+        with self._operation(
+            "commit_files", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            if not files:
+                raise SpaceGitException(
+                    message="No files to commit.",
+                    error_code="NO_FILES",
+                    metadata={"space": space_name},
+                )
+            contents = {
+                normalize_path(p): content_chunks(p, c)
+                for p, c in files.items()
+            }
+            metadata = {"space": space_name, "files": list(contents)}
+            try:
+                commit = commit_contents(
+                    self.git_process,
+                    path,
+                    contents,
+                    message,
+                    materialize,
+                    op.phase,
+                )
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message="Failed to commit files.",
+                    error_code="COMMIT_FILES_FAILED",
+                    metadata=metadata,
+                    cause=e,
+                )
+            if materialize:
+                self._mark_committed(space_name, list(contents))
+            logger.debug(
+                f"Committed {len(contents)} file(s) as {commit} "
+                f"in space '{space_name}'"
+            )
+            return commit
+
+    def enqueue_commit(
+        self,
+        space_name: str,
+        relative_path: str,
+        message: str,
+        content: FileContent,
+    ) -> "Future[str]":
+        """
+        Queue a file write for a group commit instead of committing it now.
+
+        Writes to the same space arriving within ``commit_queue_window``
+        seconds (or up to ``commit_queue_max_files`` writes) are committed
+        together by `commit_files` with an aggregated message. This avoids
+        contention on ``.git/index.lock`` between frequent writers.
+
+        Args:
+            relative_path (str): Path to the file relative to the space root.
+            message (str): Commit message for this write.
+            content (str | bytes | dict): File content.
+
+        The path and content are checked and serialized here, so a bad
+        write fails its caller instead of the whole group commit, and later
+        changes to a queued dict do not leak into it.
+
+        Returns:
+            Future[str]: Resolves to the commit id, or raises the
+                         `SpaceGitException` of the failed group commit.
+
+        Raises:
+            SpaceGitException: If the space does not exist, or the path or
+                               content is invalid.
+        """
+        self._get_repo_path(space_name)
+        relative_path = normalize_path(relative_path)
+        data = serialize_content(relative_path, content)
+        with self._commit_queues_lock:
+            queue = self.commit_queues.get(space_name)
+            if queue is None:
+                queue = self.commit_queues[space_name] = CommitQueue(
+                    lambda files, msg: self.commit_files(
+                        space_name, files, msg
+                    ),
+                    window=self.commit_queue_window,
+                    max_files=self.commit_queue_max_files,
+                    name=space_name,
+                )
+        return queue.submit(relative_path, data, message)
+
+    def flush_commit_queues(self, space_name: Optional[str] = None) -> None:
+        """
+        Commit pending queued writes of one space, or of all spaces, now.
+        """
+        with self._commit_queues_lock:
+            if space_name is None:
+                queues = list(self.commit_queues.values())
+            else:
+                queues = [self.commit_queues.get(space_name)]
+        for queue in queues:
+            if queue is not None:
+                queue.flush()
+
+    def _mark_committed(
+        self, space_name: str, relative_paths: List[str]
+    ) -> None:
+        """
+        Drop committed paths from the dirty paths of the space's active
+        working tree and forget its cached status.
+        """
+        self.status_cache.invalidate(space_name)
+        if self.dirty_tracking:
+            self.dirty_paths.remove(
+                self._dirty_key(space_name),
+                [normalize_path(p) for p in relative_paths],
             )
 
-    def pull_repo(self, space_name: str) -> bool:
+    def _is_committed(
+        self, path: str, relative_path: str, content: StreamContent
+    ) -> bool:
+        """
+        Tell whether in-memory content matches both the blob at HEAD and
+        the file in the working tree ``path``. Streamed content is never
+        compared, as reading it would consume it.
+        """
+        if not is_buffered(content):
+            return False
+        relative_path = normalize_path(relative_path)
+        try:
+            data = serialize_content(relative_path, content)
+        except SpaceGitException:
+            return False
+        with current_record().phase("git"):
+            head = tree_entry(self.git_process, path, relative_path)
+        if head is None or head != blob_id(data, len(head)):
+            return False
+        target = os.path.join(path, *relative_path.split("/"))
+        try:
+            if os.path.getsize(target) != len(data):
+                return False
+            with open(target, "rb") as handle:
+                return handle.read() == data
+        except OSError:
+            return False
+
+    def _file_exists(
+        self, space_name: str, path: str, relative_path: str
+    ) -> bool:
+        """
+        Check a file in the working tree ``path`` of a space, which is a
+        pooled worktree when it differs from the space root.
+        """
+        if path == self._get_repo_path(space_name):
+            return self.file_manager.file_exists(space_name, relative_path)
+        relative_path = normalize_path(relative_path)
+        return os.path.isfile(os.path.join(path, *relative_path.split("/")))
+
+    def _set_file(
+        self,
+        space_name: str,
+        path: str,
+        relative_path: str,
+        content: StreamContent,
+    ) -> None:
+        """
+        Write a file into the working tree ``path`` of a space. Bytes and
+        streamed content are copied to disk chunk by chunk.
+        """
+        if is_managed(content) and path == self._get_repo_path(space_name):
+            self.file_manager.set_file(space_name, relative_path, content)
+            return
+        relative_path = normalize_path(relative_path)
+        write_file_chunks(
+            path, relative_path, content_chunks(relative_path, content)
+        )
+
+    def pull_repo(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> bool:
         """
         Pull the latest changes from the remote repository.
 
+        Spaces cloned with a shallow `CloneProfile` are cut back to their
+        cloned depth after the pull so their history does not grow. Spaces
+        borrowing from a mirror refresh it first, so the pull only fetches
+        what the mirror does not already hold.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
         Returns:
             bool: True if successful.
 
         Raises:
-            SpaceGitException: If pull operation fails.
+            SpaceGitException: If pull operation fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            self.git.pull(path)
+        with self._operation(
+            "pull_repo", space_name, exclusive=True, timeout=timeout
+        ):
+            self._pull(space_name, self._get_repo_path(space_name))
             return True
-        except GitException as e:
+
+    def _pull(self, space_name: str, path: str) -> None:
+        record = current_record()
+        work = self._get_work_path(space_name)
+        self._refresh_mirror(space_name, path)
+        profile = CloneProfile.load(path)
+        if profile is not None and profile.shallow:
+            try:
+                with record.phase("git"):
+                    self.git_process.run(["pull"], work)
+                    self.git_process.run(profile.trim_args(), path)
+                self._maintain_commit_graph(space_name, path)
+                return
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to pull repository.",
+                    error_code="PULL_FAILED",
+                    metadata={"space": space_name},
+                    cause=e,
+                )
+        try:
+            self._git_command(
+                record, ["pull"], work, lambda: self.git.pull(work)
+            )
+        except (GitException, SpaceGitException) as e:
             raise SpaceGitException(
                 message="Failed to pull repository.",
                 error_code="PULL_FAILED",
                 metadata={"space": space_name},
                 cause=e,
             )
+        self._maintain_commit_graph(space_name, path)
+
+    def pull_changes(
+        self, space_name: str, timeout: Optional[float] = None
+    ) -> PullResult:
+        """
+        Pull only when the remote moved, and report what changed.
+
+        The upstream branch tip is first compared with the local tracking
+        ref through a single ``git ls-remote``; when they match and the
+        tracking ref is already merged, nothing is fetched or merged.
+        Otherwise the space is pulled like `pull_repo` and the paths that
+        differ between the old and new HEAD are listed, so callers can do
+        work proportional to the change instead of rescanning the space.
+
+        Args:
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
+
+        Returns:
+            PullResult: Old and new HEAD with added, modified and deleted
+                        paths.
+
+        Raises:
+            SpaceGitException: If the pull or the comparison fails.
+        """
+        with self._operation(
+            "pull_changes", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_repo_path(space_name)
+            work = self._get_work_path(space_name)
+            try:
+                with op.phase("git"):
+                    old_head = self._backend("refs").resolve_ref(work, "HEAD")
+                    up_to_date = remote_matches_tracking(
+                        self.git_process, work
+                    )
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to compare with the remote.",
+                    error_code="PULL_FAILED",
+                    metadata={"space": space_name},
+                    cause=e,
+                )
+            if up_to_date:
+                logger.debug(f"Space '{space_name}' is up to date")
+                return PullResult(old_head, old_head, fetched=False)
+
+            self._pull(space_name, path)
+            try:
+                with op.phase("git"):
+                    new_head = self._backend("refs").resolve_ref(work, "HEAD")
+                    added, modified, deleted = changed_paths(
+                        self.git_process, work, old_head, new_head
+                    )
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to list changed paths.",
+                    error_code="PULL_FAILED",
+                    metadata={
+                        "space": space_name,
+                        "old_head": old_head,
+                        "new_head": new_head,
+                    },
+                    cause=e,
+                )
+            return PullResult(old_head, new_head, added, modified, deleted)
+
+    def _refresh_mirror(self, space_name: str, path: str) -> None:
+        if self.mirrors is None or not self.mirrors.uses_mirror(path):
+            return
+        repo_url = read_remote_url(path)
+        if not repo_url:
+            return
+        try:
+            with current_record().phase("mirror"):
+                self.mirrors.ensure(repo_url)
+        except SpaceGitException as e:
+            logger.warning(
+                f"Pulling space '{space_name}' without refreshing its "
+                f"mirror: {e}"
+            )
+
+    def dissociate_mirror(self, space_name: str) -> bool:
+        """
+        Copy every object a space borrows from its mirror into the space, so
+        the mirror can be deleted or pruned without breaking it.
+
+        Returns:
+            bool: False if the space did not borrow from any repository.
+
+        Raises:
+            SpaceGitException: If repacking the space fails.
+        """
+        with self._operation(
+            "dissociate_mirror", space_name, exclusive=True
+        ) as op:
+            path = self._get_repo_path(space_name)
+            with op.phase("git"):
+                return dissociate(self.git_process, path)
 
     def push_repo(
-        self, space_name: str, remote_url: Optional[str] = None
+        self,
+        space_name: str,
+        remote_url: Optional[str] = None,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
         Push local changes to the remote repository.
 
         Args:
             remote_url (Optional[str]): Optional remote URL to push to.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful.
 
         Raises:
-            SpaceGitException: If push operation fails.
+            SpaceGitException: If push operation fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        try:
-            self.git.push(cwd=path, remote_url=remote_url)
-            return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to push repository.",
-                error_code="PUSH_FAILED",
-                metadata={"space": space_name, "remote_url": remote_url},
-                cause=e,
-            )
+        with self._operation(
+            "push_repo", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_work_path(space_name)
+            try:
+                self._git_commands(
+                    op,
+                    push_commands(remote_url),
+                    path,
+                    lambda: self.git.push(cwd=path, remote_url=remote_url),
+                )
+                return True
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to push repository.",
+                    error_code="PUSH_FAILED",
+                    metadata={"space": space_name, "remote_url": remote_url},
+                    cause=e,
+                )
 
     def checkout_branch(
         self,
@@ -243,96 +1464,159 @@ class SpaceGitManager:
         branch: str,
         create: bool = False,
         dry_run: bool = False,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
         Checkout an existing or new branch.
 
+        With a worktree pool (``worktree_pool_size``) the branch gets its
+        own linked worktree instead: switching back to a recently used
+        branch only changes which working tree the space's working-tree
+        operations use, without rewriting any file.
+
         Args:
             branch (str): Branch name.
             create (bool): Whether to create the branch.
             dry_run (bool): If True, simulate without making changes.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful or simulated.
 
         Raises:
-            SpaceGitException: If checkout fails.
+            SpaceGitException: If checkout fails, or ``OPERATION_TIMEOUT``
+            when it exceeds its deadline.
         """
-        path = self._get_repo_path(space_name)
-        if dry_run:
-            logger.info(
-                f"[DRY-RUN] Would checkout branch '{branch}' "
-                f"(create={create}) in space '{space_name}'"
-            )
-            return True
+        with self._operation(
+            "checkout_branch", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            path = self._get_repo_path(space_name)
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would checkout branch '{branch}' "
+                    f"(create={create}) in space '{space_name}'"
+                )
+                return True
 
-        try:
-            self.git.checkout_branch(cwd=path, branch=branch, create=create)
-            return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to checkout branch.",
-                error_code="CHECKOUT_BRANCH_FAILED",
-                metadata={
-                    "space": space_name,
-                    "branch": branch,
-                    "create": create,
-                },
-                cause=e,
-            )
+            try:
+                if self.worktrees is not None:
+                    with op.phase("git"):
+                        work, reused = self.worktrees.switch(
+                            path, branch, create=create
+                        )
+                    self.status_cache.invalidate(space_name)
+                    logger.debug(
+                        f"Switched space '{space_name}' to branch '{branch}' "
+                        f"at '{work}' (reused={reused})"
+                    )
+                    return True
+                self._git_command(
+                    op,
+                    ["checkout", *(["-b"] if create else []), branch],
+                    path,
+                    lambda: self.git.checkout_branch(
+                        cwd=path, branch=branch, create=create
+                    ),
+                )
+                # The checkout rewrote the working tree, so recorded paths
+                # no longer describe it; commit_all falls back to a scan.
+                self.status_cache.invalidate(space_name)
+                self.dirty_paths.discard(self._dirty_key(space_name))
+                return True
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to checkout branch.",
+                    error_code="CHECKOUT_BRANCH_FAILED",
+                    metadata={
+                        "space": space_name,
+                        "branch": branch,
+                        "create": create,
+                    },
+                    cause=e,
+                )
 
     def checkout_path(
         self,
         space_name: str,
         paths: Union[str, List[str]],
         dry_run: bool = False,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
         Revert file(s) in the working directory to the last committed state.
 
+        Lists longer than ``bulk_path_threshold`` are validated with one
+        directory scan per parent directory and passed to git on stdin
+        (``--pathspec-from-file``), so any number of paths costs a single
+        git call and never exceeds the argument size limit.
+
         Args:
             paths (str | List[str]): File path(s) relative to space root.
             dry_run (bool): If True, simulate the operation.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful or simulated.
 
         Raises:
-            SpaceGitException: If file is missing or operation fails.
+            SpaceGitException: If file is missing or operation fails, or
+            ``OPERATION_TIMEOUT`` when it exceeds its deadline.
         """
-        if isinstance(paths, str):
-            paths = [paths]
+        with self._operation(
+            "checkout_path", space_name, exclusive=True, timeout=timeout
+        ) as op:
+            if isinstance(paths, str):
+                paths = [paths]
+            bulk = len(paths) > self.bulk_path_threshold
+            path = self._get_work_path(space_name)
 
-        missing = [
-            p
-            for p in paths
-            if not self.file_manager.file_exists(space_name, p)
-        ]
-        if missing:
-            raise SpaceGitException(
-                message="Some files do not exist in the working directory.",
-                error_code="CHECKOUT_PATH_NOT_FOUND",
-                metadata={"space": space_name, "missing_files": missing},
-            )
+            if bulk:
+                paths = [normalize_path(p) for p in paths]
+                with op.phase("scan"):
+                    missing = missing_paths(path, paths)
+            else:
+                missing = [
+                    p
+                    for p in paths
+                    if not self._file_exists(space_name, path, p)
+                ]
+            if missing:
+                raise SpaceGitException(
+                    message=(
+                        "Some files do not exist in the working directory."
+                    ),
+                    error_code="CHECKOUT_PATH_NOT_FOUND",
+                    metadata={"space": space_name, "missing_files": missing},
+                )
 
-        path = self._get_repo_path(space_name)
-        if dry_run:
-            logger.info(
-                f"[DRY-RUN] Would revert: {', '.join(paths)} "
-                f"in space '{space_name}'"
-            )
-            return True
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would revert: {self._describe(paths)} "
+                    f"in space '{space_name}'"
+                )
+                return True
 
-        try:
-            self.git.checkout_path(cwd=path, paths=paths)
-            return True
-        except GitException as e:
-            raise SpaceGitException(
-                message="Failed to revert file(s).",
-                error_code="CHECKOUT_FILE_FAILED",
-                metadata={"space": space_name, "files": paths},
-                cause=e,
-            )
+            try:
+                if bulk:
+                    with op.phase("git"):
+                        self._checkout_pathspec(path, paths)
+                else:
+                    self._git_command(
+                        op,
+                        ["checkout", "--", *paths],
+                        path,
+                        lambda: self.git.checkout_path(cwd=path, paths=paths),
+                    )
+                return True
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to revert file(s).",
+                    error_code="CHECKOUT_FILE_FAILED",
+                    metadata={"space": space_name, "files": paths},
+                    cause=e,
+                )
 
     def checkout_path_from_branch(
         self,
@@ -340,45 +1624,688 @@ class SpaceGitManager:
         paths: Union[str, List[str]],
         branch: str,
         dry_run: bool = False,
+        timeout: Optional[float] = None,
     ) -> bool:
         """
         Restore file(s) from a specific branch into the working directory.
 
+        Lists longer than ``bulk_path_threshold`` are passed to git on stdin
+        in a single call.
+
         Args:
             paths (str | List[str]): Path(s) to restore.
             branch (str): Source branch.
             dry_run (bool): If True, simulate the operation.
+            timeout (Optional[float]): Deadline in seconds, overriding the
+                                       configured default.
 
         Returns:
             bool: True if successful or simulated.
 
         Raises:
-            SpaceGitException: If restore fails.
+            SpaceGitException: If restore fails, or ``OPERATION_TIMEOUT``
+            when it exceeds its deadline.
         """
-        if isinstance(paths, str):
-            paths = [paths]
+        with self._operation(
+            "checkout_path_from_branch",
+            space_name,
+            exclusive=True,
+            timeout=timeout,
+        ) as op:
+            if isinstance(paths, str):
+                paths = [paths]
+            bulk = len(paths) > self.bulk_path_threshold
+            if bulk:
+                paths = [normalize_path(p) for p in paths]
 
-        path = self._get_repo_path(space_name)
-        if dry_run:
-            logger.info(
-                f"[DRY-RUN] Would restore: {', '.join(paths)} from branch "
-                f"'{branch}' in space '{space_name}'"
+            path = self._get_work_path(space_name)
+            if dry_run:
+                logger.info(
+                    f"[DRY-RUN] Would restore: {self._describe(paths)} from "
+                    f"branch '{branch}' in space '{space_name}'"
+                )
+                return True
+
+            try:
+                if bulk:
+                    with op.phase("git"):
+                        self._checkout_pathspec(path, paths, branch)
+                else:
+                    self._git_command(
+                        op,
+                        ["checkout", branch, "--", *paths],
+                        path,
+                        lambda: self.git.checkout_path_from_branch(
+                            cwd=path, branch=branch, paths=paths
+                        ),
+                    )
+                return True
+            except (GitException, SpaceGitException) as e:
+                raise SpaceGitException(
+                    message="Failed to restore file(s) from branch.",
+                    error_code="CHECKOUT_FILE_FROM_BRANCH_FAILED",
+                    metadata={
+                        "space": space_name,
+                        "files": paths,
+                        "branch": branch,
+                    },
+                    cause=e,
+                )
+
+    def _checkout_pathspec(
+        self, repo_path: str, paths: List[str], branch: Optional[str] = None
+    ) -> None:
+        args = ["checkout"] + ([branch] if branch else [])
+        self.git_process.run(
+            [*args, *PATHSPEC_FROM_STDIN],
+            repo_path,
+            input=pathspec_input(paths),
+        )
+
+    def _describe(self, paths: List[str]) -> str:
+        if len(paths) > self.bulk_path_threshold:
+            return f"{len(paths)} paths"
+        return ", ".join(paths)
+
+    def diff(
+        self,
+        space_name: str,
+        from_ref: str = "HEAD",
+        to_ref: Optional[str] = None,
+        paths: Optional[List[str]] = None,
+        mode: str = "patch",
+        cached: bool = False,
+        context: int = 3,
+    ) -> Iterator[FileDiff]:
+        """
+        Stream the differences between two refs, or between a ref and the
+        working tree (or index, with ``cached``).
+
+        Files are parsed and yielded while git is still writing, so memory
+        stays bounded by the largest single file diff. ``mode`` selects how
+        much is computed: ``"patch"`` (hunks and line counts),
+        ``"stat"`` (line counts only) or ``"name-status"`` (paths and
+        statuses only, the cheapest).
+
+        The space's shared lock is held only while the next entry is read,
+        so the caller may run other operations between entries. Closing
+        the iterator early stops git.
+
+        Args:
+            from_ref (str): Ref to compare from.
+            to_ref (Optional[str]): Ref to compare to; the working tree when
+                                    omitted.
+            paths (Optional[List[str]]): Limit the diff to these paths.
+            mode (str): ``"patch"``, ``"stat"`` or ``"name-status"``.
+            cached (bool): Compare ``from_ref`` with the index instead of
+                           the working tree.
+            context (int): Context lines per hunk in patch mode.
+
+        Returns:
+            Iterator[FileDiff]: One entry per changed file.
+
+        Raises:
+            SpaceGitException: If the options are invalid (immediately) or
+            the diff fails (while iterating).
+        """
+        args = diff_args(
+            from_ref,
+            to_ref,
+            [normalize_path(p) for p in paths or ()],
+            mode,
+            cached,
+            context,
+        )
+        return self._stream(
+            space_name, self._stream_diff(space_name, args, mode)
+        )
+
+    def _stream_diff(
+        self, space_name: str, args: List[str], mode: str
+    ) -> Iterator[FileDiff]:
+        with self._operation(
+            "diff", space_name, exclusive=False, locked=False
+        ) as op:
+            path = self._get_work_path(space_name)
+            chunks = self.git_process.stream(args, path)
+            if mode == "patch":
+                parsed = parse_patch_stream(split_records(chunks, b"\n"))
+            elif mode == "stat":
+                parsed = parse_numstat_stream(split_records(chunks, b"\0"))
+            else:
+                parsed = parse_name_status_stream(split_records(chunks, b"\0"))
+            try:
+                with op.phase("git"):
+                    yield from parsed
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to compute diff.",
+                    error_code="DIFF_FAILED",
+                    metadata={"space": space_name, "args": args},
+                    cause=e,
+                )
+            finally:
+                parsed.close()
+
+    def history(
+        self,
+        space_name: str,
+        ref: str = "HEAD",
+        paths: Optional[List[str]] = None,
+        author: Optional[str] = None,
+        since: Optional[TimeFilter] = None,
+        until: Optional[TimeFilter] = None,
+    ) -> Iterator[Commit]:
+        """
+        Stream the commits reachable from a ref, newest first.
+
+        Commits are parsed while ``git log`` is still running, so walking
+        only the first few entries of a long history is cheap. The space's
+        shared lock is held only while the next commit is read.
+
+        Args:
+            ref (str): Branch, tag or commit to start from.
+            paths (Optional[List[str]]): Only commits touching these paths.
+            author (Optional[str]): Pattern matched against author name and
+                                    email.
+            since (Optional[TimeFilter]): Only commits after this time.
+            until (Optional[TimeFilter]): Only commits before this time.
+
+        Returns:
+            Iterator[Commit]: Matching commits; none for an unborn HEAD.
+
+        Raises:
+            SpaceGitException: If the ref does not exist or ``git log``
+            fails (while iterating).
+        """
+        args = log_args(
+            ref, [normalize_path(p) for p in paths or ()], author, since, until
+        )
+        return self._stream(
+            space_name, self._stream_history(space_name, ref, args)
+        )
+
+    def _stream_history(
+        self, space_name: str, ref: str, args: List[str]
+    ) -> Iterator[Commit]:
+        with self._operation(
+            "history", space_name, exclusive=False, locked=False
+        ) as op:
+            path = self._get_work_path(space_name)
+            if self._resolve_tip(space_name, path, ref) is None:
+                return
+            parsed = parse_log_stream(
+                split_records(self.git_process.stream(args, path), b"\0")
             )
-            return True
+            try:
+                with op.phase("git"):
+                    yield from parsed
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to read history.",
+                    error_code="HISTORY_FAILED",
+                    metadata={"space": space_name, "args": args},
+                    cause=e,
+                )
+            finally:
+                parsed.close()
+
+    def history_page(
+        self,
+        space_name: str,
+        ref: str = "HEAD",
+        paths: Optional[List[str]] = None,
+        author: Optional[str] = None,
+        since: Optional[TimeFilter] = None,
+        until: Optional[TimeFilter] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> HistoryPage:
+        """
+        Read one page of history.
+
+        The first page resolves ``ref`` and its cursor pins the resulting
+        commit, so following pages continue the same walk even when the
+        branch moves in between. Pass the same filters with every page.
 
+        Args:
+            ref (str): Branch, tag or commit to start from; ignored when
+                       ``cursor`` is given.
+            paths, author, since, until: Filters, as for `history`.
+            limit (int): Maximum number of commits per page.
+            cursor (Optional[str]): ``cursor`` of the previous page.
+
+        Returns:
+            HistoryPage: Commits of the page and the next page's cursor.
+
+        Raises:
+            SpaceGitException: If ``limit`` or ``cursor`` is invalid
+            (``INVALID_HISTORY_OPTIONS``), or the history cannot be read.
+        """
+        if limit < 1:
+            raise SpaceGitException(
+                message=f"History page limit must be positive, got {limit}.",
+                error_code="INVALID_HISTORY_OPTIONS",
+                metadata={"limit": limit},
+            )
+        tip, offset = decode_cursor(cursor) if cursor else (None, 0)
+        paths = [normalize_path(p) for p in paths or ()]
+        with self._operation(
+            "history_page", space_name, exclusive=False
+        ) as op:
+            path = self._get_work_path(space_name)
+            if tip is None:
+                tip = self._resolve_tip(space_name, path, ref)
+                if tip is None:
+                    return HistoryPage(())
+            # One extra commit tells whether another page follows.
+            args = log_args(
+                tip, paths, author, since, until, limit + 1, offset
+            )
+            try:
+                with op.phase("git"):
+                    out = self.git_process.run(args, path)
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to read history.",
+                    error_code="HISTORY_FAILED",
+                    metadata={"space": space_name, "args": args},
+                    cause=e,
+                )
+            commits = tuple(parse_log_stream(out.split(b"\0")))
+            if len(commits) <= limit:
+                return HistoryPage(commits)
+            return HistoryPage(
+                commits[:limit], encode_cursor(tip, offset + limit)
+            )
+
+    def _resolve_tip(
+        self, space_name: str, path: str, ref: str
+    ) -> Optional[str]:
+        """
+        Resolve the commit a history walk starts from; None for an unborn
+        HEAD.
+        """
+        with current_record().phase("git"):
+            tip = self._backend("refs").resolve_ref(path, ref)
+        if tip is None and ref != "HEAD":
+            raise SpaceGitException(
+                message=f"Unknown ref '{ref}'.",
+                error_code="HISTORY_FAILED",
+                metadata={"space": space_name, "ref": ref},
+            )
+        return tip
+
+    def write_commit_graph(self, space_name: str) -> bool:
+        """
+        Write or extend the space's commit-graph file.
+
+        The graph stores commit parents, dates and changed-path Bloom
+        filters, which lets ``git log`` (and `history` with ``paths``)
+        skip parsing commit objects and diffing trees that cannot match.
+        New commits are appended as a split layer instead of rewriting the
+        whole graph.
+
+        Returns:
+            bool: True if successful.
+
+        Raises:
+            SpaceGitException: If writing the graph fails.
+        """
+        with self._operation(
+            "write_commit_graph", space_name, exclusive=False
+        ) as op:
+            path = self._get_repo_path(space_name)
+            try:
+                with op.phase("git"):
+                    self.git_process.run(COMMIT_GRAPH_ARGS, path)
+                return True
+            except SpaceGitException as e:
+                raise SpaceGitException(
+                    message="Failed to write commit-graph.",
+                    error_code="COMMIT_GRAPH_FAILED",
+                    metadata={"space": space_name},
+                    cause=e,
+                )
+
+    def maintain(
+        self,
+        space_name: str,
+        policy: Optional[MaintenancePolicy] = None,
+        force: bool = False,
+        blocking: bool = True,
+    ) -> MaintenanceReport:
+        """
+        Run repository maintenance on a space if it is due.
+
+        Packs refs, packs loose objects (consolidating packs once there are
+        more than ``policy.pack_limit``), prunes old unreachable objects and
+        writes the multi-pack-index and commit-graph, as selected by the
+        policy. Object counts are taken before and after. The space is held
+        exclusively while maintenance runs.
+
+        Args:
+            policy (Optional[MaintenancePolicy]): Tasks and due rules; the
+                                                  defaults when omitted.
+            force (bool): Run even if the space is not due.
+            blocking (bool): Wait for the space's lock; when False a busy
+                             space raises ``SPACE_BUSY``.
+
+        Returns:
+            MaintenanceReport: ``maintained`` or ``not_due``, with counts.
+
+        Raises:
+            SpaceGitException: If the space is busy (``SPACE_BUSY``) or a
+            task fails (``MAINTENANCE_FAILED``).
+        """
+        policy = policy or MaintenancePolicy()
+        started = time.perf_counter()
+        with self._operation(
+            "maintain", space_name, exclusive=True, blocking=blocking
+        ) as op:
+            path = self._get_repo_path(space_name)
+            task = "count-objects"
+            done: List[str] = []
+            try:
+                with op.phase("git"):
+                    before = count_objects(self.git_process, path)
+                stamp = last_maintained(path)
+                age = None if stamp is None else time.time() - stamp
+                if not force and not policy.is_due(before, age):
+                    return MaintenanceReport(
+                        space_name, "not_due", before=before
+                    )
+                for task in policy.tasks:
+                    with op.phase(task):
+                        self.git_process.run(
+                            policy.task_args(task, before), path
+                        )
+                    done.append(task)
+                task = "count-objects"
+                with op.phase("git"):
+                    after = count_objects(self.git_process, path)
+                mark_maintained(path)
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message=f"Maintenance task '{task}' failed.",
+                    error_code="MAINTENANCE_FAILED",
+                    metadata={
+                        "space": space_name,
+                        "task": task,
+                        "completed": done,
+                    },
+                    cause=e,
+                )
+        report = MaintenanceReport(
+            space_name,
+            "maintained",
+            tuple(done),
+            before,
+            after,
+            time.perf_counter() - started,
+        )
+        logger.debug(
+            f"Maintained space '{space_name}': {before.loose} loose objects "
+            f"in {before.packs} packs -> {after.loose} in {after.packs}"
+        )
+        return report
+
+    def _maintain_commit_graph(self, space_name: str, path: str) -> None:
+        if not self.commit_graph:
+            return
         try:
-            self.git.checkout_path_from_branch(
-                cwd=path, branch=branch, paths=paths
+            with current_record().phase("commit_graph"):
+                self.git_process.run(COMMIT_GRAPH_ARGS, path)
+        except SpaceGitException as e:
+            logger.warning(
+                f"Could not update commit-graph of space '{space_name}': {e}"
             )
-            return True
-        except GitException as e:
+
+    def export(
+        self,
+        space_name: str,
+        ref: str,
+        fileobj: BinaryIO,
+        format: str = "tar",
+        paths: Optional[List[str]] = None,
+        prefix: Optional[str] = None,
+    ) -> int:
+        """
+        Write an archive of a space at a ref into a file-like object.
+
+        ``git archive`` output is copied in fixed-size chunks as it is
+        produced, so the archive is never held in memory, and it is built
+        from the object database, so the working tree and index are left
+        untouched. On failure ``fileobj`` may hold a truncated archive.
+
+        Args:
+            ref (str): Branch, tag or commit to export.
+            fileobj (BinaryIO): Destination; only ``write`` is used.
+            format (str): ``"tar"``, ``"tar.gz"`` or ``"zip"``.
+            paths (Optional[List[str]]): Only export these paths.
+            prefix (Optional[str]): Directory to place all entries under.
+
+        Returns:
+            int: Bytes written.
+
+        Raises:
+            SpaceGitException: If the options are invalid
+            (``INVALID_EXPORT_OPTIONS``) or the export fails
+            (``EXPORT_FAILED``).
+        """
+        args = archive_args(
+            ref, format, [normalize_path(p) for p in paths or ()], prefix
+        )
+        with self._operation("export", space_name, exclusive=False) as op:
+            path = self._get_work_path(space_name)
+            chunks = self.git_process.stream(args, path)
+            try:
+                with op.phase("git"):
+                    written = write_chunks(chunks, fileobj)
+            except (SpaceGitException, OSError) as e:
+                raise SpaceGitException(
+                    message="Failed to export space.",
+                    error_code="EXPORT_FAILED",
+                    metadata={"space": space_name, "ref": ref, "args": args},
+                    cause=e,
+                )
+            finally:
+                chunks.close()
+            logger.debug(
+                f"Exported '{ref}' of space '{space_name}' as {format} "
+                f"({written} bytes)"
+            )
+            return written
+
+    def read_file_at_ref(
+        self, space_name: str, ref: str, relative_path: str
+    ) -> bytes:
+        """
+        Read a file as it exists at a ref, without touching the working tree.
+
+        Args:
+            ref (str): Branch, tag or commit to read from.
+            relative_path (str): Path relative to the space root.
+
+        Returns:
+            bytes: Raw file content.
+
+        Raises:
+            SpaceGitException: If the file does not exist at the ref, or the
+            read fails.
+        """
+        with self._operation("read_file_at_ref", space_name, exclusive=False):
+            (content,) = self._read_files_at_ref(
+                space_name, ref, [relative_path]
+            ).values()
+            if content is None:
+                raise SpaceGitException(
+                    message=f"File does not exist at ref '{ref}'.",
+                    error_code="FILE_NOT_FOUND_AT_REF",
+                    metadata={
+                        "space": space_name,
+                        "ref": ref,
+                        "file": relative_path,
+                    },
+                )
+            return content
+
+    def read_files_at_ref(
+        self, space_name: str, ref: str, relative_paths: List[str]
+    ) -> Dict[str, Optional[bytes]]:
+        """
+        Read many files at a ref through the space's pooled
+        ``git cat-file --batch`` process.
+
+        Args:
+            ref (str): Branch, tag or commit to read from.
+            relative_paths (List[str]): Paths relative to the space root.
+
+        Returns:
+            Dict[str, Optional[bytes]]: Content per path; ``None`` for paths
+                                        that do not exist at the ref.
+
+        Raises:
+            SpaceGitException: If the read fails.
+        """
+        with self._operation("read_files_at_ref", space_name, exclusive=False):
+            return self._read_files_at_ref(space_name, ref, relative_paths)
+
+    def _read_files_at_ref(
+        self, space_name: str, ref: str, relative_paths: List[str]
+    ) -> Dict[str, Optional[bytes]]:
+        path = self._get_work_path(space_name)
+        record = current_record()
+        try:
+            with record.phase("git"):
+                contents = self._backend("blobs").read_blobs(
+                    path, ref, relative_paths
+                )
+        except SpaceGitException as e:
             raise SpaceGitException(
-                message="Failed to restore file(s) from branch.",
-                error_code="CHECKOUT_FILE_FROM_BRANCH_FAILED",
+                message="Failed to read file(s) at ref.",
+                error_code="READ_AT_REF_FAILED",
                 metadata={
                     "space": space_name,
-                    "files": paths,
-                    "branch": branch,
+                    "ref": ref,
+                    "files": relative_paths,
                 },
                 cause=e,
             )
+        record.add_stdout(sum(len(c) for c in contents if c is not None))
+        return dict(zip(relative_paths, contents))
+
+    def _remote_host_of(
+        self, space_name: str, remote_url: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Return the remote host a space talks to, or None if unknown.
+        """
+        if remote_url:
+            return remote_host(remote_url)
+        try:
+            path = self._get_repo_path(space_name)
+        except SpaceGitException:
+            return None
+        return remote_host(read_remote_url(path))
+
+    def pull_many(
+        self,
+        space_names: Iterable[str],
+        max_workers: int = 8,
+        per_host_limit: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        changes: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Iterator[BulkResult]:
+        """
+        Pull many spaces concurrently, yielding results as they complete.
+
+        Failures are reported per space and never abort the batch.
+
+        Args:
+            space_names (Iterable[str]): Spaces to pull.
+            max_workers (int): Maximum number of concurrent pulls.
+            per_host_limit (Optional[int]): Maximum concurrent pulls per
+                                            remote host.
+            executor (Optional[Executor]): Thread or process pool to use.
+            changes (bool): Use `pull_changes`, so each result's ``value``
+                            is a `PullResult`.
+            timeout (Optional[float]): Deadline in seconds for each pull.
+
+        Yields:
+            BulkResult: Per-space outcome, in completion order.
+        """
+        return run_bulk(
+            self,
+            "pull_changes" if changes else "pull_repo",
+            space_names,
+            kwargs={"timeout": timeout},
+            max_workers=max_workers,
+            per_host_limit=per_host_limit,
+            host_of=self._remote_host_of,
+            executor=executor,
+        )
+
+    def push_many(
+        self,
+        space_names: Iterable[str],
+        remote_url: Optional[str] = None,
+        max_workers: int = 8,
+        per_host_limit: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[BulkResult]:
+        """
+        Push many spaces concurrently, yielding results as they complete.
+
+        Args:
+            space_names (Iterable[str]): Spaces to push.
+            remote_url (Optional[str]): Optional remote URL for every push.
+            max_workers (int): Maximum number of concurrent pushes.
+            per_host_limit (Optional[int]): Maximum concurrent pushes per
+                                            remote host.
+            executor (Optional[Executor]): Thread or process pool to use.
+            timeout (Optional[float]): Deadline in seconds for each push.
+
+        Yields:
+            BulkResult: Per-space outcome, in completion order.
+        """
+        return run_bulk(
+            self,
+            "push_repo",
+            space_names,
+            kwargs={"remote_url": remote_url, "timeout": timeout},
+            max_workers=max_workers,
+            per_host_limit=per_host_limit,
+            host_of=lambda space: self._remote_host_of(space, remote_url),
+            executor=executor,
+        )
+
+    def status_many(
+        self,
+        space_names: Iterable[str],
+        porcelain: bool = True,
+        max_workers: int = 8,
+        executor: Optional[Executor] = None,
+    ) -> Iterator[BulkResult]:
+        """
+        Collect the status of many spaces concurrently.
+
+        Args:
+            space_names (Iterable[str]): Spaces to inspect.
+            porcelain (bool): Whether to return porcelain output.
+            max_workers (int): Maximum number of concurrent status calls.
+            executor (Optional[Executor]): Thread or process pool to use.
+
+        Yields:
+            BulkResult: Per-space outcome whose ``value`` is the status text.
+        """
+        return run_bulk(
+            self,
+            "get_status",
+            space_names,
+            kwargs={"porcelain": porcelain},
+            max_workers=max_workers,
+            executor=executor,
+        )
@@ -0,0 +1,197 @@
+import os
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .worktrees import git_dir as worktree_git_dir
+
+_KIND_BY_TAG = {
+    "1": "changed",
+    "2": "renamed",
+    "u": "unmerged",
+    "?": "untracked",
+    "!": "ignored",
+}
+
+# Number of space-separated fields preceding the path for each record type
+# of `git status --porcelain=v2`.
+_FIELDS_BEFORE_PATH = {"1": 8, "2": 9, "u": 10, "?": 1, "!": 1}
+
+
+def status_args(untracked: bool = True) -> List[str]:
+    """
+    Build ``git status`` arguments producing `parse_porcelain_v2` input.
+    """
+    return [
+        "--no-optional-locks",
+        "status",
+        "--porcelain=v2",
+        "-z",
+        "--untracked-files=" + ("all" if untracked else "no"),
+    ]
+
+
+class StatusEntry:
+    """
+    A single file entry of a parsed `git status`.
+
+    Attributes:
+        path (str): Path relative to the repository root.
+        index (str): Index (staged) state, using git's porcelain v2 codes
+                     (``.`` means unmodified, ``?`` untracked, ``!``
+                     ignored).
+        worktree (str): Working tree state, same codes as ``index``.
+        orig_path (Optional[str]): Rename or copy source, if any.
+        kind (str): One of ``changed``, ``renamed``, ``unmerged``,
+                    ``untracked`` or ``ignored``.
+    """
+
+    __slots__ = ("path", "index", "worktree", "orig_path", "kind")
+
+    def __init__(
+        self,
+        path: str,
+        index: str,
+        worktree: str,
+        orig_path: Optional[str] = None,
+        kind: str = "changed",
+    ) -> None:
+        self.path = path
+        self.index = index
+        self.worktree = worktree
+        self.orig_path = orig_path
+        self.kind = kind
+
+    def _key(self) -> Tuple[str, str, str, Optional[str], str]:
+        return (
+            self.path,
+            self.index,
+            self.worktree,
+            self.orig_path,
+            self.kind,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, StatusEntry):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        rename = f", orig_path={self.orig_path!r}" if self.orig_path else ""
+        return (
+            f"StatusEntry({self.path!r}, index={self.index!r}, "
+            f"worktree={self.worktree!r}{rename}, kind={self.kind!r})"
+        )
+
+
+def parse_porcelain_v2(data: bytes) -> List[StatusEntry]:
+    """
+    Parse the output of ``git status --porcelain=v2 -z``.
+
+    Records are NUL-terminated, so paths containing spaces, quotes or
+    newlines are returned verbatim. Header lines (``#``) are skipped.
+
+    Args:
+        data (bytes): Raw command output.
+
+    Returns:
+        List[StatusEntry]: Parsed entries in git's order.
+    """
+    entries: List[StatusEntry] = []
+    records = data.split(b"\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record or record.startswith(b"#"):
+            continue
+        tag = chr(record[0])
+        fields = _FIELDS_BEFORE_PATH.get(tag)
+        if fields is None:
+            continue
+        parts = record.split(b" ", fields)
+        path = os.fsdecode(parts[fields])
+        if tag in ("?", "!"):
+            entries.append(StatusEntry(path, tag, tag, kind=_KIND_BY_TAG[tag]))
+            continue
+        xy = parts[1].decode("ascii")
+        orig_path = None
+        if tag == "2":
+            orig_path = os.fsdecode(records[i])
+            i += 1
+        entries.append(
+            StatusEntry(path, xy[0], xy[1], orig_path, _KIND_BY_TAG[tag])
+        )
+    return entries
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StatusCache:
+    """
+    Cache of parsed status results keyed on repository metadata.
+
+    A cached result is reused while ``.git/index``, ``.git/HEAD`` and the
+    HEAD reflog are unchanged (mtime and size). This makes repeated checks
+    of an idle space cost three ``stat`` calls and no subprocess.
+
+    Note:
+        Edits to the working tree that never touch the index (for example
+        a file written without being staged) do not invalidate an entry.
+        Only enable the cache for spaces whose changes go through git.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[Hashable, List[StatusEntry]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(repo_path: str, options: Hashable = None) -> Hashable:
+        """
+        Compute the cache key of a repository in its current state.
+        """
+        git_dir = worktree_git_dir(repo_path)
+        return (
+            options,
+            git_dir,
+            _stat_key(os.path.join(git_dir, "index")),
+            _stat_key(os.path.join(git_dir, "HEAD")),
+            _stat_key(os.path.join(git_dir, "logs", "HEAD")),
+        )
+
+    def get(
+        self, space_name: str, fingerprint: Hashable
+    ) -> Optional[List[StatusEntry]]:
+        with self._lock:
+            cached = self._entries.get(space_name)
+            if cached is not None and cached[0] == fingerprint:
+                self.hits += 1
+                return list(cached[1])
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        space_name: str,
+        fingerprint: Hashable,
+        entries: List[StatusEntry],
+    ) -> None:
+        with self._lock:
+            self._entries[space_name] = (fingerprint, list(entries))
+
+    def invalidate(self, space_name: Optional[str] = None) -> None:
+        with self._lock:
+            if space_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(space_name, None)
@@ -0,0 +1,286 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from darca_log_facility.logger import DarcaLogger
+
+from .exceptions import SpaceGitException
+from .git_process import GitProcess
+
+logger = DarcaLogger(name="space_git").get_logger()
+
+WORKTREE_DIR = "darca-worktrees"
+
+
+def git_dir(work_path: str) -> str:
+    """
+    Return the git directory of a working tree, following the ``.git``
+    file of linked worktrees.
+    """
+    dot_git = os.path.join(work_path, ".git")
+    if os.path.isfile(dot_git):
+        with open(dot_git, encoding="utf-8") as handle:
+            line = handle.readline().strip()
+        if line.startswith("gitdir:"):
+            return os.path.join(
+                work_path, line.removeprefix("gitdir:").strip()
+            )
+    return dot_git
+
+
+def remove_stale_index_lock(work_path: str, since: float) -> Optional[str]:
+    """
+    Remove the ``index.lock`` of a working tree if it was created since
+    ``since`` (a `time.time` value), i.e. by a git process a deadline
+    killed.
+
+    Returns:
+        Optional[str]: The removed lock file, if any.
+    """
+    lock = os.path.join(git_dir(work_path), "index.lock")
+    try:
+        # One second of slack for coarse file system timestamps.
+        if os.stat(lock).st_mtime >= since - 1:
+            os.remove(lock)
+            return lock
+    except OSError:
+        pass
+    return None
+
+
+class _SpaceWorktrees:
+    __slots__ = ("branches", "active")
+
+    def __init__(self) -> None:
+        # branch -> worktree path, least recently used first.
+        self.branches: "OrderedDict[str, str]" = OrderedDict()
+        self.active: Optional[str] = None
+
+
+class WorktreePool:
+    """
+    Bounded pool of linked ``git worktree``s per space, one per recently
+    used branch.
+
+    Switching to a pooled branch only changes which working tree the space's
+    working-tree operations use, instead of rewriting the files of the
+    main working tree. Worktrees live in ``.git/darca-worktrees`` of the
+    space. When more than ``max_worktrees`` exist the least recently used
+    clean worktree is removed; worktrees with uncommitted changes are never
+    evicted. The branch checked out in the main working tree is served by
+    the main working tree itself.
+
+    Which branch is active is kept in memory; other processes using the
+    same spaces see the main working tree.
+    """
+
+    def __init__(
+        self, max_worktrees: int = 3, git_process: Optional[GitProcess] = None
+    ) -> None:
+        """
+        Args:
+            max_worktrees (int): Linked worktrees kept per space, besides
+                                 the main working tree.
+        """
+        if max_worktrees < 1:
+            raise SpaceGitException(
+                message=(
+                    f"max_worktrees must be at least 1, got {max_worktrees}."
+                ),
+                error_code="INVALID_WORKTREE_POOL",
+                metadata={"max_worktrees": max_worktrees},
+            )
+        self.max_worktrees = max_worktrees
+        self.git_process = git_process or GitProcess()
+        self._spaces: Dict[str, _SpaceWorktrees] = {}
+        self._lock = threading.Lock()
+
+    def _space(self, repo_path: str) -> _SpaceWorktrees:
+        with self._lock:
+            state = self._spaces.get(repo_path)
+            if state is None:
+                state = self._spaces[repo_path] = _SpaceWorktrees()
+                state.branches.update(self._discover(repo_path))
+            return state
+
+    def _discover(self, repo_path: str) -> List[Tuple[str, str]]:
+        """
+        Find worktrees left in the pool directory by earlier runs.
+        """
+        root = self.root(repo_path)
+        if not os.path.isdir(root):
+            return []
+        out = self.git_process.run(
+            ["worktree", "list", "--porcelain", "-z"], repo_path
+        )
+        found = []
+        path = None
+        for field in out.split(b"\0"):
+            if field.startswith(b"worktree "):
+                path = os.fsdecode(field.removeprefix(b"worktree "))
+            elif field.startswith(b"branch refs/heads/") and path:
+                if os.path.dirname(path) == root:
+                    branch = field.removeprefix(b"branch refs/heads/")
+                    found.append((os.fsdecode(branch), path))
+        return found
+
+    @staticmethod
+    def root(repo_path: str) -> str:
+        return os.path.realpath(os.path.join(repo_path, ".git", WORKTREE_DIR))
+
+    def worktree_path(self, repo_path: str, branch: str) -> str:
+        """
+        Return where the pool keeps the worktree of a branch.
+        """
+        return os.path.join(self.root(repo_path), quote(branch, safe=""))
+
+    def active_path(self, repo_path: str) -> str:
+        """
+        Return the working tree working-tree operations should use: the
+        active branch's worktree, or the main working tree.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            if state.active is None:
+                return repo_path
+            return state.branches[state.active]
+
+    def active_branch(self, repo_path: str) -> Optional[str]:
+        """
+        Return the active pooled branch; None while the main working tree
+        is active.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            return state.active
+
+    def branches(self, repo_path: str) -> List[str]:
+        """
+        Return the pooled branches, least recently used first.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            return list(state.branches)
+
+    def switch(
+        self, repo_path: str, branch: str, create: bool = False
+    ) -> Tuple[str, bool]:
+        """
+        Make a branch active, adding a worktree for it if needed.
+
+        Args:
+            repo_path (str): Main working tree of the space.
+            branch (str): Branch to switch to.
+            create (bool): Create the branch from the active working
+                           tree's HEAD.
+
+        Returns:
+            Tuple[str, bool]: The branch's working tree, and whether it was
+                              already available (no files were written).
+
+        Raises:
+            SpaceGitException: If git cannot add the worktree.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            if not create and branch in state.branches:
+                state.branches.move_to_end(branch)
+                state.active = branch
+                return state.branches[branch], True
+        if not create and branch == self._main_branch(repo_path):
+            with self._lock:
+                state.active = None
+            return repo_path, True
+
+        path = self.worktree_path(repo_path, branch)
+        self.git_process.run(["worktree", "prune"], repo_path)
+        if create:
+            base = self.git_process.run(
+                ["rev-parse", "--verify", "HEAD"], self.active_path(repo_path)
+            )
+            args = ["worktree", "add", "-q", "-b", branch, path]
+            args.append(base.decode("ascii").strip())
+        else:
+            args = ["worktree", "add", "-q", path, branch]
+        os.makedirs(self.root(repo_path), exist_ok=True)
+        self.git_process.run(args, repo_path)
+        with self._lock:
+            state.branches[branch] = path
+            state.active = branch
+        self._evict(repo_path, state)
+        return path, False
+
+    def activate(self, repo_path: str, branch: Optional[str]) -> str:
+        """
+        Make the working tree another process reported as active for a
+        space active here too (see `SpaceGitManager.process_state`).
+
+        Worktrees the other process added since this pool discovered the
+        space are picked up from the pool directory; a worktree missing
+        there is added as by `switch`.
+
+        Args:
+            repo_path (str): Main working tree of the space.
+            branch (Optional[str]): The active pooled branch; None for the
+                                    main working tree.
+
+        Returns:
+            str: The now active working tree.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            if branch is None:
+                state.active = None
+                return repo_path
+            path = state.branches.get(branch)
+            if path is None:
+                candidate = self.worktree_path(repo_path, branch)
+                if os.path.isfile(os.path.join(candidate, ".git")):
+                    path = state.branches[branch] = candidate
+            if path is not None:
+                state.branches.move_to_end(branch)
+                state.active = branch
+                return path
+        return self.switch(repo_path, branch)[0]
+
+    def reset(self, repo_path: str) -> None:
+        """
+        Make the main working tree active again.
+        """
+        state = self._space(repo_path)
+        with self._lock:
+            state.active = None
+
+    def _main_branch(self, repo_path: str) -> Optional[str]:
+        try:
+            out = self.git_process.run(
+                ["symbolic-ref", "--short", "-q", "HEAD"], repo_path
+            )
+        except SpaceGitException:
+            return None
+        return out.decode("utf-8").strip() or None
+
+    def _evict(self, repo_path: str, state: _SpaceWorktrees) -> None:
+        with self._lock:
+            candidates = [b for b in state.branches if b != state.active]
+            excess = len(state.branches) - self.max_worktrees
+        for branch in candidates:
+            if excess <= 0:
+                return
+            path = state.branches[branch]
+            try:
+                # Without --force git refuses to drop uncommitted work.
+                self.git_process.run(["worktree", "remove", path], repo_path)
+            except SpaceGitException as e:
+                logger.debug(f"Keeping worktree of '{branch}': {e}")
+                continue
+            with self._lock:
+                state.branches.pop(branch, None)
+            excess -= 1
+        if excess > 0:
+            logger.warning(
+                f"Worktree pool of '{repo_path}' holds {excess} worktree(s) "
+                f"over its limit; all others have uncommitted changes"
+            )
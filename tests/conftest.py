@@ -1,7 +1,10 @@
-from unittest.mock import patch
+import subprocess
+from unittest.mock import AsyncMock, patch
 
 import pytest
+from darca_space_manager.space_file_manager import SpaceFileManager
 
+from darca_space_git.async_space_git import AsyncSpaceGitManager
 from darca_space_git.space_git import SpaceGitManager
 
 
@@ -13,7 +16,9 @@ def space_git():
         "darca_space_git.space_git.SpaceFileManager"
     ), patch(
         "darca_space_git.space_git.Git"
-    ) as MockGit:
+    ) as MockGit, patch(
+        "darca_space_git.space_git.GitProcess"
+    ):
 
         mock_space_manager = MockSpaceManager.return_value
         MockGit.return_value
@@ -22,3 +27,71 @@ def space_git():
         mock_space_manager._get_space_path.return_value = "/fake/path"
 
         yield SpaceGitManager()
+
+
+@pytest.fixture
+def async_space_git():
+    with patch(
+        "darca_space_git.async_space_git.SpaceManager"
+    ) as MockSpaceManager, patch(
+        "darca_space_git.async_space_git.SpaceFileManager"
+    ), patch(
+        "darca_space_git.async_space_git.GitProcess"
+    ) as MockGitProcess:
+
+        mock_space_manager = MockSpaceManager.return_value
+        MockGitProcess.return_value.run_async = AsyncMock(return_value=b"")
+
+        mock_space_manager.space_exists.return_value = True
+        mock_space_manager._get_space_path.return_value = "/fake/path"
+
+        yield AsyncSpaceGitManager()
+
+
+def _run_git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True
+    ).stdout
+
+
+@pytest.fixture
+def run_git():
+    return _run_git
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    _run_git(tmp_path, "init", "-q", "-b", "main")
+    _run_git(tmp_path, "config", "user.email", "test@example.com")
+    _run_git(tmp_path, "config", "user.name", "test")
+    (tmp_path / "tracked.txt").write_text("one\n")
+    _run_git(tmp_path, "add", ".")
+    _run_git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+@pytest.fixture
+def bare_remote(tmp_path, git_repo):
+    for name in ("a", "b"):
+        (git_repo / name).mkdir()
+        (git_repo / name / "file.txt").write_text(name)
+        _run_git(git_repo, "add", name)
+        _run_git(git_repo, "commit", "-q", "-m", f"add {name}")
+    bare = tmp_path / "remote.git"
+    _run_git(tmp_path, "clone", "-q", "--bare", str(git_repo), str(bare))
+    _run_git(bare, "config", "uploadpack.allowFilter", "true")
+    return bare
+
+
+@pytest.fixture
+def file_manager_at():
+    # A real SpaceFileManager whose spaces all live at ``path``.
+    def build(path):
+        with patch(
+            "darca_space_manager.space_file_manager.SpaceManager"
+        ) as space_manager:
+            space_manager.return_value.space_exists.return_value = True
+            space_manager.return_value._get_space_path.return_value = str(path)
+            return SpaceFileManager()
+
+    return build
@@ -0,0 +1,128 @@
+import asyncio
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from darca_space_git.archive import archive_args, write_chunks_async
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+@pytest.fixture
+def export_repo(space_git, git_repo, run_git):
+    (git_repo / "docs").mkdir()
+    (git_repo / "docs" / "guide.txt").write_text("guide")
+    run_git(git_repo, "add", "docs/guide.txt")
+    run_git(git_repo, "commit", "-q", "-m", "docs")
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def test_export_tar_leaves_working_tree_alone(export_repo, git_repo, run_git):
+    (git_repo / "tracked.txt").write_text("uncommitted edit")
+    buffer = io.BytesIO()
+
+    written = export_repo.export("test-space", "HEAD", buffer)
+
+    assert written == len(buffer.getvalue())
+    buffer.seek(0)
+    with tarfile.open(fileobj=buffer) as tar:
+        assert sorted(tar.getnames()) == [
+            "docs",
+            "docs/guide.txt",
+            "tracked.txt",
+        ]
+        assert tar.extractfile("tracked.txt").read() != b"uncommitted edit"
+    status = run_git(git_repo, "status", "--porcelain").decode()
+    assert status == " M tracked.txt\n"
+
+
+def test_export_zip_with_paths_and_prefix(export_repo):
+    buffer = io.BytesIO()
+    export_repo.export(
+        "test-space", "HEAD", buffer, "zip", paths=["docs"], prefix="snap"
+    )
+    with zipfile.ZipFile(buffer) as archive:
+        assert archive.read("snap/docs/guide.txt") == b"guide"
+        assert "snap/tracked.txt" not in archive.namelist()
+
+
+def test_export_tar_gz(export_repo):
+    buffer = io.BytesIO()
+    export_repo.export("test-space", "HEAD~1", buffer, "tar.gz")
+    buffer.seek(0)
+    with tarfile.open(fileobj=buffer, mode="r:gz") as tar:
+        assert tar.getnames() == ["tracked.txt"]
+
+
+def test_export_failure(export_repo):
+    with pytest.raises(SpaceGitException) as exc:
+        export_repo.export("test-space", "missing", io.BytesIO())
+    assert exc.value.error_code == "EXPORT_FAILED"
+
+
+def test_export_invalid_format(space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.export("test-space", "HEAD", io.BytesIO(), "rar")
+    assert exc.value.error_code == "INVALID_EXPORT_OPTIONS"
+    space_git.git_process.stream.assert_not_called()
+
+
+def test_archive_args_guard_ref():
+    assert archive_args("--remote=x", "tar", ["a"], "p/") == [
+        "archive",
+        "--format=tar",
+        "--prefix=p/",
+        "--end-of-options",
+        "--remote=x",
+        "a",
+    ]
+
+
+class AsyncWriter:
+    def __init__(self):
+        self.data = b""
+        self.drains = 0
+
+    async def write(self, chunk):
+        self.data += chunk
+
+    async def drain(self):
+        self.drains += 1
+
+
+def test_async_export(async_space_git, git_repo):
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.git_process = GitProcess()
+    writer = AsyncWriter()
+
+    written = asyncio.run(
+        async_space_git.export("test-space", "HEAD", writer, "zip")
+    )
+
+    assert written == len(writer.data) and writer.drains >= 1
+    with zipfile.ZipFile(io.BytesIO(writer.data)) as archive:
+        assert archive.namelist() == ["tracked.txt"]
+
+
+def test_async_export_failure(async_space_git, git_repo):
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.git_process = GitProcess()
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(
+            async_space_git.export("test-space", "missing", io.BytesIO())
+        )
+    assert exc.value.error_code == "EXPORT_FAILED"
+
+
+def test_write_chunks_async_plain_file():
+    async def chunks():
+        yield b"ab"
+        yield b"c"
+
+    buffer = io.BytesIO()
+    assert asyncio.run(write_chunks_async(chunks(), buffer)) == 3
+    assert buffer.getvalue() == b"abc"
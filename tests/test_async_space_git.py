@@ -0,0 +1,405 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from darca_git.git import Git
+
+from darca_space_git.deadline import current_deadline
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.locking import SpaceLockManager
+from darca_space_git.plumbing import blob_id
+
+
+def _fail(*args, **kwargs):
+    raise SpaceGitException("boom", error_code="GIT_COMMAND_FAILED")
+
+
+@pytest.mark.parametrize(
+    "method, args, error_code",
+    [
+        ("init_repo", (), "INIT_FAILED"),
+        ("clone_repo", ("url",), "CLONE_FAILED"),
+        ("get_status", (), "STATUS_FAILED"),
+        ("commit_all", ("msg",), "COMMIT_ALL_FAILED"),
+        ("pull_repo", (), "PULL_FAILED"),
+        ("push_repo", ("origin",), "PUSH_FAILED"),
+        ("checkout_branch", ("dev",), "CHECKOUT_BRANCH_FAILED"),
+        (
+            "checkout_path_from_branch",
+            (["file.txt"], "dev"),
+            "CHECKOUT_FILE_FROM_BRANCH_FAILED",
+        ),
+    ],
+)
+def test_async_error_codes(async_space_git, method, args, error_code):
+    async_space_git.git_process.run_async.side_effect = _fail
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(getattr(async_space_git, method)("test-space", *args))
+    assert exc.value.error_code == error_code
+
+
+def test_async_operations_succeed(async_space_git):
+    async def scenario():
+        assert await async_space_git.init_repo("test-space") is True
+        assert await async_space_git.clone_repo("test-space", "url") is True
+        assert await async_space_git.commit_all("test-space", "msg") is True
+        assert await async_space_git.pull_repo("test-space") is True
+        assert await async_space_git.push_repo("test-space") is True
+        assert await async_space_git.checkout_branch(
+            "test-space", "dev", create=True
+        )
+
+    asyncio.run(scenario())
+    calls = [
+        c.args[0] for c in async_space_git.git_process.run_async.mock_calls
+    ]
+    assert calls == [
+        ["init"],
+        ["clone", "url", "."],
+        ["add", "."],
+        ["commit", "-m", "msg"],
+        ["pull"],
+        ["push", "-u", "origin", "HEAD"],
+        ["checkout", "-b", "dev"],
+    ]
+
+
+def test_async_get_status(async_space_git):
+    async_space_git.git_process.run_async.return_value = b" M file.txt\n"
+    status = asyncio.run(async_space_git.get_status("test-space"))
+    assert status == " M file.txt\n"
+
+
+def test_async_commit_file(async_space_git):
+    async_space_git.file_manager.file_exists.return_value = False
+    assert asyncio.run(
+        async_space_git.commit_file("test-space", "a.txt", "msg", "data")
+    )
+    async_space_git.file_manager.set_file.assert_called_once_with(
+        "test-space", "a.txt", "data"
+    )
+
+
+def test_async_commit_file_unchanged(async_space_git, tmp_path):
+    async_space_git.space_manager._get_space_path.return_value = str(tmp_path)
+    (tmp_path / "a.txt").write_bytes(b"data")
+    run = async_space_git.git_process.run_async
+    run.return_value = blob_id(b"data").encode()
+
+    assert (
+        asyncio.run(
+            async_space_git.commit_file("test-space", "a.txt", "msg", "data")
+        )
+        is False
+    )
+    assert run.call_args.args[0] == [
+        "rev-parse",
+        "--verify",
+        "-q",
+        "HEAD:a.txt",
+    ]
+    async_space_git.file_manager.set_file.assert_not_called()
+
+
+def test_async_commit_file_missing(async_space_git):
+    async_space_git.file_manager.file_exists.return_value = False
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(async_space_git.commit_file("test-space", "a.txt", "msg"))
+    assert exc.value.error_code == "FILE_MISSING"
+
+
+def test_async_checkout_path(async_space_git):
+    async_space_git.file_manager.file_exists.return_value = True
+    assert asyncio.run(async_space_git.checkout_path("test-space", "a.txt"))
+    async_space_git.file_manager.file_exists.return_value = False
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(async_space_git.checkout_path("test-space", "a.txt"))
+    assert exc.value.error_code == "CHECKOUT_PATH_NOT_FOUND"
+
+
+def test_async_dry_run_skips_git(async_space_git):
+    asyncio.run(
+        async_space_git.checkout_branch("test-space", "dev", dry_run=True)
+    )
+    asyncio.run(
+        async_space_git.checkout_path_from_branch(
+            "test-space", "a.txt", "dev", dry_run=True
+        )
+    )
+    async_space_git.git_process.run_async.assert_not_called()
+
+
+def test_async_space_not_found(async_space_git):
+    async_space_git.space_manager.space_exists.return_value = False
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(async_space_git.pull_repo("unknown"))
+    assert exc.value.error_code == "SPACE_NOT_FOUND"
+
+
+def test_async_operations_hold_space_lock(async_space_git, tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path))
+    async_space_git.locks = locks
+    run = async_space_git.git_process.run_async
+
+    async def scenario():
+        with locks.hold("test-space", exclusive=False):
+            task = asyncio.ensure_future(
+                async_space_git.commit_all("test-space", "msg")
+            )
+            await asyncio.sleep(0.1)
+            assert not task.done()
+            run.assert_not_called()
+        assert await task is True
+
+    asyncio.run(scenario())
+    assert locks.stats()["acquired"] == 2
+
+
+def test_async_cancelled_wait_releases_space_lock(async_space_git, tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path))
+    async_space_git.locks = locks
+
+    async def scenario():
+        with locks.hold("test-space"):
+            task = asyncio.ensure_future(
+                async_space_git.commit_all("test-space", "msg")
+            )
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            try:
+                with locks.hold("test-space", blocking=False):
+                    return
+            except SpaceGitException:
+                pass
+        pytest.fail("space lock was not released")
+
+    asyncio.run(scenario())
+    async_space_git.git_process.run_async.assert_not_called()
+
+
+def test_async_commit_file_streams_content(async_space_git, git_repo, run_git):
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.git_process = GitProcess()
+    chunks = (bytes([i]) * 1024 for i in range(4))
+    assert asyncio.run(
+        async_space_git.commit_file("test-space", "a/b.bin", "msg", chunks)
+    )
+    data = run_git(git_repo, "show", "HEAD:a/b.bin")
+    assert data == b"".join(bytes([i]) * 1024 for i in range(4))
+    async_space_git.file_manager.set_file.assert_not_called()
+
+
+@pytest.mark.parametrize("content", ["text\n", b"\x00binary\xff"])
+def test_async_commit_file_with_real_file_manager(
+    async_space_git, file_manager_at, git_repo, run_git, content
+):
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.file_manager = file_manager_at(git_repo)
+    async_space_git.git_process = GitProcess()
+    assert asyncio.run(
+        async_space_git.commit_file("test-space", "a/f.bin", "m", content)
+    )
+    data = content.encode() if isinstance(content, str) else content
+    assert run_git(git_repo, "show", "HEAD:a/f.bin") == data
+
+
+def test_async_commit_file_writes_off_the_event_loop(async_space_git):
+    threads = []
+    async_space_git.file_manager.set_file.side_effect = (
+        lambda *args: threads.append(threading.current_thread())
+    )
+    assert asyncio.run(
+        async_space_git.commit_file("test-space", "a.txt", "msg", "data")
+    )
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_async_writers_outnumbering_executor_workers(
+    async_space_git, tmp_path
+):
+    # Waiting writers must not take the executor threads the lock holder
+    # needs for its file I/O.
+    async_space_git.locks = SpaceLockManager(lock_dir=str(tmp_path))
+    async_space_git.file_manager.file_exists.return_value = False
+
+    async def scenario():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=2)
+        )
+        commits = (
+            async_space_git.commit_file(
+                "test-space", f"{i}.txt", "msg", f"data {i}"
+            )
+            for i in range(6)
+        )
+        return await asyncio.wait_for(asyncio.gather(*commits), 10)
+
+    assert asyncio.run(scenario()) == [True] * 6
+    assert async_space_git.file_manager.set_file.call_count == 6
+
+
+@pytest.fixture
+def twins(space_git, async_space_git, bare_remote, tmp_path, run_git):
+    # Sync and async managers on two clones of the same remote, running
+    # real git.
+    paths = {}
+    for name in ("sync", "async"):
+        paths[name] = tmp_path / f"clone-{name}"
+        run_git(tmp_path, "clone", "-q", str(bare_remote), paths[name].name)
+        run_git(paths[name], "config", "user.email", "test@example.com")
+        run_git(paths[name], "config", "user.name", "test")
+    for manager, name in ((space_git, "sync"), (async_space_git, "async")):
+        manager.space_manager._get_space_path.return_value = str(paths[name])
+        manager.git_process = GitProcess()
+    space_git.git = Git()
+    return space_git, async_space_git, paths
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+def test_async_results_match_sync(twins, run_git):
+    sync, async_, paths = twins
+    for path in paths.values():
+        (path / "a" / "file.txt").write_text("changed\n")
+        (path / "new.txt").write_text("new\n")
+        (path / "tracked.txt").unlink()
+        run_git(path, "add", "new.txt")
+
+    assert sync.get_status_entries("s") == asyncio.run(
+        async_.get_status_entries("s")
+    )
+    for mode in ("patch", "stat", "name-status"):
+        diffs = list(sync.diff("s", mode=mode))
+        assert len(diffs) == 3
+        assert diffs == asyncio.run(_collect(async_.diff("s", mode=mode)))
+    assert list(sync.diff("s", "HEAD~2", "HEAD")) == asyncio.run(
+        _collect(async_.diff("s", "HEAD~2", "HEAD"))
+    )
+    assert len(list(sync.history("s"))) == 3
+    assert list(sync.history("s", paths=["b"])) == asyncio.run(
+        _collect(async_.history("s", paths=["b"]))
+    )
+    assert sync.read_file_at_ref("s", "HEAD", "a/file.txt") == asyncio.run(
+        async_.read_file_at_ref("s", "HEAD", "a/file.txt")
+    )
+
+    files = {"x/one.json": {"k": 1}, "two.bin": b"\0\1"}
+    sync.commit_files("s", files, "files")
+    asyncio.run(async_.commit_files("s", files, "files"))
+    trees = [
+        run_git(path, "rev-parse", "HEAD^{tree}") for path in paths.values()
+    ]
+    assert trees[0] == trees[1]
+
+
+@pytest.mark.parametrize(
+    "method, args, error_code",
+    [
+        ("read_file_at_ref", ("HEAD", "missing.txt"), "FILE_NOT_FOUND_AT_REF"),
+        ("commit_files", ({}, "msg"), "NO_FILES"),
+        ("get_status_entries", (), "SPACE_NOT_FOUND"),
+    ],
+)
+def test_async_error_codes_match_sync(twins, method, args, error_code):
+    sync, async_, _ = twins
+    if error_code == "SPACE_NOT_FOUND":
+        for manager in (sync, async_):
+            manager.space_manager.space_exists.return_value = False
+    with pytest.raises(SpaceGitException) as exc:
+        getattr(sync, method)("s", *args)
+    assert exc.value.error_code == error_code
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(getattr(async_, method)("s", *args))
+    assert exc.value.error_code == error_code
+
+
+def test_async_stream_errors_match_sync(twins):
+    sync, async_, _ = twins
+    with pytest.raises(SpaceGitException) as exc:
+        list(sync.history("s", ref="nope"))
+    assert exc.value.error_code == "HISTORY_FAILED"
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(_collect(async_.history("s", ref="nope")))
+    assert exc.value.error_code == "HISTORY_FAILED"
+    with pytest.raises(SpaceGitException) as exc:
+        async_.diff("s", mode="bogus")
+    assert exc.value.error_code == "INVALID_DIFF_OPTIONS"
+
+
+def test_async_pull_changes_matches_sync(
+    twins, bare_remote, tmp_path, run_git
+):
+    sync, async_, _ = twins
+    assert sync.pull_changes("s") == asyncio.run(async_.pull_changes("s"))
+
+    run_git(tmp_path, "clone", "-q", str(bare_remote), "writer")
+    writer = tmp_path / "writer"
+    (writer / "a" / "file.txt").write_text("remote\n")
+    (writer / "c.txt").write_text("c\n")
+    run_git(writer, "rm", "-q", "b/file.txt")
+    run_git(writer, "add", ".")
+    run_git(
+        writer,
+        "-c",
+        "user.email=w@example.com",
+        "-c",
+        "user.name=w",
+        "commit",
+        "-q",
+        "-m",
+        "remote change",
+    )
+    run_git(writer, "push", "-q")
+
+    result = sync.pull_changes("s")
+    assert result.fetched and result.changed
+    assert result == asyncio.run(async_.pull_changes("s"))
+    assert (result.added, result.modified, result.deleted) == (
+        ("c.txt",),
+        ("a/file.txt",),
+        ("b/file.txt",),
+    )
+
+
+def test_async_push_matches_sync(twins, tmp_path, run_git):
+    _, async_, paths = twins
+    other = tmp_path / "other.git"
+    run_git(tmp_path, "init", "-q", "--bare", other.name)
+    run_git(paths["async"], "checkout", "-q", "-b", "feature")
+
+    assert asyncio.run(async_.push_repo("s", remote_url=str(other)))
+
+    assert run_git(paths["async"], "remote", "get-url", "origin") == (
+        str(other).encode() + b"\n"
+    )
+    upstream = run_git(
+        paths["async"], "rev-parse", "--abbrev-ref", "@{upstream}"
+    )
+    assert upstream == b"origin/feature\n"
+    assert asyncio.run(async_.push_repo("s"))
+
+
+def test_async_history_does_not_hold_space_between_commits(twins):
+    _, async_, paths = twins
+    async_.timeouts = {"default": 30}
+
+    async def scenario():
+        seen = []
+        async for commit in async_.history("s"):
+            assert current_deadline() is None
+            (paths["async"] / f"{len(seen)}.txt").write_text("x")
+            await async_.commit_all("s", f"during {commit.subject}")
+            seen.append(commit)
+            if len(seen) == 2:
+                break
+        return seen
+
+    assert [c.subject for c in asyncio.run(scenario())] == ["add b", "add a"]
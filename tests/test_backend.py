@@ -0,0 +1,242 @@
+"""
+Conformance suite: every backend must give the subprocess backend's
+results and error codes for the operation classes it implements.
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from darca_space_git import backend as backend_module
+from darca_space_git.backend import (
+    GitBackend,
+    InProcessBackend,
+    SubprocessBackend,
+    validate_backends,
+)
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+REFS = [
+    "HEAD",
+    "main",
+    "side",
+    "v1",
+    "v1-light",
+    "tree-tag",
+    "HEAD~1",
+    "main^",
+    "origin/main",
+    "origin",
+    "nope",
+    "v1..main",
+    "-q",
+]
+
+PATHS = [
+    "tracked.txt",
+    "dir/nested.txt",
+    "dir",
+    "",
+    "link",
+    "missing.txt",
+    "tracked.txt/below",
+    "/tracked.txt",
+    "dir/../tracked.txt",
+]
+
+
+def _make_backend(name):
+    if name == "subprocess":
+        return SubprocessBackend()
+    pytest.importorskip("dulwich")
+    return InProcessBackend()
+
+
+@pytest.fixture(params=["subprocess", "inprocess"])
+def candidate(request):
+    backend = _make_backend(request.param)
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def reference():
+    backend = SubprocessBackend()
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def repo(git_repo, run_git):
+    (git_repo / "dir").mkdir()
+    (git_repo / "dir" / "nested.txt").write_text("nested")
+    (git_repo / "link").symlink_to("tracked.txt")
+    run_git(git_repo, "add", "dir/nested.txt", "link")
+    run_git(git_repo, "commit", "-q", "-m", "second")
+    run_git(git_repo, "branch", "side", "HEAD~1")
+    run_git(git_repo, "tag", "-a", "-m", "annotated", "v1", "HEAD~1")
+    run_git(git_repo, "tag", "v1-light")
+    tree = run_git(git_repo, "rev-parse", "HEAD^{tree}").decode().strip()
+    run_git(git_repo, "tag", "tree-tag", tree)
+    head = run_git(git_repo, "rev-parse", "HEAD").decode().strip()
+    run_git(git_repo, "update-ref", "refs/remotes/origin/main", head)
+    run_git(
+        git_repo,
+        "symbolic-ref",
+        "refs/remotes/origin/HEAD",
+        "refs/remotes/origin/main",
+    )
+    run_git(git_repo, "pack-refs", "--all")
+    return str(git_repo)
+
+
+def test_resolve_ref(candidate, reference, repo, run_git):
+    head = run_git(repo, "rev-parse", "HEAD").decode().strip()
+    for ref in REFS + [head, head[:7], "0" * 40]:
+        expected = reference.resolve_ref(repo, ref)
+        assert candidate.resolve_ref(repo, ref) == expected, ref
+
+
+def test_resolve_ref_sees_new_refs(candidate, repo, run_git):
+    assert candidate.resolve_ref(repo, "later") is None
+    run_git(repo, "branch", "later")
+    assert candidate.resolve_ref(repo, "later") is not None
+
+
+def test_resolve_ref_unborn_and_not_a_repo(candidate, tmp_path, run_git):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    run_git(empty, "init", "-q")
+    assert candidate.resolve_ref(str(empty), "HEAD") is None
+    plain = tmp_path / "plain"
+    plain.mkdir()
+    assert candidate.resolve_ref(str(plain), "HEAD") is None
+
+
+def test_linked_worktree_sees_repacked_refs(
+    candidate, reference, repo, run_git, tmp_path
+):
+    work = str(tmp_path / "work")
+    run_git(repo, "worktree", "add", "-q", work, "side")
+    assert candidate.resolve_ref(work, "HEAD") == reference.resolve_ref(
+        repo, "side"
+    )
+    candidate.read_blobs(work, "main", ["tracked.txt"])
+
+    Path(repo, "tracked.txt").write_text("changed")
+    run_git(repo, "commit", "-q", "-am", "change")
+    run_git(repo, "gc", "-q", "--prune=now")
+
+    for ref in ["main", "HEAD"]:
+        assert candidate.resolve_ref(work, ref) == reference.resolve_ref(
+            work, ref
+        )
+        assert candidate.read_blobs(
+            work, ref, ["tracked.txt"]
+        ) == reference.read_blobs(work, ref, ["tracked.txt"])
+
+
+def test_inprocess_reopens_linked_worktree_after_repack(
+    repo, run_git, tmp_path
+):
+    backend = _make_backend("inprocess")
+    work = str(tmp_path / "work")
+    run_git(repo, "worktree", "add", "-q", work, "side")
+    opened = backend._repo(work)
+    assert backend._repo(work) is opened
+
+    run_git(repo, "gc", "-q", "--prune=now")
+    assert backend._repo(work) is not opened
+    backend.close()
+
+
+def test_read_blobs(candidate, reference, repo):
+    for ref in ["HEAD", "side", "v1", "tree-tag", "HEAD~1", "nope"]:
+        expected = reference.read_blobs(repo, ref, PATHS)
+        assert candidate.read_blobs(repo, ref, PATHS) == expected, ref
+
+
+def test_status(candidate, reference, repo):
+    (Path(repo) / "tracked.txt").write_text("changed")
+    (Path(repo) / "new.txt").write_text("new")
+    for untracked in (True, False):
+        expected = reference.status(repo, untracked)
+        assert candidate.status(repo, untracked) == expected
+
+
+def _manager(space_git, repo, backend):
+    space_git.space_manager._get_space_path.return_value = repo
+    space_git.git_process = GitProcess()
+    space_git.backends = validate_backends(
+        {op: backend for op in backend.operations}
+    )
+    return space_git
+
+
+@pytest.mark.parametrize(
+    "call, error_code",
+    [
+        (lambda m: m.read_file_at_ref("s", "HEAD", "missing"), None),
+        (lambda m: m.history_page("s", ref="nope"), "HISTORY_FAILED"),
+    ],
+)
+def test_manager_error_codes(space_git, candidate, repo, call, error_code):
+    manager = _manager(space_git, repo, candidate)
+    with pytest.raises(SpaceGitException) as exc:
+        call(manager)
+    assert exc.value.error_code == (error_code or "FILE_NOT_FOUND_AT_REF")
+
+
+def test_manager_results(space_git, candidate, repo):
+    manager = _manager(space_git, repo, candidate)
+    assert manager.read_files_at_ref("s", "v1", ["tracked.txt", "dir"]) == {
+        "tracked.txt": b"one\n",
+        "dir": None,
+    }
+    assert manager.history_page("s", ref="v1").commits[0].subject == "init"
+    assert manager.get_status_entries("s") == []
+
+
+def test_read_failure_code(space_git):
+    failing = MagicMock(spec=GitBackend)
+    failing.operations = frozenset({"blobs"})
+    failing.read_blobs.side_effect = SpaceGitException(
+        message="boom", error_code="GIT_COMMAND_FAILED"
+    )
+    space_git.backends = validate_backends({"blobs": failing})
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.read_file_at_ref("s", "HEAD", "a")
+    assert exc.value.error_code == "READ_AT_REF_FAILED"
+    space_git.close()
+    failing.close.assert_called_once()
+
+
+def test_validate_backends():
+    stub = MagicMock(spec=GitBackend, operations=frozenset())
+    stub.name = "stub"
+    with pytest.raises(SpaceGitException) as exc:
+        validate_backends({"status": stub})
+    assert exc.value.error_code == "INVALID_BACKEND"
+    assert exc.value.metadata == {"operation": "status", "backend": "stub"}
+    with pytest.raises(SpaceGitException):
+        validate_backends({"index": SubprocessBackend()})
+
+
+def test_backends_must_implement_every_operation():
+    class RefsOnly(GitBackend):
+        operations = frozenset({"refs"})
+
+        def resolve_ref(self, repo_path, ref):
+            return None
+
+    with pytest.raises(TypeError):
+        RefsOnly()
+
+
+def test_inprocess_needs_dulwich(monkeypatch):
+    monkeypatch.setattr(backend_module, "Repo", None)
+    with pytest.raises(SpaceGitException) as exc:
+        InProcessBackend()
+    assert exc.value.error_code == "BACKEND_UNAVAILABLE"
@@ -0,0 +1,187 @@
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from darca_git.git import GitException
+
+from darca_space_git.bulk import (
+    read_remote_url,
+    remote_host,
+    run_bulk,
+)
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.locking import SpaceLockManager
+from darca_space_git.mirror import MirrorCache
+
+
+class FakeManager:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+
+    def pull_repo(self, space_name):
+        host = space_name.split("/")[0]
+        with self.lock:
+            self.active[host] = self.active.get(host, 0) + 1
+            self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+        time.sleep(0.01)
+        with self.lock:
+            self.active[host] -= 1
+        if space_name.endswith("bad"):
+            raise SpaceGitException("fail", error_code="PULL_FAILED")
+        return True
+
+
+@pytest.mark.parametrize(
+    "url, host",
+    [
+        ("https://github.com/org/repo.git", "github.com"),
+        ("ssh://git@example.com:2222/repo.git", "example.com"),
+        ("git@gitlab.com:org/repo.git", "gitlab.com"),
+        ("file:///srv/repo.git", None),
+        ("/srv/repo.git", None),
+        (None, None),
+    ],
+)
+def test_remote_host(url, host):
+    assert remote_host(url) == host
+
+
+def test_read_remote_url(tmp_path):
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".git" / "config").write_text(
+        '[core]\n\tbare = false\n[remote "upstream"]\n\turl = a\n'
+        '[remote "origin"]\n\turl = https://h/r.git\n'
+    )
+    assert read_remote_url(str(tmp_path)) == "https://h/r.git"
+    assert read_remote_url(str(tmp_path), "upstream") == "a"
+    assert read_remote_url(str(tmp_path / "missing")) is None
+
+
+def test_run_bulk_streams_errors_without_aborting():
+    manager = FakeManager()
+    spaces = ["h/one", "h/bad", "h/two"]
+    results = list(run_bulk(manager, "pull_repo", spaces, max_workers=2))
+    assert {r.space_name for r in results} == set(spaces)
+    failed = [r for r in results if not r.ok]
+    assert [r.space_name for r in failed] == ["h/bad"]
+    assert failed[0].error.error_code == "PULL_FAILED"
+
+
+def test_run_bulk_per_host_limit():
+    manager = FakeManager()
+    spaces = [f"a/{i}" for i in range(6)] + [f"b/{i}" for i in range(6)]
+    results = list(
+        run_bulk(
+            manager,
+            "pull_repo",
+            spaces,
+            max_workers=6,
+            per_host_limit=2,
+            host_of=lambda s: s.split("/")[0],
+        )
+    )
+    assert all(r.ok for r in results)
+    assert manager.peak == {"a": 2, "b": 2}
+
+
+def test_run_bulk_wraps_unexpected_errors():
+    class Broken:
+        def pull_repo(self, space_name):
+            raise RuntimeError("boom")
+
+    (result,) = run_bulk(Broken(), "pull_repo", ["x"])
+    assert result.error.error_code == "BULK_OPERATION_FAILED"
+
+
+class PicklableManager:
+    def get_status(self, space_name, porcelain=True):
+        if space_name == "bad":
+            raise SpaceGitException(
+                "fail", error_code="STATUS_FAILED", metadata={"space": "bad"}
+            )
+        return f"{space_name}:{porcelain}"
+
+
+def test_run_bulk_process_pool():
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = {
+            r.space_name: r
+            for r in run_bulk(
+                PicklableManager(),
+                "get_status",
+                ["ok", "bad"],
+                kwargs={"porcelain": False},
+                executor=pool,
+            )
+        }
+    assert results["ok"].ok
+    assert results["ok"].value == "ok:False"
+    assert results["bad"].error.error_code == "STATUS_FAILED"
+    assert results["bad"].error.metadata == {"space": "bad"}
+
+
+class ConfiguredManager:
+    def __init__(self, prefix="default"):
+        self.prefix = prefix
+
+    def process_settings(self):
+        return {"prefix": self.prefix}
+
+    def get_status(self, space_name):
+        return f"{self.prefix}:{space_name}"
+
+
+def test_run_bulk_process_pool_carries_settings():
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        (result,) = run_bulk(
+            ConfiguredManager("custom"), "get_status", ["s"], executor=pool
+        )
+    assert result.value == "custom:s"
+
+
+def test_manager_process_settings(space_git, tmp_path):
+    space_git.timeouts = {"default": 5.0}
+    space_git.locks = SpaceLockManager(str(tmp_path), max_concurrent=2)
+    space_git.mirrors = MirrorCache(str(tmp_path / "mirrors"), 10.0)
+
+    settings = pickle.loads(pickle.dumps(space_git.process_settings()))
+
+    assert settings["timeouts"] == {"default": 5.0}
+    assert settings["locks"].lock_dir == str(tmp_path)
+    assert settings["locks"].max_concurrent == 2
+    assert settings["mirrors"].root == str(tmp_path / "mirrors")
+    assert settings["mirrors"].refresh_interval == 10.0
+
+    space_git.metrics.enabled = True
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        with pytest.raises(SpaceGitException) as exc:
+            next(space_git.pull_many(["a"], executor=pool))
+    assert exc.value.error_code == "PROCESS_POOL_UNSUPPORTED"
+    assert exc.value.metadata == {"settings": ["metrics"]}
+
+
+def test_manager_pull_many(space_git):
+    def pull(path):
+        if space_git.git.pull.call_count == 2:
+            raise GitException("fail")
+
+    space_git.git.pull.side_effect = pull
+    results = list(space_git.pull_many(["a", "b", "c"], max_workers=1))
+    assert [r.ok for r in results] == [True, False, True]
+    assert results[1].error.error_code == "PULL_FAILED"
+
+
+def test_manager_push_and_status_many(space_git):
+    space_git.git.status.return_value = "clean"
+    pushed = list(
+        space_git.push_many(
+            ["a", "b"], remote_url="https://h/r.git", per_host_limit=1
+        )
+    )
+    assert all(r.ok for r in pushed)
+    statuses = list(space_git.status_many(["a"]))
+    assert statuses[0].value == "clean"
@@ -0,0 +1,118 @@
+import pytest
+
+from darca_space_git.cat_file import CatFileBatch, CatFilePool
+from darca_space_git.exceptions import SpaceGitException
+
+
+@pytest.fixture
+def repo(git_repo, run_git):
+    (git_repo / "config.yml").write_text("env: main\n")
+    (git_repo / "binary.bin").write_bytes(b"\x00\x01\n\xff")
+    run_git(git_repo, "add", ".")
+    run_git(git_repo, "commit", "-q", "-m", "config")
+    run_git(git_repo, "checkout", "-q", "-b", "dev")
+    (git_repo / "config.yml").write_text("env: dev\n")
+    run_git(git_repo, "commit", "-q", "-am", "dev")
+    return git_repo
+
+
+def test_batch_reads_blobs_and_missing(repo):
+    batch = CatFileBatch(str(repo))
+    try:
+        assert batch.read_many(
+            ["main:config.yml", "dev:config.yml", "main:binary.bin"]
+        ) == [b"env: main\n", b"env: dev\n", b"\x00\x01\n\xff"]
+        assert batch.read_many(["main:nope", "main:", "nope:x"]) == [
+            None,
+            None,
+            None,
+        ]
+    finally:
+        batch.close()
+    assert not batch.alive
+
+
+def test_batch_rejects_newlines(repo):
+    batch = CatFileBatch(str(repo))
+    with pytest.raises(SpaceGitException) as exc:
+        batch.read_many(["main:a\nb"])
+    assert exc.value.error_code == "INVALID_PATH"
+    batch.close()
+
+
+def test_batch_handles_large_requests(repo):
+    batch = CatFileBatch(str(repo))
+    specs = ["main:config.yml"] * 5000
+    assert batch.read_many(specs) == [b"env: main\n"] * 5000
+    batch.close()
+
+
+def test_pool_reuses_and_evicts(repo):
+    now = [0.0]
+    pool = CatFilePool(idle_timeout=10, clock=lambda: now[0])
+    pool.read_many(str(repo), ["main:config.yml"])
+    first = pool._processes[str(repo)]
+    pool.read_many(str(repo), ["main:config.yml"])
+    assert pool._processes[str(repo)] is first
+
+    now[0] = 20
+    pool.evict_idle()
+    assert len(pool) == 0
+    assert not first.alive
+
+
+def test_pool_replaces_dead_process(repo):
+    pool = CatFilePool()
+    pool.read_many(str(repo), ["main:config.yml"])
+    pool._processes[str(repo)]._proc.kill()
+    assert pool.read_many(str(repo), ["dev:config.yml"]) == [b"env: dev\n"]
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_pool_max_processes(repo, run_git, tmp_path_factory):
+    other = tmp_path_factory.mktemp("other")
+    run_git(other, "init", "-q")
+    pool = CatFilePool(max_processes=1)
+    pool.read_many(str(repo), ["main:config.yml"])
+    pool.read_many(str(other), ["HEAD:x"])
+    assert list(pool._processes) == [str(other)]
+    pool.close()
+
+
+def test_pool_closes_evicted_process_after_use(
+    repo, run_git, tmp_path_factory
+):
+    other = tmp_path_factory.mktemp("other")
+    run_git(other, "init", "-q")
+    pool = CatFilePool(max_processes=1)
+    with pool._checkout(str(repo)) as busy:
+        assert pool.read_many(str(other), ["HEAD:x"]) == [None]
+        assert list(pool._processes) == [str(other)]
+        pool.close()
+        assert busy.alive
+        assert busy.read_many(["main:config.yml"]) == [b"env: main\n"]
+    assert not busy.alive
+    assert len(pool) == 0
+
+
+def test_manager_read_file_at_ref(space_git, repo):
+    space_git.space_manager._get_space_path.return_value = str(repo)
+    assert (
+        space_git.read_file_at_ref("test-space", "main", "config.yml")
+        == b"env: main\n"
+    )
+    assert space_git.read_files_at_ref(
+        "test-space", "dev", ["config.yml", "missing.txt"]
+    ) == {"config.yml": b"env: dev\n", "missing.txt": None}
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.read_file_at_ref("test-space", "main", "missing.txt")
+    assert exc.value.error_code == "FILE_NOT_FOUND_AT_REF"
+    space_git.close()
+
+
+def test_manager_read_at_ref_failure(space_git, repo):
+    space_git.space_manager._get_space_path.return_value = str(repo)
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.read_files_at_ref("test-space", "main", ["a\nb"])
+    assert exc.value.error_code == "READ_AT_REF_FAILED"
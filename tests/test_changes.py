@@ -0,0 +1,109 @@
+import pytest
+
+from darca_space_git.changes import (
+    PullResult,
+    changed_paths,
+    parse_name_status,
+    remote_matches_tracking,
+)
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+@pytest.fixture
+def cloned(space_git, tmp_path, bare_remote, run_git):
+    target = tmp_path / "space"
+    run_git(tmp_path, "clone", "-q", str(bare_remote), str(target))
+    space_git.space_manager._get_space_path.return_value = str(target)
+    space_git.git_process = GitProcess()
+    space_git.git.pull.side_effect = lambda path: run_git(path, "pull", "-q")
+    return space_git, target
+
+
+def _head(run_git, path):
+    return run_git(path, "rev-parse", "HEAD").decode().strip()
+
+
+def test_parse_name_status():
+    out = b"A\0new.txt\0M\0dir/changed.txt\0T\0link\0D\0gone.txt\0"
+    assert parse_name_status(out) == (
+        ("new.txt",),
+        ("dir/changed.txt", "link"),
+        ("gone.txt",),
+    )
+    assert parse_name_status(b"") == ((), (), ())
+
+
+def test_changed_paths_from_unborn(git_repo, run_git):
+    head = _head(run_git, git_repo)
+    process = GitProcess()
+    assert changed_paths(process, str(git_repo), None, head) == (
+        ("tracked.txt",),
+        (),
+        (),
+    )
+    assert changed_paths(process, str(git_repo), head, head) == ((), (), ())
+
+
+def test_pull_changes_skips_when_up_to_date(cloned, run_git):
+    manager, target = cloned
+    head = _head(run_git, target)
+
+    result = manager.pull_changes("test-space")
+
+    assert result == PullResult(head, head, fetched=False)
+    assert not result.changed
+    manager.git.pull.assert_not_called()
+
+
+def test_pull_changes_reports_paths(cloned, git_repo, bare_remote, run_git):
+    manager, target = cloned
+    old_head = _head(run_git, target)
+    (git_repo / "added.txt").write_text("new")
+    (git_repo / "tracked.txt").write_text("changed")
+    run_git(git_repo, "rm", "-q", "a/file.txt")
+    run_git(git_repo, "add", "added.txt", "tracked.txt")
+    run_git(git_repo, "commit", "-q", "-m", "change")
+    run_git(git_repo, "push", "-q", str(bare_remote), "main")
+
+    result = manager.pull_changes("test-space")
+
+    assert result.fetched and result.changed
+    assert result.old_head == old_head
+    assert result.new_head == _head(run_git, git_repo)
+    assert result.added == ("added.txt",)
+    assert result.modified == ("tracked.txt",)
+    assert result.deleted == ("a/file.txt",)
+    assert set(result.paths) == {"added.txt", "tracked.txt", "a/file.txt"}
+
+
+def test_pull_changes_pulls_unmerged_tracking_ref(cloned, git_repo, run_git):
+    manager, target = cloned
+    (git_repo / "later.txt").write_text("later")
+    run_git(git_repo, "add", "later.txt")
+    run_git(git_repo, "commit", "-q", "-m", "later")
+    run_git(git_repo, "push", "-q", str(target.parent / "remote.git"), "main")
+    run_git(target, "fetch", "-q")
+    assert remote_matches_tracking(GitProcess(), str(target)) is False
+
+    result = manager.pull_changes("test-space")
+    assert result.added == ("later.txt",)
+
+
+def test_pull_changes_without_upstream(cloned, run_git):
+    manager, target = cloned
+    run_git(target, "checkout", "-q", "--detach")
+    assert remote_matches_tracking(GitProcess(), str(target)) is None
+    manager.git.pull.side_effect = None
+
+    result = manager.pull_changes("test-space")
+    assert result.fetched and not result.changed
+    manager.git.pull.assert_called_once()
+
+
+def test_pull_changes_unreachable_remote(cloned, run_git, tmp_path):
+    manager, target = cloned
+    run_git(target, "remote", "set-url", "origin", str(tmp_path / "gone"))
+    with pytest.raises(SpaceGitException) as exc:
+        manager.pull_changes("test-space")
+    assert exc.value.error_code == "PULL_FAILED"
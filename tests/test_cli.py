@@ -0,0 +1,171 @@
+import base64
+import io
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from darca_space_git.cli import BatchRunner, batch_operations, main, to_json
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.history import HistoryPage
+
+
+class FakeManager:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = 0
+        self.order = {}
+
+    def commit_all(self, space_name, message):
+        with self.lock:
+            if self.running.get(space_name):
+                raise AssertionError(f"{space_name} ran concurrently")
+            self.running[space_name] = True
+            self.peak = max(self.peak, sum(self.running.values()))
+        time.sleep(0.02)
+        with self.lock:
+            self.running[space_name] = False
+            self.order.setdefault(space_name, []).append(message)
+        if message == "fail":
+            raise SpaceGitException(message="no", error_code="COMMIT_FAILED")
+        if message == "crash":
+            raise RuntimeError("boom")
+        return True
+
+
+def _lines(*requests):
+    return [json.dumps(r) + "\n" for r in requests]
+
+
+def test_batch_keeps_order_per_space_and_runs_spaces_in_parallel():
+    manager = FakeManager()
+    requests = [
+        {"op": "commit_all", "space": f"s{i % 3}", "args": {"message": str(i)}}
+        for i in range(12)
+    ]
+
+    results = list(BatchRunner(manager, workers=3).run(_lines(*requests)))
+
+    assert sorted(r["id"] for r in results) == list(range(1, 13))
+    assert all(r["ok"] and r["result"] is True for r in results)
+    for space in ("s0", "s1", "s2"):
+        expected = [str(i) for i in range(12) if f"s{i % 3}" == space]
+        assert manager.order[space] == expected
+    assert manager.peak > 1
+
+
+def test_batch_reports_errors():
+    lines = _lines(
+        {
+            "id": "a",
+            "op": "commit_all",
+            "space": "s",
+            "args": {"message": "fail"},
+        },
+        {
+            "id": "b",
+            "op": "commit_all",
+            "space": "s",
+            "args": {"message": "crash"},
+        },
+        {"id": "c", "op": "rm_rf", "space": "s"},
+        {"id": "d", "op": "commit_all", "space": "s", "args": {"nope": 1}},
+        {"id": "e", "op": "commit_all", "args": {"message": "m"}},
+    ) + ["not json\n", "\n"]
+
+    results = {
+        r["id"]: r for r in BatchRunner(FakeManager(), workers=2).run(lines)
+    }
+
+    assert results["a"]["error_code"] == "COMMIT_FAILED"
+    assert results["b"]["error_code"] == "BATCH_OPERATION_FAILED"
+    for key in ("c", "d", "e", 6):
+        assert results[key]["error_code"] == "INVALID_BATCH_REQUEST"
+        assert results[key]["elapsed"] == 0.0
+    assert len(results) == 6
+    assert not any(r["ok"] for r in results.values())
+
+
+def test_batch_bounds_read_ahead():
+    manager = FakeManager()
+    lines = _lines(
+        *[
+            {"op": "commit_all", "space": "s", "args": {"message": str(i)}}
+            for i in range(5)
+        ]
+    )
+    results = list(BatchRunner(manager, max_pending=1).run(lines))
+    assert [r["id"] for r in results] == [1, 2, 3, 4, 5]
+    assert max(r["queued"] for r in results) < 0.05
+
+
+def test_batch_options():
+    with pytest.raises(SpaceGitException) as exc:
+        BatchRunner(FakeManager(), workers=0)
+    assert exc.value.error_code == "INVALID_BATCH_OPTIONS"
+    operations = batch_operations()
+    assert {"pull_repo", "commit_files", "history", "diff"} <= set(operations)
+    assert not {"export", "pull_many", "close"} & set(operations)
+
+
+def test_to_json():
+    page = HistoryPage(commits=[], cursor=None)
+    assert to_json({"page": page, "raw": b"\x00", "paths": ("a",)}) == {
+        "page": {"commits": [], "cursor": None},
+        "raw": {"base64": "AA=="},
+        "paths": ["a"],
+    }
+    assert to_json(x for x in [1, 2]) == [1, 2]
+
+
+def test_main_runs_batch(space_git, git_repo, tmp_path):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    source = tmp_path / "ops.jsonl"
+    source.write_text(
+        "".join(
+            _lines(
+                {
+                    "id": "read",
+                    "op": "read_file_at_ref",
+                    "space": "s",
+                    "args": {"ref": "HEAD", "relative_path": "tracked.txt"},
+                },
+                {"id": "log", "op": "history_page", "space": "s"},
+                {
+                    "id": "bad",
+                    "op": "history_page",
+                    "space": "s",
+                    "args": {"ref": "nope"},
+                },
+            )
+        )
+    )
+    out = io.StringIO()
+
+    with patch("darca_space_git.cli.SpaceGitManager", return_value=space_git):
+        code = main(
+            ["batch", "--input", str(source), "--workers", "2"], stdout=out
+        )
+
+    results = {
+        r["id"]: r for r in map(json.loads, out.getvalue().splitlines())
+    }
+    assert code == 1
+    assert base64.b64decode(results["read"]["result"]["base64"]) == b"one\n"
+    assert results["log"]["result"]["commits"][0]["message"] == "init"
+    assert results["bad"]["error_code"] == "HISTORY_FAILED"
+
+
+def test_main_reads_stdin_and_reports_bad_options(space_git, tmp_path):
+    out = io.StringIO()
+    with patch("darca_space_git.cli.SpaceGitManager", return_value=space_git):
+        assert main(["batch"], stdin=io.StringIO(""), stdout=out) == 0
+    assert out.getvalue() == ""
+    with pytest.raises(SystemExit) as exc:
+        main(["batch", "--input", str(tmp_path / "missing.jsonl")])
+    assert exc.value.code == 2
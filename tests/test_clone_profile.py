@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from darca_space_git.clone_profile import PROFILE_FILE, CloneProfile
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+@pytest.fixture
+def real_space_git(space_git, tmp_path):
+    target = tmp_path / "space"
+    target.mkdir()
+    space_git.space_manager._get_space_path.return_value = str(target)
+    space_git.git_process = GitProcess()
+    return space_git, target
+
+
+def test_clone_args():
+    profile = CloneProfile(
+        depth=1, filter="blob:none", branch="main", sparse_paths=["a/"]
+    )
+    assert profile.clone_args() == [
+        "--depth=1",
+        "--filter=blob:none",
+        "--no-single-branch",
+        "--branch",
+        "main",
+        "--sparse",
+    ]
+    assert profile.trim_args() == ["fetch", "--depth=1"]
+    assert profile.sparse_input() == b"a\n"
+    assert CloneProfile(single_branch=True).clone_args() == ["--single-branch"]
+    assert CloneProfile(shallow_since="2024-01-01").trim_args() == [
+        "fetch",
+        "--shallow-since=2024-01-01",
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"depth": 0},
+        {"depth": 1, "shallow_since": "2024-01-01"},
+        {"filter": " "},
+        {"sparse_paths": ["/abs"]},
+    ],
+)
+def test_invalid_profile(kwargs):
+    with pytest.raises(SpaceGitException) as exc:
+        CloneProfile(**kwargs)
+    assert exc.value.error_code == "INVALID_CLONE_PROFILE"
+
+
+def test_save_and_load(tmp_path):
+    (tmp_path / ".git").mkdir()
+    assert CloneProfile.load(str(tmp_path)) is None
+    profile = CloneProfile(depth=2, sparse_paths=("a", "b"))
+    profile.save(str(tmp_path))
+    assert CloneProfile.load(str(tmp_path)) == profile
+
+    (tmp_path / ".git" / PROFILE_FILE).write_text('{"unknown": 1}')
+    with pytest.raises(SpaceGitException) as exc:
+        CloneProfile.load(str(tmp_path))
+    assert exc.value.error_code == "INVALID_CLONE_PROFILE"
+
+
+def test_shallow_clone_stays_shallow_on_pull(
+    real_space_git, bare_remote, git_repo, run_git
+):
+    manager, target = real_space_git
+    manager.clone_repo(
+        "test-space", bare_remote.as_uri(), profile=CloneProfile(depth=1)
+    )
+    assert run_git(target, "rev-list", "--count", "HEAD") == b"1\n"
+
+    (git_repo / "new.txt").write_text("new")
+    run_git(git_repo, "add", "new.txt")
+    run_git(git_repo, "commit", "-q", "-m", "new")
+    run_git(git_repo, "push", "-q", str(bare_remote), "main")
+
+    assert manager.pull_repo("test-space") is True
+    assert (target / "new.txt").exists()
+    assert run_git(target, "rev-list", "--count", "HEAD") == b"1\n"
+
+
+def test_partial_sparse_clone(real_space_git, bare_remote, run_git):
+    manager, target = real_space_git
+    profile = CloneProfile(
+        filter="blob:none", single_branch=True, sparse_paths=["a"]
+    )
+    manager.clone_repo("test-space", bare_remote.as_uri(), profile=profile)
+
+    assert (target / "a" / "file.txt").read_text() == "a"
+    assert not (target / "b").exists()
+    assert (
+        run_git(target, "config", "remote.origin.partialclonefilter")
+        == b"blob:none\n"
+    )
+    assert CloneProfile.load(str(target)) == profile
+
+
+def test_clone_with_profile_failure(real_space_git, tmp_path):
+    manager, _ = real_space_git
+    with pytest.raises(SpaceGitException) as exc:
+        manager.clone_repo(
+            "test-space",
+            (tmp_path / "missing.git").as_uri(),
+            profile=CloneProfile(depth=1),
+        )
+    assert exc.value.error_code == "CLONE_FAILED"
+    assert exc.value.metadata["profile"]["depth"] == 1
+
+
+def test_async_clone_with_profile(async_space_git, tmp_path):
+    async_space_git.space_manager._get_space_path.return_value = str(tmp_path)
+    (tmp_path / ".git").mkdir()
+    profile = CloneProfile(depth=3, sparse_paths=["docs"])
+
+    asyncio.run(async_space_git.clone_repo("s", "url", profile=profile))
+    asyncio.run(async_space_git.pull_repo("s"))
+
+    calls = [
+        c.args[0] for c in async_space_git.git_process.run_async.mock_calls
+    ]
+    assert calls == [
+        ["clone", "--depth=3", "--no-single-branch", "--sparse", "url", "."],
+        ["sparse-checkout", "set", "--cone", "--stdin"],
+        ["pull"],
+        ["fetch", "--depth=3"],
+    ]
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from darca_space_git.commit_queue import CommitQueue, aggregate_messages
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+class Recorder:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, files, message):
+        if self.fail:
+            raise SpaceGitException("fail", error_code="COMMIT_FILES_FAILED")
+        self.batches.append((dict(files), message))
+        return f"commit-{len(self.batches)}"
+
+
+def test_aggregate_messages():
+    assert aggregate_messages(["same", "same"]) == "same"
+    assert aggregate_messages(["a", "b", "a"]) == (
+        "Group commit of 3 changes\n\n- a\n- b"
+    )
+
+
+def test_queue_coalesces_concurrent_writes():
+    recorder = Recorder()
+    queue = CommitQueue(recorder, window=0.2)
+    futures = []
+
+    def writer(i):
+        futures.append(queue.submit(f"f{i}.txt", str(i), f"write {i}"))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert {f.result(timeout=5) for f in futures} == {"commit-1"}
+    assert len(recorder.batches) == 1
+    assert len(recorder.batches[0][0]) == 10
+
+
+def test_queue_max_files_and_last_write_wins():
+    recorder = Recorder()
+    queue = CommitQueue(recorder, window=60, max_files=2)
+    first = queue.submit("a.txt", "1", "m")
+    second = queue.submit("a.txt", "2", "m")
+    assert first.result(timeout=5) == second.result(timeout=5)
+    assert recorder.batches == [({"a.txt": "2"}, "m")]
+
+
+def test_queue_propagates_errors():
+    queue = CommitQueue(Recorder(fail=True), window=0)
+    future = queue.submit("a.txt", "1", "m")
+    with pytest.raises(SpaceGitException) as exc:
+        future.result(timeout=5)
+    assert exc.value.error_code == "COMMIT_FILES_FAILED"
+
+
+def test_queue_flush_and_close():
+    recorder = Recorder()
+    queue = CommitQueue(recorder, window=60, max_files=2)
+    futures = [queue.submit(f"{i}.txt", "x", "m") for i in range(3)]
+    queue.close()
+    assert all(f.done() for f in futures)
+    assert len(queue) == 0
+    with pytest.raises(SpaceGitException) as exc:
+        queue.submit("late.txt", "x", "m")
+    assert exc.value.error_code == "COMMIT_QUEUE_CLOSED"
+
+
+def test_queue_worker_exits_when_idle():
+    queue = CommitQueue(Recorder(), window=0, idle_timeout=0.05)
+    queue.submit("a.txt", "x", "m").result(timeout=5)
+    deadline = time.monotonic() + 5
+    while queue._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queue._thread is None
+
+
+def test_manager_enqueue_commit(space_git, git_repo, run_git):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.commit_queue_window = 60
+    futures = [
+        space_git.enqueue_commit("test-space", f"q{i}.txt", f"m{i}", "x")
+        for i in range(3)
+    ]
+    space_git.flush_commit_queues("test-space")
+    assert len({f.result(timeout=5) for f in futures}) == 1
+    assert run_git(git_repo, "rev-list", "--count", "HEAD") == b"2\n"
+    space_git.close()
+    assert space_git.commit_queues == {}
+
+
+def test_manager_enqueue_commit_rejects_bad_write(
+    space_git, git_repo, run_git
+):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.commit_queue_window = 60
+    content = {"k": 1}
+    good = space_git.enqueue_commit("test-space", "a.json", "m", content)
+    content["k"] = 2
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.enqueue_commit("test-space", "../x.txt", "m", "x")
+    assert exc.value.error_code == "INVALID_PATH"
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.enqueue_commit("test-space", "b.txt", "m", 42)
+    assert exc.value.error_code == "UNSUPPORTED_CONTENT"
+    space_git.flush_commit_queues("test-space")
+    commit = good.result(timeout=5)
+    assert run_git(git_repo, "show", f"{commit}:a.json") == b'{\n  "k": 1\n}'
+    space_git.close()
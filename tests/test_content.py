@@ -0,0 +1,107 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+import yaml
+from darca_space_manager.space_file_manager import SpaceFileManager
+
+from darca_space_git.content import (
+    content_chunks,
+    missing_paths,
+    normalize_path,
+    serialize_content,
+)
+from darca_space_git.exceptions import SpaceGitException
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [("a/b.txt", "a/b.txt"), ("/a//b/../c.txt", "a/c.txt"), ("a\\b", "a/b")],
+)
+def test_normalize_path(raw, expected):
+    assert normalize_path(raw) == expected
+
+
+@pytest.mark.parametrize("raw", ["", ".", "..", "../x", "a/../../x"])
+def test_normalize_path_rejects_escapes(raw):
+    with pytest.raises(SpaceGitException) as exc:
+        normalize_path(raw)
+    assert exc.value.error_code == "INVALID_PATH"
+
+
+def test_serialize_content():
+    assert serialize_content("a.txt", "héllo") == "héllo".encode("utf-8")
+    assert serialize_content("a.bin", b"\x00") == b"\x00"
+    assert json.loads(serialize_content("a.json", {"k": 1})) == {"k": 1}
+    assert yaml.safe_load(serialize_content("a.yml", {"k": [1]})) == {"k": [1]}
+
+
+def test_serialize_content_unsupported():
+    with pytest.raises(SpaceGitException) as exc:
+        serialize_content("a.txt", {"k": 1})
+    assert exc.value.error_code == "UNSUPPORTED_CONTENT"
+
+
+def test_missing_paths(tmp_path):
+    (tmp_path / "dir").mkdir()
+    (tmp_path / "dir" / "a.txt").write_text("a")
+    (tmp_path / "top.txt").write_text("t")
+    paths = ["dir/a.txt", "dir/b.txt", "top.txt", "gone/c.txt", "dir"]
+    assert missing_paths(str(tmp_path), paths) == ["dir/b.txt", "gone/c.txt"]
+
+
+def test_content_chunks():
+    def chunks(content):
+        return [bytes(c) for c in content_chunks("a.txt", content, 2)]
+
+    assert chunks(b"abcde") == [b"ab", b"cd", b"e"]
+    assert chunks(memoryview(bytearray(b"abc"))) == [b"ab", b"c"]
+    assert chunks(io.BytesIO(b"abc")) == [b"ab", b"c"]
+    assert chunks(io.StringIO("hé")) == ["hé".encode("utf-8")]
+    assert chunks(iter([b"x", "y", memoryview(b"z")])) == [b"x", b"y", b"z"]
+    assert chunks("text") == [b"text"]
+    assert chunks(b"") == []
+
+
+def test_content_chunks_unsupported():
+    with pytest.raises(SpaceGitException) as exc:
+        content_chunks("a.txt", 42)
+    assert exc.value.error_code == "UNSUPPORTED_CONTENT"
+    with pytest.raises(SpaceGitException):
+        list(content_chunks("a.txt", [b"ok", 1]))
+
+
+def test_serialize_content_memoizes_dicts():
+    first = serialize_content("a.yaml", {"k": [1, 2]})
+    assert serialize_content("a.yaml", {"k": [1, 2]}) is first
+    assert serialize_content("a.yaml", {1: "a"}) != serialize_content(
+        "a.yaml", {"1": "a"}
+    )
+    assert serialize_content("a.json", {"k": [1, 2]}) != first
+    assert serialize_content("a.yaml", {"k": 1}) != serialize_content(
+        "a.yaml", {"k": True}
+    )
+    assert serialize_content("a.yaml", {"k": (1,)}) != serialize_content(
+        "a.yaml", {"k": [1]}
+    )
+
+
+@pytest.mark.parametrize(
+    "name, content",
+    [
+        ("a.json", {"k": [1, 2.5, None], "ü": {"nested": True}}),
+        ("a.yaml", {"k": [1, 2.5, None], "ü": {"nested": True}}),
+        ("a.yml", {"z": "multi\nline", "a": 1}),
+        ("a.txt", "plain text\n"),
+    ],
+)
+def test_serialize_content_matches_space_file_manager(tmp_path, name, content):
+    with patch(
+        "darca_space_manager.space_file_manager.SpaceManager"
+    ) as space_manager:
+        space_manager.return_value.space_exists.return_value = True
+        space_manager.return_value._get_space_path.return_value = str(tmp_path)
+        file_manager = SpaceFileManager()
+    file_manager.set_file("space", name, content)
+    assert (tmp_path / name).read_bytes() == serialize_content(name, content)
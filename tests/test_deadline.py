@@ -0,0 +1,248 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from darca_space_git.deadline import (
+    Deadline,
+    current_deadline,
+    deadline_scope,
+    validate_timeouts,
+)
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+# A git alias running through the shell, so git has a child of its own.
+HANG = ["-c", "alias.hang=!sleep 5", "hang"]
+
+
+def _run_under(deadline, tmp_path):
+    started = time.monotonic()
+    with deadline_scope(deadline):
+        with pytest.raises(SpaceGitException) as exc:
+            GitProcess().run(HANG, str(tmp_path))
+    return exc.value, time.monotonic() - started
+
+
+def test_timeout_kills_process_tree(tmp_path):
+    error, elapsed = _run_under(Deadline(0.3), tmp_path)
+
+    assert error.error_code == "OPERATION_TIMEOUT"
+    assert error.metadata["args"] == HANG
+    # The output pipe only closes once the shell's sleep is dead too.
+    assert elapsed < 3
+
+
+def test_cancel_from_another_thread(tmp_path):
+    deadline = Deadline()
+    threading.Timer(0.2, deadline.cancel).start()
+
+    error, elapsed = _run_under(deadline, tmp_path)
+
+    assert error.error_code == "OPERATION_CANCELLED"
+    assert elapsed < 3
+
+
+def test_parent_cancel_stops_child(tmp_path):
+    parent = Deadline()
+    child = Deadline(60, parent)
+    threading.Timer(0.2, parent.cancel).start()
+
+    error, _ = _run_under(child, tmp_path)
+    assert error.error_code == "OPERATION_CANCELLED"
+    child.close()
+
+
+def test_stopped_deadline_refuses_new_commands(tmp_path):
+    deadline = Deadline()
+    deadline.cancel()
+    with deadline_scope(deadline):
+        with pytest.raises(SpaceGitException) as exc:
+            GitProcess().run(["--version"], str(tmp_path))
+    assert exc.value.error_code == "OPERATION_CANCELLED"
+    assert current_deadline() is None
+
+
+def test_unexpired_deadline_runs_normally(git_repo):
+    with deadline_scope(Deadline(30)):
+        out = GitProcess().run(["rev-parse", "--abbrev-ref", "HEAD"], git_repo)
+        assert out == b"main\n"
+        assert (
+            b"".join(
+                GitProcess().stream(["show", "HEAD:tracked.txt"], git_repo)
+            )
+            == b"one\n"
+        )
+
+
+def test_async_timeout(tmp_path):
+    async def run():
+        with deadline_scope(Deadline(0.3)):
+            await GitProcess().run_async(HANG, str(tmp_path))
+
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(run())
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+
+
+@pytest.fixture
+def hanging_remote(space_git, git_repo, run_git):
+    # An ssh "remote" that leaves an index.lock behind and then hangs.
+    run_git(git_repo, "remote", "add", "origin", "ssh://example.invalid/r")
+    run_git(
+        git_repo,
+        "config",
+        "core.sshCommand",
+        "sh -c 'touch .git/index.lock; sleep 5' --",
+    )
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def test_pull_timeout_cleans_index_lock(hanging_remote, git_repo):
+    started = time.monotonic()
+    with pytest.raises(SpaceGitException) as exc:
+        hanging_remote.pull_repo("test-space", timeout=0.5)
+
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+    assert exc.value.metadata["operation"] == "pull_repo"
+    assert time.monotonic() - started < 3
+    assert not (git_repo / ".git" / "index.lock").exists()
+    hanging_remote.git.pull.assert_not_called()
+
+
+def test_default_timeouts_and_scopes(hanging_remote):
+    hanging_remote.timeouts = validate_timeouts({"default": 0.3})
+    with pytest.raises(SpaceGitException) as exc:
+        hanging_remote.push_repo("test-space")
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+
+    hanging_remote.timeouts = {}
+    deadline = Deadline()
+    threading.Timer(0.3, deadline.cancel).start()
+    with deadline_scope(deadline):
+        with pytest.raises(SpaceGitException) as exc:
+            hanging_remote.pull_changes("test-space")
+    assert exc.value.error_code == "OPERATION_CANCELLED"
+
+
+def test_without_deadline_uses_git(space_git):
+    assert space_git.pull_repo("test-space") is True
+    space_git.git.pull.assert_called_once_with("/fake/path")
+
+
+def test_invalid_timeouts():
+    for bad in ({"pull_repo": 0}, {"default": -1}):
+        with pytest.raises(SpaceGitException) as exc:
+            validate_timeouts(bad)
+        assert exc.value.error_code == "INVALID_TIMEOUT"
+    with pytest.raises(SpaceGitException):
+        Deadline(0)
+
+
+@pytest.fixture
+def hanging_hooks(space_git, git_repo):
+    # Hooks that hang while git holds the index lock (pre-commit) or
+    # after a checkout (post-checkout).
+    hooks = git_repo / ".git" / "hooks"
+    for name in ("pre-commit", "post-checkout"):
+        (hooks / name).write_text("#!/bin/sh\nsleep 5\n")
+        (hooks / name).chmod(0o755)
+    (git_repo / "tracked.txt").write_text("two\n")
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("commit_file", ("tracked.txt", "msg")),
+        ("commit_all", ("msg",)),
+        ("checkout_branch", ("other", True)),
+    ],
+)
+def test_local_git_calls_honour_timeout(hanging_hooks, git_repo, method, args):
+    started = time.monotonic()
+    with pytest.raises(SpaceGitException) as exc:
+        getattr(hanging_hooks, method)("test-space", *args, timeout=0.5)
+
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+    assert exc.value.metadata["operation"] == method
+    assert time.monotonic() - started < 3
+    assert not (git_repo / ".git" / "index.lock").exists()
+    assert hanging_hooks.git.method_calls == []
+
+
+def test_status_under_deadline_uses_git_process(hanging_hooks):
+    status = hanging_hooks.get_status("test-space", timeout=30)
+    assert status == " M tracked.txt\n"
+    hanging_hooks.git.status.assert_not_called()
+
+
+@pytest.fixture
+def async_hanging_hooks(async_space_git, hanging_hooks, git_repo):
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.git_process = GitProcess()
+    return async_space_git
+
+
+def test_async_operations_honour_timeout(async_hanging_hooks, git_repo):
+    started = time.monotonic()
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(async_hanging_hooks.commit_all("test-space", "m", 0.5))
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+    assert exc.value.metadata["operation"] == "commit_all"
+    assert time.monotonic() - started < 3
+    assert not (git_repo / ".git" / "index.lock").exists()
+
+    async_hanging_hooks.timeouts = validate_timeouts({"default": 0.3})
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(
+            async_hanging_hooks.checkout_branch("test-space", "other", True)
+        )
+    assert exc.value.error_code == "OPERATION_TIMEOUT"
+    assert current_deadline() is None
+
+
+def test_push_under_deadline_matches_darca_git(
+    space_git, git_repo, bare_remote, run_git
+):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    run_git(git_repo, "remote", "add", "origin", "/nonexistent")
+    run_git(git_repo, "checkout", "-q", "-b", "feature")
+
+    assert space_git.push_repo(
+        "test-space", remote_url=str(bare_remote), timeout=30
+    )
+
+    assert run_git(git_repo, "remote", "get-url", "origin") == (
+        str(bare_remote).encode() + b"\n"
+    )
+    upstream = run_git(git_repo, "rev-parse", "--abbrev-ref", "@{upstream}")
+    assert upstream == b"origin/feature\n"
+    assert space_git.push_repo("test-space", timeout=30)
+    space_git.git.push.assert_not_called()
+
+
+def test_async_cancel_kills_threaded_plumbing(
+    async_space_git, hanging_remote, git_repo, run_git
+):
+    run_git(git_repo, "config", "branch.main.remote", "origin")
+    run_git(git_repo, "config", "branch.main.merge", "refs/heads/main")
+    async_space_git.space_manager._get_space_path.return_value = str(git_repo)
+    async_space_git.git_process = GitProcess()
+
+    async def scenario():
+        task = asyncio.ensure_future(async_space_git.pull_changes("s"))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        started = time.monotonic()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.monotonic() - started
+
+    assert asyncio.run(scenario()) < 2
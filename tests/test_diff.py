@@ -0,0 +1,165 @@
+import pytest
+
+from darca_space_git.deadline import current_deadline
+from darca_space_git.diff import (
+    FileDiff,
+    Hunk,
+    diff_args,
+    parse_patch_stream,
+    split_records,
+)
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.metrics import (
+    NULL_RECORD,
+    OperationMetrics,
+    current_record,
+)
+
+
+@pytest.fixture
+def changed_repo(space_git, git_repo, run_git):
+    (git_repo / "keep.txt").write_text("1\n2\n3\n")
+    (git_repo / "gone.txt").write_text("bye\n")
+    (git_repo / "old name.txt").write_text("same content\n" * 5)
+    run_git(git_repo, "add", "keep.txt", "gone.txt", "old name.txt")
+    run_git(git_repo, "commit", "-q", "-m", "base")
+
+    (git_repo / "keep.txt").write_text("1\ntwo\n3\nfour\n")
+    (git_repo / "café.bin").write_bytes(b"\x00\x01")
+    run_git(git_repo, "rm", "-q", "gone.txt")
+    run_git(git_repo, "mv", "old name.txt", "new name.txt")
+    run_git(git_repo, "add", "keep.txt", "café.bin")
+    run_git(git_repo, "commit", "-q", "-m", "change")
+
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def _by_path(diffs):
+    return {d.path: d for d in diffs}
+
+
+def test_diff_patch(changed_repo):
+    diffs = _by_path(changed_repo.diff("test-space", "HEAD~1", "HEAD"))
+
+    assert diffs["keep.txt"] == FileDiff(
+        "keep.txt",
+        "M",
+        added=2,
+        deleted=1,
+        hunks=(Hunk(1, 3, 1, 4, "", (" 1", "-2", "+two", " 3", "+four")),),
+    )
+    assert diffs["gone.txt"].status == "D"
+    assert diffs["gone.txt"].deleted == 1
+    assert diffs["new name.txt"].status == "R"
+    assert diffs["new name.txt"].old_path == "old name.txt"
+    assert diffs["café.bin"].status == "A"
+    assert diffs["café.bin"].binary
+    assert diffs["café.bin"].added is None
+
+
+def test_diff_name_status(changed_repo):
+    diffs = list(
+        changed_repo.diff("test-space", "HEAD~1", "HEAD", mode="name-status")
+    )
+    assert sorted((d.status, d.path, d.old_path) for d in diffs) == [
+        ("A", "café.bin", None),
+        ("D", "gone.txt", None),
+        ("M", "keep.txt", None),
+        ("R", "new name.txt", "old name.txt"),
+    ]
+
+
+def test_diff_stat(changed_repo):
+    diffs = _by_path(
+        changed_repo.diff("test-space", "HEAD~1", "HEAD", mode="stat")
+    )
+    assert (diffs["keep.txt"].added, diffs["keep.txt"].deleted) == (2, 1)
+    assert diffs["café.bin"].binary
+    assert diffs["new name.txt"].old_path == "old name.txt"
+    assert diffs["new name.txt"].hunks == ()
+
+
+def test_diff_working_tree_index_and_paths(changed_repo, git_repo, run_git):
+    (git_repo / "keep.txt").write_text("changed\n")
+    (git_repo / "tracked.txt").write_text("staged\n")
+    run_git(git_repo, "add", "tracked.txt")
+
+    worktree = changed_repo.diff("test-space", mode="name-status")
+    assert sorted(d.path for d in worktree) == ["keep.txt", "tracked.txt"]
+    cached = changed_repo.diff("test-space", cached=True, mode="name-status")
+    assert [d.path for d in cached] == ["tracked.txt"]
+    limited = changed_repo.diff("test-space", paths=["keep.txt"])
+    assert [d.path for d in limited] == ["keep.txt"]
+
+
+def test_diff_can_stop_early(changed_repo):
+    diffs = changed_repo.diff("test-space", "HEAD~1", "HEAD")
+    assert next(diffs).path
+    diffs.close()
+    assert changed_repo.locks.stats()["waiting"] == 0
+    assert list(changed_repo.diff("test-space", "HEAD~1", "HEAD"))
+
+
+def test_diff_iteration_leaves_caller_context_alone(changed_repo):
+    changed_repo.timeouts = {"diff": 30}
+    changed_repo.metrics = OperationMetrics(enabled=True)
+    diffs = changed_repo.diff("test-space", "HEAD~1", "HEAD")
+    assert next(diffs).path
+    assert current_deadline() is None
+    assert current_record() is NULL_RECORD
+    # No lock is held between items, so a writer (or another read queued
+    # behind one) on the same thread does not deadlock.
+    with changed_repo.locks.hold("test-space", blocking=False):
+        pass
+    assert changed_repo.read_file_at_ref("test-space", "HEAD", "keep.txt")
+    assert len(list(diffs)) == 3
+    snapshot = changed_repo.metrics.snapshot()
+    assert snapshot["operations"]["diff"]["count"] == 1
+
+
+def test_diff_refs_are_never_options(changed_repo, tmp_path):
+    target = tmp_path / "written.txt"
+    for refs in ((f"--output={target}",), ("HEAD", f"--output={target}")):
+        with pytest.raises(SpaceGitException) as exc:
+            list(changed_repo.diff("test-space", *refs))
+        assert exc.value.error_code == "DIFF_FAILED"
+    assert not target.exists()
+    assert diff_args("-x", "-y")[-4:] == ["--end-of-options", "-x", "-y", "--"]
+
+
+def test_diff_failure(changed_repo):
+    with pytest.raises(SpaceGitException) as exc:
+        list(changed_repo.diff("test-space", "no-such-ref"))
+    assert exc.value.error_code == "DIFF_FAILED"
+
+
+def test_diff_invalid_options(space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.diff("test-space", mode="full")
+    assert exc.value.error_code == "INVALID_DIFF_OPTIONS"
+    with pytest.raises(SpaceGitException):
+        diff_args("HEAD", "main", cached=True)
+
+
+def test_split_records():
+    chunks = [b"a\0b", b"c\0", b"\0d"]
+    assert list(split_records(chunks, b"\0")) == [b"a", b"bc", b"", b"d"]
+
+
+def test_parse_patch_quoted_paths():
+    lines = [
+        b'diff --git "a/sp\\303\\251cial\\tname" "b/sp\\303\\251cial\\tname"',
+        b"new file mode 100644",
+        b"@@ -0,0 +1 @@",
+        b"+x",
+        b"\\ No newline at end of file",
+    ]
+    (diff,) = parse_patch_stream(lines)
+    assert diff.path == "spécial\tname"
+    assert diff.status == "A"
+    assert diff.hunks == (
+        Hunk(0, 0, 1, 1, "", ("+x", "\\ No newline at end of file")),
+    )
@@ -0,0 +1,132 @@
+import pytest
+
+from darca_space_git.dirty import DirtyPathTracker
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+@pytest.fixture
+def tracked_space_git(space_git, git_repo, run_git):
+    def set_file(space_name, relative_path, content):
+        target = git_repo / relative_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.file_manager.set_file.side_effect = set_file
+    space_git.git.commit.side_effect = lambda message, cwd: run_git(
+        cwd, "commit", "-q", "-m", message
+    )
+    space_git.dirty_tracking = True
+    return space_git
+
+
+def _committed(run_git, repo):
+    return run_git(repo, "show", "--name-status", "--format=", "HEAD").decode()
+
+
+def test_tracker():
+    tracker = DirtyPathTracker()
+    tracker.mark("s", ["a", "b"])
+    tracker.mark("s", ["a"])
+    assert tracker.pending("s") == {"a", "b"}
+    assert tracker.take("s") == {"a", "b"}
+    assert tracker.take("s") == set()
+    tracker.mark("s", ["a"])
+    tracker.mark("t", ["b"])
+    tracker.discard("s")
+    assert tracker.pending("s") == frozenset()
+    tracker.discard()
+    assert tracker.pending("t") == frozenset()
+    tracker.mark("s", ["a", "b"])
+    tracker.remove("s", ["a", "c"])
+    assert tracker.pending("s") == {"b"}
+    tracker.remove("s", ["b"])
+    tracker.remove("t", ["b"])
+    assert tracker.take("s") == set()
+
+
+def test_commit_all_stages_only_dirty_paths(
+    tracked_space_git, git_repo, run_git
+):
+    (git_repo / "untracked-by-manager.txt").write_text("x")
+    tracked_space_git.write_file("test-space", "dir/new.txt", "new")
+    (git_repo / "tracked.txt").unlink()
+    tracked_space_git.mark_dirty("test-space", ["tracked.txt"])
+
+    assert tracked_space_git.commit_all("test-space", "dirty") is True
+
+    assert set(_committed(run_git, git_repo).split("\n")) - {""} == {
+        "A\tdir/new.txt",
+        "D\ttracked.txt",
+    }
+    tracked_space_git.git.add.assert_not_called()
+    status = run_git(git_repo, "status", "--porcelain").decode()
+    assert "?? untracked-by-manager.txt" in status
+    assert tracked_space_git.dirty_paths.pending("test-space") == frozenset()
+
+
+def test_commit_all_falls_back_to_full_scan(tracked_space_git):
+    tracked_space_git.git.commit.side_effect = None
+    assert tracked_space_git.commit_all("test-space", "full") is True
+    tracked_space_git.git.add.assert_called_once()
+
+
+def test_commit_all_failure_keeps_dirty_paths(tracked_space_git):
+    tracked_space_git.write_file("test-space", "a.txt", "a")
+    tracked_space_git.git.commit.side_effect = SpaceGitException(
+        message="boom", error_code="GIT_COMMAND_FAILED"
+    )
+    with pytest.raises(SpaceGitException) as exc:
+        tracked_space_git.commit_all("test-space", "fails")
+    assert exc.value.error_code == "COMMIT_ALL_FAILED"
+    assert tracked_space_git.dirty_paths.pending("test-space") == {"a.txt"}
+
+
+def test_commit_file_clears_committed_dirty_path(tracked_space_git, run_git):
+    tracked_space_git.git.add.side_effect = lambda path, cwd: run_git(
+        cwd, "add", "--", path
+    )
+    tracked_space_git.write_file("test-space", "a.txt", "a")
+    tracked_space_git.write_file("test-space", "b.txt", "b")
+    assert tracked_space_git.commit_file("test-space", "./a.txt", "a")
+    assert tracked_space_git.dirty_paths.pending("test-space") == {"b.txt"}
+
+
+def test_checkout_branch_clears_dirty_paths(tracked_space_git):
+    tracked_space_git.write_file("test-space", "a.txt", "a")
+    assert tracked_space_git.checkout_branch("test-space", "dev", create=True)
+    assert tracked_space_git.dirty_paths.pending("test-space") == frozenset()
+
+
+def test_dirty_tracking_disabled(space_git):
+    space_git.write_file("test-space", "a.txt", "a")
+    space_git.mark_dirty("test-space", ["b.txt"])
+    assert space_git.dirty_paths.pending("test-space") == frozenset()
+    space_git.file_manager.set_file.assert_called_once_with(
+        "test-space", "a.txt", "a"
+    )
+
+
+def test_write_file_rejects_escaping_path(space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.write_file("test-space", "../outside.txt", "x")
+    assert exc.value.error_code == "INVALID_PATH"
+
+
+def test_enable_index_acceleration(tracked_space_git, git_repo, run_git):
+    assert tracked_space_git.enable_index_acceleration(
+        "test-space", many_files=True
+    )
+    assert run_git(git_repo, "config", "core.untrackedCache") == b"true\n"
+    assert run_git(git_repo, "config", "feature.manyFiles") == b"true\n"
+
+
+def test_enable_index_acceleration_failure(space_git):
+    space_git.git_process.run.side_effect = SpaceGitException(
+        message="boom", error_code="GIT_COMMAND_FAILED"
+    )
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.enable_index_acceleration("test-space")
+    assert exc.value.error_code == "INDEX_CONFIG_FAILED"
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+
+
+def test_run_async_returns_stdout(tmp_path):
+    out = asyncio.run(GitProcess().run_async(["--version"], cwd=tmp_path))
+    assert out.startswith(b"git version")
+
+
+def test_run_async_raises_on_failure(tmp_path):
+    with pytest.raises(SpaceGitException) as exc:
+        asyncio.run(GitProcess().run_async(["rev-parse", "HEAD"], tmp_path))
+    assert exc.value.error_code == "GIT_COMMAND_FAILED"
+    assert exc.value.metadata["returncode"] != 0
+    assert exc.value.metadata["cwd"] == str(tmp_path)
+
+
+def test_run_async_cancellation_kills_process(tmp_path):
+    runner = GitProcess(git_binary="sleep")
+
+    async def scenario():
+        task = asyncio.create_task(runner.run_async(["30"], cwd=tmp_path))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+
+def test_run_returns_stdout(tmp_path):
+    assert GitProcess().run(["--version"], str(tmp_path)).startswith(b"git")
+
+
+def test_run_raises_on_failure(tmp_path):
+    with pytest.raises(SpaceGitException) as exc:
+        GitProcess().run(["rev-parse", "HEAD"], str(tmp_path))
+    assert exc.value.error_code == "GIT_COMMAND_FAILED"
+
+
+def test_stream_yields_output(git_repo):
+    chunks = list(
+        GitProcess().stream(["log", "--format=%s"], str(git_repo), 4)
+    )
+    assert len(chunks) > 1
+    assert b"".join(chunks) == b"init\n"
+
+
+def test_stream_raises_after_output(tmp_path):
+    with pytest.raises(SpaceGitException) as exc:
+        list(GitProcess().stream(["rev-parse", "HEAD"], str(tmp_path)))
+    assert exc.value.error_code == "GIT_COMMAND_FAILED"
+
+
+def test_stream_close_kills_process(tmp_path):
+    stream = GitProcess(git_binary="yes").stream([], str(tmp_path))
+    assert next(stream)
+    stream.close()
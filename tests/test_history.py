@@ -0,0 +1,191 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from darca_space_git.deadline import current_deadline
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.history import (
+    decode_cursor,
+    encode_cursor,
+    log_args,
+    parse_log_stream,
+)
+
+BASE_TIME = 1_700_000_000
+
+
+@pytest.fixture
+def history_repo(space_git, git_repo, run_git, monkeypatch):
+    for i in range(1, 6):
+        name = "docs/a.txt" if i % 2 else "b.txt"
+        (git_repo / name).parent.mkdir(exist_ok=True)
+        (git_repo / name).write_text(str(i))
+        run_git(git_repo, "add", name)
+        author = "Alice <alice@x>" if i < 4 else "Bob <bob@x>"
+        monkeypatch.setenv("GIT_COMMITTER_DATE", f"@{BASE_TIME + i} +0000")
+        run_git(
+            git_repo,
+            "commit",
+            "-q",
+            f"--author={author}",
+            f"--date=@{BASE_TIME + i} +0000",
+            "-m",
+            f"commit {i}\n\nbody {i}",
+        )
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def _subjects(commits):
+    return [c.subject for c in commits]
+
+
+def test_history_streams_commits(history_repo, git_repo, run_git):
+    commits = list(history_repo.history("test-space"))
+    assert _subjects(commits) == [f"commit {i}" for i in range(5, 0, -1)] + [
+        "init"
+    ]
+    [*_, root] = commits
+    newest = commits[0]
+    assert newest.sha == run_git(git_repo, "rev-parse", "HEAD").decode()[:-1]
+    assert newest.parents == (commits[1].sha,)
+    assert newest.message == "commit 5\n\nbody 5"
+    assert (newest.author_name, newest.author_email) == ("Bob", "bob@x")
+    assert newest.authored_at == newest.committed_at == BASE_TIME + 5
+    assert root.subject == "init" and root.parents == ()
+
+
+def test_history_filters(history_repo):
+    by_path = history_repo.history("test-space", paths=["docs"])
+    assert _subjects(by_path) == ["commit 5", "commit 3", "commit 1"]
+    by_author = history_repo.history("test-space", author="bob@")
+    assert _subjects(by_author) == ["commit 5", "commit 4"]
+    window = history_repo.history(
+        "test-space",
+        since=BASE_TIME + 2,
+        until=datetime.fromtimestamp(BASE_TIME + 3, timezone.utc),
+    )
+    assert _subjects(window) == ["commit 3", "commit 2"]
+
+
+def test_history_can_stop_early(history_repo):
+    commits = history_repo.history("test-space")
+    assert next(commits).subject == "commit 5"
+    commits.close()
+    assert history_repo.locks.stats()["waiting"] == 0
+
+
+def test_history_does_not_hold_space_between_commits(history_repo):
+    history_repo.timeouts = {"history": 30}
+    commits = history_repo.history("test-space")
+    assert next(commits).subject == "commit 5"
+    assert current_deadline() is None
+    with history_repo.locks.hold("test-space", blocking=False):
+        pass
+    assert len(list(commits)) == 5
+
+
+def test_history_page_cursor(history_repo, git_repo, run_git):
+    first = history_repo.history_page("test-space", limit=2)
+    assert _subjects(first.commits) == ["commit 5", "commit 4"]
+
+    # The cursor pins the tip: new commits do not shift later pages.
+    (git_repo / "late.txt").write_text("late")
+    run_git(git_repo, "add", "late.txt")
+    run_git(git_repo, "commit", "-q", "-m", "late")
+
+    second = history_repo.history_page(
+        "test-space", limit=2, cursor=first.cursor
+    )
+    assert _subjects(second.commits) == ["commit 3", "commit 2"]
+    third = history_repo.history_page(
+        "test-space", limit=2, cursor=second.cursor
+    )
+    assert _subjects(third.commits) == ["commit 1", "init"]
+    assert third.cursor is None
+
+
+def test_history_page_with_filter(history_repo):
+    page = history_repo.history_page("test-space", paths=["b.txt"], limit=1)
+    rest = history_repo.history_page(
+        "test-space", paths=["b.txt"], limit=5, cursor=page.cursor
+    )
+    assert _subjects(page.commits + rest.commits) == ["commit 4", "commit 2"]
+    assert rest.cursor is None
+
+
+def test_history_unborn_and_unknown_ref(space_git, tmp_path, run_git):
+    repo = tmp_path / "empty"
+    repo.mkdir()
+    run_git(repo, "init", "-q")
+    space_git.space_manager._get_space_path.return_value = str(repo)
+    space_git.git_process = GitProcess()
+
+    assert list(space_git.history("test-space")) == []
+    assert space_git.history_page("test-space").commits == ()
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.history_page("test-space", ref="nope")
+    assert exc.value.error_code == "HISTORY_FAILED"
+
+
+def test_history_page_invalid_options(space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.history_page("test-space", limit=0)
+    assert exc.value.error_code == "INVALID_HISTORY_OPTIONS"
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.history_page("test-space", cursor="HEAD:2")
+    assert exc.value.error_code == "INVALID_HISTORY_OPTIONS"
+
+
+def test_cursor_round_trip():
+    tip = "a" * 40
+    assert decode_cursor(encode_cursor(tip, 7)) == (tip, 7)
+
+
+def test_parse_log_stream_keeps_multiline_messages():
+    fields = [b"1" * 40, b"", b"A", b"a@x", b"1", b"C", b"c@x", b"2"]
+    (commit,) = parse_log_stream(fields + [b"subject\n\nline\n"])
+    assert commit.message == "subject\n\nline"
+    assert commit.parents == ()
+
+
+def test_log_args():
+    args = log_args("main", ["docs"], "bob", "2 weeks ago", 5, 10, 20)
+    assert args[-3:] == ["main", "--", "docs"]
+    assert "--since=2 weeks ago" in args and "--until=@5" in args
+    assert "--max-count=10" in args and "--skip=20" in args
+
+
+def test_write_commit_graph(history_repo, git_repo):
+    assert history_repo.write_commit_graph("test-space") is True
+    graphs = git_repo / ".git" / "objects" / "info" / "commit-graphs"
+    assert any(name.endswith(".graph") for name in os.listdir(graphs))
+
+
+def test_write_commit_graph_failure(space_git):
+    space_git.git_process.run.side_effect = SpaceGitException(
+        message="boom", error_code="GIT_COMMAND_FAILED"
+    )
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.write_commit_graph("test-space")
+    assert exc.value.error_code == "COMMIT_GRAPH_FAILED"
+
+
+def test_pull_maintains_commit_graph(space_git):
+    space_git.commit_graph = True
+    assert space_git.pull_repo("test-space") is True
+    space_git.git_process.run.assert_called_once_with(
+        ["commit-graph", "write", "--reachable", "--changed-paths", "--split"],
+        "/fake/path",
+    )
+
+
+def test_commit_graph_failure_does_not_fail_pull(space_git):
+    space_git.commit_graph = True
+    space_git.git_process.run.side_effect = SpaceGitException(
+        message="boom", error_code="GIT_COMMAND_FAILED"
+    )
+    assert space_git.pull_repo("test-space") is True
@@ -0,0 +1,165 @@
+import asyncio
+import fcntl
+import threading
+import time
+
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.locking import (
+    AsyncFairRWLock,
+    FairRWLock,
+    FairSlots,
+    SpaceLockManager,
+)
+
+
+def test_readers_share_writers_exclude():
+    lock = FairRWLock()
+    lock.acquire(exclusive=False)
+    lock.acquire(exclusive=False)
+    acquired = threading.Event()
+
+    def writer():
+        lock.acquire(exclusive=True)
+        acquired.set()
+        lock.release(exclusive=True)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert not acquired.wait(0.05)
+    lock.release(exclusive=False)
+    lock.release(exclusive=False)
+    assert acquired.wait(5)
+    thread.join()
+
+
+def test_rw_lock_is_fifo():
+    lock = FairRWLock()
+    order = []
+    lock.acquire(exclusive=False)
+
+    def worker(name, exclusive):
+        lock.acquire(exclusive)
+        order.append(name)
+        lock.release(exclusive)
+
+    writer = threading.Thread(target=worker, args=("writer", True))
+    writer.start()
+    while lock.waiting < 1:
+        time.sleep(0.001)
+    reader = threading.Thread(target=worker, args=("reader", False))
+    reader.start()
+    while lock.waiting < 2:
+        time.sleep(0.001)
+
+    lock.release(exclusive=False)
+    writer.join()
+    reader.join()
+    assert order == ["writer", "reader"]
+
+
+def test_async_rw_lock_is_fifo_and_cancellable():
+    lock = AsyncFairRWLock()
+    order = []
+
+    async def worker(name, exclusive):
+        await lock.acquire(exclusive)
+        order.append(name)
+        lock.release(exclusive)
+
+    async def scenario():
+        await lock.acquire(exclusive=False)
+        writer = asyncio.ensure_future(worker("writer", True))
+        cancelled = asyncio.ensure_future(worker("cancelled", True))
+        reader = asyncio.ensure_future(worker("reader", False))
+        await asyncio.sleep(0)
+        assert lock.waiting == 3
+        cancelled.cancel()
+        lock.release(exclusive=False)
+        await asyncio.gather(writer, reader, return_exceptions=True)
+        assert cancelled.cancelled()
+        assert lock.waiting == 0
+        await asyncio.wait_for(lock.acquire(exclusive=True), 1)
+
+    asyncio.run(scenario())
+    assert order == ["writer", "reader"]
+
+
+def test_slots_round_robin_between_spaces():
+    slots = FairSlots(1)
+    slots.acquire("hot")
+    order = []
+
+    def worker(space):
+        slots.acquire(space)
+        order.append(space)
+        slots.release()
+
+    threads = []
+    for space in ["hot", "hot", "cold"]:
+        threads.append(threading.Thread(target=worker, args=(space,)))
+        threads[-1].start()
+        while slots.waiting < len(threads):
+            time.sleep(0.001)
+
+    slots.release()
+    for thread in threads:
+        thread.join()
+    assert order == ["hot", "cold", "hot"]
+
+
+def test_hold_takes_file_lock(tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path))
+    with locks.hold("space", exclusive=True):
+        with open(locks._lock_path("space"), "a+b") as other:
+            with pytest.raises(BlockingIOError):
+                fcntl.flock(other, fcntl.LOCK_SH | fcntl.LOCK_NB)
+    with locks.hold("space", exclusive=False):
+        with open(locks._lock_path("space"), "a+b") as other:
+            fcntl.flock(other, fcntl.LOCK_SH | fcntl.LOCK_NB)
+
+    stats = locks.stats()
+    assert stats["acquired"] == 2
+    assert stats["waiting"] == 0
+
+
+def test_hold_releases_on_error(tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path), max_concurrent=1)
+    with pytest.raises(RuntimeError):
+        with locks.hold("space"):
+            raise RuntimeError("boom")
+    with locks.hold("space"):
+        pass
+
+
+def test_manager_operations_are_locked(space_git, tmp_path):
+    space_git.locks = SpaceLockManager(lock_dir=str(tmp_path))
+    space_git.init_repo("test-space")
+    space_git.get_status("test-space")
+    assert space_git.locks.stats()["acquired"] == 2
+
+
+def test_hold_non_blocking_raises_when_busy(tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path))
+    with locks.hold("space", exclusive=False):
+        with locks.hold("space", exclusive=False, blocking=False):
+            pass
+        with pytest.raises(SpaceGitException) as exc:
+            with locks.hold("space", exclusive=True, blocking=False):
+                pass
+        assert exc.value.error_code == "SPACE_BUSY"
+    with locks.hold("space", exclusive=True, blocking=False):
+        pass
+
+
+def test_hold_non_blocking_sees_other_processes(tmp_path):
+    locks = SpaceLockManager(lock_dir=str(tmp_path))
+    other = SpaceLockManager(lock_dir=str(tmp_path))
+    with other.hold("space", exclusive=True):
+        with pytest.raises(SpaceGitException):
+            with locks.hold("space", blocking=False):
+                pass
+    assert locks.stats()["waiting"] == 0
+    with locks.hold("space", blocking=False):
+        pass
@@ -0,0 +1,199 @@
+import threading
+from datetime import datetime
+from datetime import time as day_time
+
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.maintenance import (
+    MaintenancePolicy,
+    MaintenanceReport,
+    MaintenanceScheduler,
+    ObjectCounts,
+    count_objects,
+)
+
+EAGER = MaintenancePolicy(loose_threshold=1, interval=None)
+
+
+@pytest.fixture
+def maint_repo(space_git, git_repo, run_git):
+    for i in range(3):
+        (git_repo / f"f{i}.txt").write_text(str(i))
+        run_git(git_repo, "add", f"f{i}.txt")
+        run_git(git_repo, "commit", "-q", "-m", f"c{i}")
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def test_maintain_packs_loose_objects(maint_repo, git_repo):
+    report = maint_repo.maintain("test-space", EAGER)
+
+    assert report.status == "maintained"
+    assert report.tasks == (
+        "pack-refs",
+        "repack",
+        "prune",
+        "multi-pack-index",
+        "commit-graph",
+    )
+    assert report.before.loose > 0 and report.before.packs == 0
+    assert report.after.loose == 0 and report.after.packs == 1
+    assert report.after.packed >= report.before.loose
+    assert (git_repo / ".git" / "packed-refs").exists()
+    assert (
+        git_repo / ".git" / "objects" / "pack" / "multi-pack-index"
+    ).exists()
+
+
+def test_maintain_skips_when_not_due(maint_repo):
+    maint_repo.maintain("test-space", EAGER)
+    policy = MaintenancePolicy(loose_threshold=1, interval=3600.0)
+
+    report = maint_repo.maintain("test-space", policy)
+    assert report.status == "not_due"
+    assert report.after is None
+    assert maint_repo.maintain("test-space", policy, force=True).tasks
+
+
+def test_maintain_consolidates_packs(maint_repo, git_repo, run_git):
+    for _ in range(2):
+        (git_repo / "more.txt").write_text(str(_))
+        run_git(git_repo, "add", "more.txt")
+        run_git(git_repo, "commit", "-q", "-m", "more")
+        run_git(git_repo, "repack", "-d", "-q")
+    policy = MaintenancePolicy(pack_limit=1, tasks=("repack",), interval=None)
+    assert count_objects(GitProcess(), str(git_repo)).packs == 2
+
+    report = maint_repo.maintain("test-space", policy)
+    assert report.after.packs == 1
+
+
+def test_maintain_busy_space(maint_repo):
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with maint_repo.locks.hold("test-space", exclusive=False):
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    held.wait(5)
+    try:
+        with pytest.raises(SpaceGitException) as exc:
+            maint_repo.maintain("test-space", EAGER, blocking=False)
+        assert exc.value.error_code == "SPACE_BUSY"
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_maintain_failure(space_git):
+    space_git.git_process.run.side_effect = [
+        b"count: 5\n",
+        SpaceGitException(message="boom", error_code="GIT_COMMAND_FAILED"),
+    ]
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.maintain("test-space", EAGER)
+    assert exc.value.error_code == "MAINTENANCE_FAILED"
+    assert exc.value.metadata["task"] == "pack-refs"
+
+
+def test_policy_validation_and_args():
+    with pytest.raises(SpaceGitException) as exc:
+        MaintenancePolicy(tasks=("gc",))
+    assert exc.value.error_code == "INVALID_MAINTENANCE_POLICY"
+
+    policy = MaintenancePolicy(pack_limit=2, pack_threads=2)
+    assert policy.task_args("repack", ObjectCounts(packs=3)) == [
+        "-c",
+        "pack.threads=2",
+        "repack",
+        "-d",
+        "-l",
+        "-q",
+        "-a",
+    ]
+    assert policy.is_due(ObjectCounts(), None)
+    assert not policy.is_due(ObjectCounts(), 60.0)
+
+
+class FakeManager:
+    def __init__(self, busy=(), failing=()):
+        self.space_manager = self
+        self.busy = set(busy)
+        self.failing = set(failing)
+        self.calls = []
+
+    def list_spaces(self):
+        return [{"name": "a"}, {"name": "b"}, "c"]
+
+    def maintain(self, space_name, policy, blocking=True):
+        self.calls.append((space_name, blocking))
+        if space_name in self.busy:
+            raise SpaceGitException(message="busy", error_code="SPACE_BUSY")
+        if space_name in self.failing:
+            raise SpaceGitException(message="x", error_code="MAINT")
+        return MaintenanceReport(space_name, "maintained", elapsed=1.0)
+
+
+def test_scheduler_skips_busy_and_reports_failures():
+    manager = FakeManager(busy={"b"}, failing={"c"})
+    scheduler = MaintenanceScheduler(manager)
+
+    reports = scheduler.run_once()
+
+    assert [(r.space_name, r.status) for r in reports] == [
+        ("a", "maintained"),
+        ("b", "busy"),
+        ("c", "failed"),
+    ]
+    assert all(blocking is False for _, blocking in manager.calls)
+    assert scheduler.summary() == {"maintained": 1, "busy": 1, "failed": 1}
+
+
+def test_scheduler_budget_defers_and_resumes():
+    ticks = iter(range(100))
+    manager = FakeManager()
+    scheduler = MaintenanceScheduler(
+        manager, time_budget=2, clock=lambda: next(ticks)
+    )
+
+    first = scheduler.run_once()
+    assert [r.status for r in first] == ["maintained", "deferred", "deferred"]
+
+    second = scheduler.run_once()
+    assert [r.space_name for r in second] == ["b", "c", "a"]
+    assert second[0].status == "maintained"
+
+
+def test_scheduler_window():
+    scheduler = MaintenanceScheduler(
+        FakeManager(),
+        spaces=["a"],
+        window=(day_time(22), day_time(6)),
+        now=lambda: datetime(2026, 1, 1, 12),
+    )
+    assert scheduler.run_once()[0].status == "deferred"
+    scheduler.now = lambda: datetime(2026, 1, 1, 23)
+    assert scheduler.run_once()[0].status == "maintained"
+
+
+def test_scheduler_background_thread():
+    manager = FakeManager()
+    ran = threading.Event()
+    maintain = manager.maintain
+    manager.maintain = lambda *args, **kw: (ran.set(), maintain(*args, **kw))[
+        1
+    ]
+    scheduler = MaintenanceScheduler(manager, spaces=["a"], duty_cycle=0.5)
+    scheduler.start(period=60)
+    assert ran.wait(5)
+    scheduler.stop(timeout=5)
+    assert manager.calls == [("a", False)]
+    with pytest.raises(SpaceGitException):
+        MaintenanceScheduler(manager, duty_cycle=0)
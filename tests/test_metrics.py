@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+import pytest
+from darca_git.git import GitException
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.metrics import (
+    NULL_RECORD,
+    Histogram,
+    OperationMetrics,
+    current_record,
+    note_spawn,
+)
+
+
+def test_histogram_cumulative_buckets():
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.5, 0.7, 5):
+        histogram.observe(value)
+    assert histogram.to_dict() == {
+        "buckets": {"0.1": 1, "1.0": 3, "+Inf": 4},
+        "sum": 6.25,
+        "count": 4,
+    }
+
+
+def test_disabled_metrics_collect_nothing():
+    metrics = OperationMetrics()
+    with metrics.track("op", "space") as record:
+        assert record is NULL_RECORD
+        note_spawn(10)
+    assert metrics.snapshot()["operations"] == {}
+
+
+def test_track_records_phases_spawns_and_errors():
+    metrics = OperationMetrics(enabled=True)
+    with metrics.track("pull_repo", "space") as record:
+        assert current_record() is record
+        with record.phase("git"):
+            note_spawn(42)
+    with pytest.raises(SpaceGitException):
+        with metrics.track("pull_repo", "space"):
+            raise SpaceGitException("fail", error_code="PULL_FAILED")
+    assert current_record() is NULL_RECORD
+
+    snapshot = metrics.snapshot()
+    assert snapshot["operations"]["pull_repo"]["count"] == 2
+    assert snapshot["spaces"]["space"]["count"] == 2
+    assert "pull_repo.git" in snapshot["phases"]
+    assert snapshot["spawns"] == {"pull_repo": 1}
+    assert snapshot["stdout_bytes"] == {"pull_repo": 42}
+    assert snapshot["errors"] == {"pull_repo.PULL_FAILED": 1}
+
+    metrics.reset()
+    assert metrics.snapshot()["operations"] == {}
+
+
+def test_slow_operations_are_logged():
+    metrics = OperationMetrics(enabled=True, slow_threshold=0)
+    with patch("darca_space_git.metrics.logger") as logger:
+        with metrics.track("commit_all", "space") as record:
+            with record.phase("git"):
+                pass
+    message = logger.warning.call_args.args[0]
+    assert "commit_all" in message and "git=" in message
+
+
+def test_prometheus_export():
+    metrics = OperationMetrics(enabled=True, buckets=[1.0])
+    with pytest.raises(SpaceGitException):
+        with metrics.track("init_repo", 'we"ird'):
+            raise SpaceGitException("fail", error_code="INIT_FAILED")
+    text = metrics.to_prometheus()
+    assert "# TYPE darca_space_git_operation_seconds histogram" in text
+    assert (
+        'darca_space_git_operation_seconds_bucket{operation="init_repo",'
+        'le="+Inf"} 1'
+    ) in text
+    assert 'space="we\\"ird"' in text
+    assert (
+        'darca_space_git_errors_total{operation="init_repo",'
+        'error_code="INIT_FAILED"} 1'
+    ) in text
+
+
+def test_manager_metrics(space_git, git_repo):
+    space_git.metrics = OperationMetrics(enabled=True)
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.git.pull.side_effect = GitException("fail")
+
+    space_git.get_status_entries("test-space")
+    space_git.commit_all("test-space", "msg")
+    with pytest.raises(SpaceGitException):
+        space_git.pull_repo("test-space")
+
+    snapshot = space_git.metrics.snapshot()
+    assert snapshot["spawns"] == {
+        "get_status_entries": 1,
+        "commit_all": 2,
+        "pull_repo": 1,
+    }
+    assert {"commit_all.lock", "commit_all.resolve", "commit_all.git"} <= set(
+        snapshot["phases"]
+    )
+    assert snapshot["errors"] == {"pull_repo.PULL_FAILED": 1}
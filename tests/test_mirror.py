@@ -0,0 +1,134 @@
+import subprocess
+import time
+
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.mirror import MirrorCache
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock(time.time())
+
+
+@pytest.fixture
+def mirrors(tmp_path, clock):
+    return MirrorCache(
+        root=str(tmp_path / "mirrors"), refresh_interval=60.0, clock=clock
+    )
+
+
+@pytest.fixture
+def mirrored_space_git(space_git, tmp_path, mirrors):
+    target = tmp_path / "space"
+    target.mkdir()
+    space_git.space_manager._get_space_path.return_value = str(target)
+    space_git.git_process = GitProcess()
+    space_git.mirrors = mirrors
+    return space_git, target
+
+
+def _new_commit(run_git, repo, remote, name):
+    (repo / name).write_text(name)
+    run_git(repo, "add", name)
+    run_git(repo, "commit", "-q", "-m", name)
+    run_git(repo, "push", "-q", "-f", str(remote), "main")
+    return run_git(repo, "rev-parse", "HEAD").decode().strip()
+
+
+def _has_object(path, oid):
+    return (
+        subprocess.run(
+            ["git", "cat-file", "-e", oid], cwd=path, capture_output=True
+        ).returncode
+        == 0
+    )
+
+
+def test_ensure_creates_and_refreshes(
+    mirrors, clock, bare_remote, git_repo, run_git
+):
+    path = mirrors.ensure(bare_remote.as_uri())
+    assert path == mirrors.mirror_path(bare_remote.as_uri())
+    assert run_git(path, "config", "gc.auto") == b"0\n"
+
+    commit = _new_commit(run_git, git_repo, bare_remote, "later.txt")
+    mirrors.ensure(bare_remote.as_uri())
+    assert not _has_object(path, commit)
+
+    clock.now += 61
+    mirrors.ensure(bare_remote.as_uri())
+    assert _has_object(path, commit)
+
+
+def test_ensure_failure(mirrors, tmp_path):
+    with pytest.raises(SpaceGitException) as exc:
+        mirrors.ensure((tmp_path / "missing.git").as_uri())
+    assert exc.value.error_code == "MIRROR_FAILED"
+    leftovers = [p.suffix for p in (tmp_path / "mirrors").iterdir()]
+    assert leftovers == [".lock"]
+
+
+def test_repack_keeps_unreachable_objects(
+    mirrors, clock, bare_remote, git_repo, run_git
+):
+    url = bare_remote.as_uri()
+    path = mirrors.ensure(url)
+    dropped = run_git(git_repo, "rev-parse", "HEAD").decode().strip()
+    run_git(git_repo, "reset", "-q", "--hard", "HEAD~1")
+    _new_commit(run_git, git_repo, bare_remote, "rewritten.txt")
+
+    clock.now += 61
+    mirrors.ensure(url)
+    mirrors.repack(url)
+    assert _has_object(path, dropped)
+
+
+def test_clone_and_pull_through_mirror(
+    mirrored_space_git, mirrors, clock, bare_remote, git_repo, run_git
+):
+    manager, target = mirrored_space_git
+    url = bare_remote.as_uri()
+    assert manager.clone_repo("test-space", url) is True
+
+    mirror = mirrors.mirror_path(url)
+    alternates = target / ".git" / "objects" / "info" / "alternates"
+    assert alternates.read_text().strip() == f"{mirror}/objects"
+    assert mirrors.uses_mirror(str(target))
+    assert run_git(target, "count-objects") == b"0 objects, 0 kilobytes\n"
+
+    commit = _new_commit(run_git, git_repo, bare_remote, "next.txt")
+    clock.now += 61
+    manager.git.pull.side_effect = lambda path: run_git(path, "pull", "-q")
+    assert manager.pull_repo("test-space") is True
+    assert (target / "next.txt").exists()
+    assert _has_object(mirror, commit)
+
+    assert manager.dissociate_mirror("test-space") is True
+    assert not alternates.exists()
+    run_git(target, "fsck", "--no-dangling")
+    assert manager.dissociate_mirror("test-space") is False
+
+
+def test_clone_falls_back_without_mirror(
+    mirrored_space_git, bare_remote, monkeypatch
+):
+    manager, target = mirrored_space_git
+
+    def fail(url, refresh=True):
+        raise SpaceGitException(message="down", error_code="MIRROR_FAILED")
+
+    monkeypatch.setattr(manager.mirrors, "ensure", fail)
+    assert manager.clone_repo("test-space", bare_remote.as_uri()) is True
+    assert (target / "tracked.txt").exists()
+    assert not manager.mirrors.uses_mirror(str(target))
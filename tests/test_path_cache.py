@@ -0,0 +1,72 @@
+import os
+
+from darca_space_git.path_cache import SpacePathCache
+
+
+def test_cache_hit_after_miss(tmp_path):
+    cache = SpacePathCache()
+    calls = []
+
+    def resolver(name):
+        calls.append(name)
+        return str(tmp_path)
+
+    assert cache.get("space", resolver) == str(tmp_path)
+    assert cache.get("space", resolver) == str(tmp_path)
+    assert calls == ["space"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "stale": 0, "size": 1}
+
+
+def test_cache_detects_deleted_space(tmp_path):
+    space_dir = tmp_path / "space"
+    space_dir.mkdir()
+    cache = SpacePathCache()
+    cache.get("space", lambda _: str(space_dir))
+
+    os.rmdir(space_dir)
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    assert cache.get("space", lambda _: str(moved)) == str(moved)
+    assert cache.stale == 1
+
+
+def test_cache_ttl_expiry(tmp_path):
+    now = [0.0]
+    cache = SpacePathCache(ttl=10, clock=lambda: now[0])
+    cache.get("space", lambda _: str(tmp_path))
+    now[0] = 11
+    cache.get("space", lambda _: str(tmp_path))
+    assert cache.misses == 2
+    assert cache.hits == 0
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = SpacePathCache(maxsize=2)
+    for name in ("a", "b", "c"):
+        cache.get(name, lambda _: str(tmp_path))
+    cache.get("a", lambda _: str(tmp_path))
+    assert cache.misses == 4
+    assert cache.stats()["size"] == 2
+
+
+def test_cache_invalidate(tmp_path):
+    cache = SpacePathCache()
+    cache.get("a", lambda _: str(tmp_path))
+    cache.get("b", lambda _: str(tmp_path))
+    cache.invalidate("a")
+    assert cache.stats()["size"] == 1
+    cache.invalidate()
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_skips_unresolvable_path():
+    cache = SpacePathCache()
+    cache.get("space", lambda _: "/does/not/exist")
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_disabled(tmp_path):
+    cache = SpacePathCache(maxsize=0)
+    cache.get("space", lambda _: str(tmp_path))
+    cache.get("space", lambda _: str(tmp_path))
+    assert cache.misses == 2
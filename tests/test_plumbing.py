@@ -0,0 +1,143 @@
+import io
+import tracemalloc
+
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.plumbing import (
+    blob_id,
+    commit_blobs,
+    hash_files,
+    resolve_commit,
+    tree_entry,
+)
+
+
+@pytest.fixture
+def real_space_git(space_git, git_repo):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    return space_git
+
+
+def test_commit_blobs_on_unborn_branch(tmp_path, run_git):
+    run_git(tmp_path, "init", "-q", "-b", "main")
+    run_git(tmp_path, "config", "user.email", "test@example.com")
+    run_git(tmp_path, "config", "user.name", "test")
+    process = GitProcess()
+    assert resolve_commit(process, str(tmp_path)) is None
+
+    (tmp_path / "a.txt").write_text("a")
+    (oid,) = hash_files(process, str(tmp_path), ["a.txt"])
+    commit = commit_blobs(process, str(tmp_path), {"dir/a.txt": oid}, "m")
+
+    assert resolve_commit(process, str(tmp_path)) == commit
+    assert run_git(tmp_path, "show", "HEAD:dir/a.txt") == b"a"
+
+
+def test_commit_files_single_commit(real_space_git, git_repo, run_git):
+    commit = real_space_git.commit_files(
+        "test-space",
+        {"a.txt": "a", "conf/b.json": {"k": 1}, "c.bin": b"\x00"},
+        "many files",
+    )
+    assert run_git(git_repo, "rev-parse", "HEAD").decode().strip() == commit
+    assert run_git(git_repo, "rev-list", "--count", "HEAD") == b"2\n"
+    assert run_git(git_repo, "show", "HEAD:tracked.txt") == b"one\n"
+    assert (git_repo / "conf" / "b.json").exists()
+    assert run_git(git_repo, "status", "--porcelain") == b""
+
+
+def test_commit_files_headless(real_space_git, git_repo, run_git):
+    real_space_git.commit_files(
+        "test-space", {"only/in/git.txt": "x"}, "headless", materialize=False
+    )
+    assert not (git_repo / "only").exists()
+    assert run_git(git_repo, "show", "HEAD:only/in/git.txt") == b"x"
+    assert run_git(git_repo, "diff", "--cached", "--name-only") != b""
+
+
+def test_commit_files_streams(real_space_git, git_repo, run_git):
+    real_space_git.commit_files(
+        "test-space",
+        {
+            "gen.txt": (f"{i}\n".encode() for i in range(3)),
+            "file.bin": io.BytesIO(b"\x00\x01"),
+            "view.bin": memoryview(b"view"),
+        },
+        "streams",
+    )
+    assert run_git(git_repo, "show", "HEAD:gen.txt") == b"0\n1\n2\n"
+    assert (git_repo / "file.bin").read_bytes() == b"\x00\x01"
+    assert run_git(git_repo, "show", "HEAD:view.bin") == b"view"
+    assert run_git(git_repo, "status", "--porcelain") == b""
+
+
+@pytest.mark.parametrize("materialize", [True, False])
+def test_commit_files_stream_memory_is_bounded(
+    real_space_git, git_repo, run_git, materialize
+):
+    chunk = b"x" * (1 << 20)
+    tracemalloc.start()
+    try:
+        real_space_git.commit_files(
+            "test-space",
+            {"big.bin": (chunk for _ in range(32))},
+            "big",
+            materialize=materialize,
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 8 << 20
+    size = run_git(git_repo, "cat-file", "-s", "HEAD:big.bin")
+    assert int(size) == 32 << 20
+
+
+def test_blob_id_and_tree_entry(git_repo, run_git):
+    head = run_git(git_repo, "rev-parse", "HEAD:tracked.txt").decode()
+    assert blob_id(b"one\n") == head.strip()
+    assert len(blob_id(b"one\n", 64)) == 64
+    process = GitProcess()
+    assert tree_entry(process, str(git_repo), "tracked.txt") == head.strip()
+    assert tree_entry(process, str(git_repo), "missing.txt") is None
+
+
+def test_commit_file_skips_unchanged_content(real_space_git, git_repo):
+    real_space_git.commit_files("test-space", {"c.json": {"b": 1}}, "add")
+    git = real_space_git.git
+
+    assert (
+        real_space_git.commit_file("test-space", "c.json", "m", {"b": 1})
+        is False
+    )
+    assert (
+        real_space_git.commit_file("test-space", "tracked.txt", "m", "one\n")
+        is False
+    )
+    git.add.assert_not_called()
+    real_space_git.file_manager.set_file.assert_not_called()
+
+    assert real_space_git.commit_file("test-space", "c.json", "m", {"b": 2})
+    (git_repo / "tracked.txt").write_text("local edit")
+    assert real_space_git.commit_file(
+        "test-space", "tracked.txt", "m", "one\n"
+    )
+    assert git.add.call_count == 2
+
+
+def test_commit_files_no_files(space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.commit_files("test-space", {}, "empty")
+    assert exc.value.error_code == "NO_FILES"
+
+
+def test_commit_files_failure(space_git, tmp_path):
+    space_git.space_manager._get_space_path.return_value = str(tmp_path)
+    space_git.git_process.run.side_effect = SpaceGitException(
+        "fail", error_code="GIT_COMMAND_FAILED"
+    )
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.commit_files("test-space", {"a.txt": "a"}, "msg")
+    assert exc.value.error_code == "COMMIT_FILES_FAILED"
@@ -2,6 +2,7 @@ import pytest
 from darca_git.git import GitException
 
 from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
 
 
 def test_init_repo_success(space_git):
@@ -70,6 +71,45 @@ def test_commit_file_already_exists(space_git):
     )
 
 
+def test_commit_file_overwrites_with_content(space_git):
+    space_git.file_manager.file_exists.return_value = True
+    assert space_git.commit_file("test-space", "a.txt", "msg", content="new")
+    space_git.file_manager.set_file.assert_called_once_with(
+        "test-space", "a.txt", "new"
+    )
+
+
+def test_commit_file_streams_content(space_git, tmp_path):
+    space_git.space_manager._get_space_path.return_value = str(tmp_path)
+    chunks = (bytes([i]) * 4 for i in range(3))
+
+    assert space_git.commit_file("test-space", "out/big.bin", "m", chunks)
+
+    data = (tmp_path / "out" / "big.bin").read_bytes()
+    assert data == b"\x00" * 4 + b"\x01" * 4 + b"\x02" * 4
+    space_git.file_manager.set_file.assert_not_called()
+    space_git.git.add.assert_called_once_with("out/big.bin", cwd=str(tmp_path))
+
+
+@pytest.mark.parametrize("content", ["text\n", b"\x00binary\xff"])
+def test_commit_and_write_file_with_real_file_manager(
+    space_git, file_manager_at, git_repo, run_git, content
+):
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.file_manager = file_manager_at(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.git.add.side_effect = lambda p, cwd: run_git(cwd, "add", p)
+    space_git.git.commit.side_effect = lambda m, cwd: run_git(
+        cwd, "commit", "-q", "-m", m
+    )
+    data = content.encode() if isinstance(content, str) else content
+
+    assert space_git.commit_file("test-space", "a/f.bin", "m", content)
+    assert run_git(git_repo, "show", "HEAD:a/f.bin") == data
+    assert space_git.write_file("test-space", "b.bin", content)
+    assert (git_repo / "b.bin").read_bytes() == data
+
+
 def test_commit_file_failure(space_git):
     space_git.file_manager.file_exists.return_value = True
     space_git.git.commit.side_effect = GitException("fail")
@@ -179,3 +219,79 @@ def test_checkout_path_from_branch_failure(space_git):
     with pytest.raises(SpaceGitException) as exc:
         space_git.checkout_path_from_branch("test-space", ["file.txt"], "dev")
     assert exc.value.error_code == "CHECKOUT_FILE_FROM_BRANCH_FAILED"
+
+
+def test_get_repo_path_is_cached(space_git, tmp_path):
+    space_git.space_manager._get_space_path.return_value = str(tmp_path)
+    space_git.init_repo("test-space")
+    space_git.init_repo("test-space")
+    assert space_git.space_manager.space_exists.call_count == 1
+    assert space_git.path_cache.hits == 1
+
+    space_git.invalidate_path_cache("test-space")
+    space_git.init_repo("test-space")
+    assert space_git.space_manager.space_exists.call_count == 2
+
+
+@pytest.fixture
+def bulk_space_git(space_git, git_repo, run_git):
+    for i in range(5):
+        (git_repo / "many").mkdir(exist_ok=True)
+        (git_repo / "many" / f"{i}.txt").write_text("committed")
+    run_git(git_repo, "add", "many")
+    run_git(git_repo, "commit", "-q", "-m", "many")
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.bulk_path_threshold = 2
+    return space_git
+
+
+def test_checkout_path_bulk(bulk_space_git, git_repo):
+    paths = [f"many/{i}.txt" for i in range(5)] + ["tracked.txt"]
+    for p in paths:
+        (git_repo / p).write_text("dirty")
+
+    assert bulk_space_git.checkout_path("test-space", paths) is True
+
+    assert all((git_repo / p).read_text() != "dirty" for p in paths)
+    bulk_space_git.file_manager.file_exists.assert_not_called()
+    bulk_space_git.git.checkout_path.assert_not_called()
+
+
+def test_checkout_path_bulk_missing(bulk_space_git):
+    with pytest.raises(SpaceGitException) as exc:
+        bulk_space_git.checkout_path(
+            "test-space", ["many/0.txt", "many/9.txt", "nodir/x.txt"]
+        )
+    assert exc.value.error_code == "CHECKOUT_PATH_NOT_FOUND"
+    assert exc.value.metadata["missing_files"] == [
+        "many/9.txt",
+        "nodir/x.txt",
+    ]
+
+
+def test_checkout_path_bulk_dry_run(bulk_space_git, git_repo):
+    (git_repo / "tracked.txt").write_text("dirty")
+    paths = ["tracked.txt", "many/0.txt", "many/1.txt"]
+    assert bulk_space_git.checkout_path("test-space", paths, dry_run=True)
+    assert (git_repo / "tracked.txt").read_text() == "dirty"
+
+
+def test_checkout_path_from_branch_bulk(bulk_space_git, git_repo, run_git):
+    run_git(git_repo, "checkout", "-q", "-b", "other")
+    for i in range(5):
+        (git_repo / "many" / f"{i}.txt").write_text("other")
+    run_git(git_repo, "commit", "-q", "-am", "other")
+    run_git(git_repo, "checkout", "-q", "main")
+    paths = [f"many/{i}.txt" for i in range(5)]
+
+    assert bulk_space_git.checkout_path_from_branch(
+        "test-space", paths, "other"
+    )
+    assert all((git_repo / p).read_text() == "other" for p in paths)
+
+    with pytest.raises(SpaceGitException) as exc:
+        bulk_space_git.checkout_path_from_branch(
+            "test-space", paths, "missing-branch"
+        )
+    assert exc.value.error_code == "CHECKOUT_FILE_FROM_BRANCH_FAILED"
@@ -0,0 +1,102 @@
+import pytest
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.status import (
+    StatusCache,
+    StatusEntry,
+    parse_porcelain_v2,
+)
+
+SAMPLE = (
+    b"# branch.oid abc\0"
+    b"1 .M N... 100644 100644 100644 aaa aaa my file.txt\0"
+    b"2 R. N... 100644 100644 100644 aaa aaa R100 new\nname\0old name\0"
+    b"u UU N... 100644 100644 100644 100644 a b c conflict.txt\0"
+    b"? untracked dir/file\0"
+    b"! ignored.log\0"
+)
+
+
+def test_parse_porcelain_v2():
+    assert parse_porcelain_v2(SAMPLE) == [
+        StatusEntry("my file.txt", ".", "M"),
+        StatusEntry("new\nname", "R", ".", "old name", kind="renamed"),
+        StatusEntry("conflict.txt", "U", "U", kind="unmerged"),
+        StatusEntry("untracked dir/file", "?", "?", kind="untracked"),
+        StatusEntry("ignored.log", "!", "!", kind="ignored"),
+    ]
+
+
+def test_status_entry_uses_slots():
+    entry = StatusEntry("a", "M", ".")
+    assert not hasattr(entry, "__dict__")
+    assert "orig_path" not in repr(entry)
+
+
+@pytest.fixture
+def repo(git_repo):
+    return git_repo
+
+
+def test_parse_real_status(repo):
+    (repo / "tracked.txt").write_text("two\n")
+    (repo / "with space.txt").write_text("x")
+    out = GitProcess().run(["status", "--porcelain=v2", "-z"], str(repo))
+    assert parse_porcelain_v2(out) == [
+        StatusEntry("tracked.txt", ".", "M"),
+        StatusEntry("with space.txt", "?", "?", kind="untracked"),
+    ]
+
+
+def test_status_cache_fingerprint_tracks_index(repo, run_git):
+    cache = StatusCache()
+    key = cache.fingerprint(str(repo))
+    cache.put("space", key, [])
+    assert cache.get("space", cache.fingerprint(str(repo))) == []
+
+    (repo / "new.txt").write_text("x")
+    run_git(repo, "add", "new.txt")
+    assert cache.get("space", cache.fingerprint(str(repo))) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.invalidate()
+    assert cache.get("space", key) is None
+
+
+def test_get_status_entries_uses_cache(space_git, repo):
+    space_git.space_manager._get_space_path.return_value = str(repo)
+    space_git.git_process.run.return_value = b"? a.txt\0"
+
+    first = space_git.get_status_entries("test-space", use_cache=True)
+    second = space_git.get_status_entries("test-space", use_cache=True)
+    assert (
+        first == second == [StatusEntry("a.txt", "?", "?", kind="untracked")]
+    )
+    assert space_git.git_process.run.call_count == 1
+
+
+def test_status_cache_invalidated_by_manager_writes(space_git, repo):
+    space_git.space_manager._get_space_path.return_value = str(repo)
+    space_git.git_process.run.return_value = b""
+    calls = [
+        lambda: space_git.write_file("test-space", "a.txt", "a"),
+        lambda: space_git.mark_dirty("test-space", ["a.txt"]),
+        lambda: space_git.commit_file("test-space", "a.txt", "msg"),
+        lambda: space_git.checkout_branch("test-space", "dev"),
+    ]
+    for call in calls:
+        space_git.get_status_entries("test-space", use_cache=True)
+        misses = space_git.status_cache.misses
+        call()
+        space_git.get_status_entries("test-space", use_cache=True)
+        assert space_git.status_cache.misses == misses + 1
+
+
+def test_get_status_entries_failure(space_git):
+    space_git.git_process.run.side_effect = SpaceGitException(
+        "fail", error_code="GIT_COMMAND_FAILED"
+    )
+    with pytest.raises(SpaceGitException) as exc:
+        space_git.get_status_entries("test-space")
+    assert exc.value.error_code == "STATUS_FAILED"
@@ -0,0 +1,161 @@
+import io
+import multiprocessing
+import os
+import tarfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from darca_space_manager import config
+
+from darca_space_git.exceptions import SpaceGitException
+from darca_space_git.git_process import GitProcess
+from darca_space_git.locking import SpaceLockManager
+from darca_space_git.space_git import SpaceGitManager
+from darca_space_git.status import StatusCache
+from darca_space_git.worktrees import WorktreePool, git_dir
+
+
+@pytest.fixture
+def pooled(space_git, git_repo, run_git):
+    for branch in ("a", "b", "c"):
+        run_git(git_repo, "branch", branch)
+    space_git.space_manager._get_space_path.return_value = str(git_repo)
+    space_git.git_process = GitProcess()
+    space_git.worktrees = WorktreePool(2, space_git.git_process)
+    return space_git
+
+
+def _branch(run_git, cwd):
+    return run_git(cwd, "symbolic-ref", "--short", "HEAD").decode().strip()
+
+
+def test_switch_adds_then_reuses_worktree(pooled, git_repo, run_git):
+    pool = pooled.worktrees
+
+    pooled.checkout_branch("s", "a")
+    work = pool.active_path(str(git_repo))
+    assert work != str(git_repo) and _branch(run_git, work) == "a"
+    assert _branch(run_git, git_repo) == "main"
+
+    pooled.checkout_branch("s", "b")
+    before = os.stat(os.path.join(work, "tracked.txt")).st_mtime_ns
+    assert pool.switch(str(git_repo), "a") == (work, True)
+    assert os.stat(os.path.join(work, "tracked.txt")).st_mtime_ns == before
+
+    pooled.checkout_branch("s", "main")
+    assert pool.active_path(str(git_repo)) == str(git_repo)
+
+
+def test_operations_follow_active_worktree(pooled, git_repo, run_git):
+    pooled.checkout_branch("s", "feature", create=True)
+    work = pooled.worktrees.active_path(str(git_repo))
+
+    pooled.write_file("s", "new.txt", "data")
+    assert pooled.get_status_entries("s", use_cache=True)[0].path == "new.txt"
+    pooled.commit_files("s", {"new.txt": "data"}, "add new")
+
+    assert not (git_repo / "new.txt").exists()
+    log = run_git(work, "log", "--format=%s", "-1", "feature").decode()
+    assert log == "add new\n"
+    assert pooled.get_status_entries("s", use_cache=True) == []
+    with pytest.raises(SpaceGitException) as exc:
+        pooled.commit_file("s", "other.txt", "m")
+    assert exc.value.error_code == "FILE_MISSING"
+    assert run_git(git_repo, "rev-parse", "main") != run_git(
+        git_repo, "rev-parse", "feature"
+    )
+
+
+def test_head_reads_follow_active_worktree(pooled, git_repo, run_git):
+    pooled.checkout_branch("s", "feature", create=True)
+    commit = pooled.commit_files("s", {"new.txt": "data"}, "add new")
+
+    assert pooled.read_file_at_ref("s", "HEAD", "new.txt") == b"data"
+    assert pooled.read_file_at_ref("s", "main", "tracked.txt") == b"one\n"
+    assert [c.sha for c in pooled.history("s")][0] == commit
+    assert pooled.history_page("s", limit=1).commits[0].sha == commit
+    archive = io.BytesIO()
+    pooled.export("s", "HEAD", archive, paths=["new.txt"])
+    with tarfile.open(fileobj=io.BytesIO(archive.getvalue())) as tar:
+        assert tar.getnames() == ["new.txt"]
+
+
+def test_evicts_least_recently_used_clean_worktree(pooled, git_repo):
+    pool = pooled.worktrees
+    repo = str(git_repo)
+    pooled.checkout_branch("s", "a")
+    dirty = pool.active_path(repo)
+    pooled.write_file("s", "wip.txt", "uncommitted")
+    pooled.checkout_branch("s", "b")
+    pooled.checkout_branch("s", "c")
+
+    assert pool.branches(repo) == ["a", "c"]
+    assert os.path.exists(os.path.join(dirty, "wip.txt"))
+    assert not os.path.exists(pool.worktree_path(repo, "b"))
+
+
+def test_pool_rediscovers_worktrees(pooled, git_repo):
+    pooled.checkout_branch("s", "a")
+    fresh = WorktreePool(2)
+    assert fresh.branches(str(git_repo)) == ["a"]
+    assert fresh.active_branch(str(git_repo)) is None
+
+
+def test_switch_failure(pooled):
+    with pytest.raises(SpaceGitException) as exc:
+        pooled.checkout_branch("s", "missing")
+    assert exc.value.error_code == "CHECKOUT_BRANCH_FAILED"
+
+
+def test_git_dir_and_fingerprint(pooled, git_repo):
+    pooled.checkout_branch("s", "a")
+    work = pooled.worktrees.active_path(str(git_repo))
+    assert git_dir(str(git_repo)) == str(git_repo / ".git")
+    assert os.path.dirname(git_dir(work)).endswith(
+        os.path.join(".git", "worktrees")
+    )
+    assert StatusCache.fingerprint(work) != StatusCache.fingerprint(
+        str(git_repo)
+    )
+
+
+def test_activate_adopts_worktrees_of_other_pools(pooled, git_repo):
+    other = WorktreePool(2, GitProcess())
+    assert other.active_path(str(git_repo)) == str(git_repo)
+
+    pooled.checkout_branch("s", "a")
+    work = pooled.worktrees.active_path(str(git_repo))
+    assert other.activate(str(git_repo), "a") == work
+    assert other.branches(str(git_repo)) == ["a"]
+    assert other.activate(str(git_repo), "b") != work
+    assert other.active_branch(str(git_repo)) == "b"
+    assert other.activate(str(git_repo), None) == str(git_repo)
+
+
+def test_process_pool_uses_active_worktree(
+    git_repo, tmp_path_factory, monkeypatch
+):
+    # Real space lookups in the forked workers: the space is git_repo.
+    monkeypatch.setitem(config.DIRECTORIES, "SPACE_DIR", str(git_repo.parent))
+    locks = SpaceLockManager(str(tmp_path_factory.mktemp("locks")))
+    manager = SpaceGitManager(locks=locks, worktree_pool_size=2)
+    space = git_repo.name
+    manager.checkout_branch(space, "feature", create=True)
+    work = manager.worktrees.active_path(str(git_repo))
+    with open(os.path.join(work, "new.txt"), "w") as handle:
+        handle.write("data")
+
+    fork = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=1, mp_context=fork) as pool:
+        (on_branch,) = manager.status_many([space], executor=pool)
+        manager.checkout_branch(space, "main")
+        (on_main,) = manager.status_many([space], executor=pool)
+
+    assert "new.txt" in on_branch.value
+    assert "new.txt" not in on_main.value
+
+
+def test_invalid_pool_size():
+    with pytest.raises(SpaceGitException) as exc:
+        WorktreePool(0)
+    assert exc.value.error_code == "INVALID_WORKTREE_POOL"